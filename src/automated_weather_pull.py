@@ -7,17 +7,19 @@ preserving historical values.
 """
 
 import io
+import logging
 import threading
 from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
 import requests
+import run_logging
 
+logger = run_logging.get_logger(__name__)
 
-def fetch_weather_data_from_api(
-    api_query_url, logfile=None, measurement_time_interval=10
-):
+
+def fetch_weather_data_from_api(api_query_url, measurement_time_interval=10):
     """
     Fetch weather data from the specified API query URL.
 
@@ -26,9 +28,6 @@ def fetch_weather_data_from_api(
     api_query_url : str
         The API query URL to fetch weather data from
 
-    logfile : str, optional
-        Path to logfile for writing status messages
-
     Returns
     -------
     str or None
@@ -36,16 +35,6 @@ def fetch_weather_data_from_api(
 
     """
 
-    def log_message(msg):
-        """Helper function to write to logfile and console."""
-        print(msg)
-        if logfile is not None:
-            try:
-                with open(logfile, "a") as f:
-                    f.write(msg + "\n")
-            except Exception as e:
-                print(f"Warning: Could not write to logfile: {e}")
-
     try:
         # Attempt to fetch JSON data from the API
         response = requests.get(api_query_url, timeout=30)
@@ -83,37 +72,38 @@ def fetch_weather_data_from_api(
             df["datetime"] = pd.to_datetime(df["datetime"]).dt.strftime(
                 "%d.%m.%Y %H:%M"
             )
-            log_message(
+            run_logging.log_and_print(
+                logger,
                 f"Fetched {len(df)} rows  |  "
-                f"{df['datetime'].iloc[0]}  →  {df['datetime'].iloc[-1]}"
+                f"{df['datetime'].iloc[0]}  →  {df['datetime'].iloc[-1]}",
             )
             csv_data = df.to_csv(index=False, sep=";")
         else:
             # fallback to mock behavior if unexpected JSON
             msg = "API response missing expected 'data_1h' block; using mock data."
-            log_message(msg)
+            run_logging.log_and_print(logger, msg, logging.WARNING)
             csv_data = _get_mock_weather_data()
 
         msg = f"Successfully fetched weather data from API at {datetime.now()}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg)
 
         return csv_data
 
     except requests.exceptions.RequestException as e:
         msg = f"Error fetching weather data from API: {str(e)}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, logging.ERROR)
         return None
     except ValueError as e:
         msg = f"Error parsing JSON from API response: {str(e)}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, logging.ERROR)
         return None
     except Exception as e:
         msg = f"Unexpected error during weather data fetch: {str(e)}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, logging.ERROR)
         return None
 
 
-def merge_weather_data(existing_file_path, new_csv_data, logfile=None):  # noqa: C901
+def merge_weather_data(existing_file_path, new_csv_data):  # noqa: C901
     """
     Merge new weather data with existing weather data file.
 
@@ -128,9 +118,6 @@ def merge_weather_data(existing_file_path, new_csv_data, logfile=None):  # noqa:
     new_csv_data : str
         CSV formatted string of new weather data
 
-    logfile : str, optional
-        Path to logfile for writing status messages
-
     Returns
     -------
     bool
@@ -138,21 +125,11 @@ def merge_weather_data(existing_file_path, new_csv_data, logfile=None):  # noqa:
 
     """
 
-    def log_message(msg):
-        """Helper function to write to logfile and console."""
-        print(msg)
-        if logfile is not None:
-            try:
-                with open(logfile, "a") as f:
-                    f.write(msg + "\n")
-            except Exception as e:
-                print(f"Warning: Could not write to logfile: {e}")
-
     try:
         # Load existing data (semicolon-separated)
         if not Path(existing_file_path).exists():
             msg = f"Existing file not found: {existing_file_path}. Creating new file with fetched data."
-            log_message(msg)
+            run_logging.log_and_print(logger, msg)
             with open(existing_file_path, "w") as f:
                 f.write(new_csv_data)
             return True
@@ -163,7 +140,7 @@ def merge_weather_data(existing_file_path, new_csv_data, logfile=None):  # noqa:
             # File exists but is completely empty (e.g. created as a placeholder
             # before the first automated pull).  Treat it like a new file.
             msg = f"Existing file {existing_file_path} is empty. Writing fetched data directly."
-            log_message(msg)
+            run_logging.log_and_print(logger, msg)
             with open(existing_file_path, "w") as f:
                 f.write(new_csv_data)
             return True
@@ -171,7 +148,7 @@ def merge_weather_data(existing_file_path, new_csv_data, logfile=None):  # noqa:
         # If the file only had a header row (no data rows), replace it entirely.
         if existing_df.empty:
             msg = f"Existing file {existing_file_path} has no data rows. Writing fetched data directly."
-            log_message(msg)
+            run_logging.log_and_print(logger, msg)
             with open(existing_file_path, "w") as f:
                 f.write(new_csv_data)
             return True
@@ -182,13 +159,13 @@ def merge_weather_data(existing_file_path, new_csv_data, logfile=None):  # noqa:
         # Ensure both have same column names
         if list(existing_df.columns) != list(new_df.columns):
             msg = "Warning: Column mismatch between existing and new data. Attempting to match columns."
-            log_message(msg)
+            run_logging.log_and_print(logger, msg, logging.WARNING)
             # Rename new columns to match existing if possible
             if len(existing_df.columns) == len(new_df.columns):
                 new_df.columns = existing_df.columns
             else:
                 msg = "Error: Column count mismatch. Cannot merge data."
-                log_message(msg)
+                run_logging.log_and_print(logger, msg, logging.ERROR)
                 return False
 
         # Assume first column is datetime
@@ -236,19 +213,18 @@ def merge_weather_data(existing_file_path, new_csv_data, logfile=None):  # noqa:
             f"Successfully merged new weather data into {existing_file_path}. "
             f"Added/Updated {len(new_df)} records."
         )
-        log_message(msg)
+        run_logging.log_and_print(logger, msg)
         return True
 
     except Exception as e:
         msg = f"Error merging weather data: {str(e)}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, logging.ERROR)
         return False
 
 
 def start_periodic_data_pull(
     meteo_file_path,
     api_query_url,
-    logfile=None,
     stop_event=None,
     measurement_time_interval=10,
 ):
@@ -267,9 +243,6 @@ def start_periodic_data_pull(
     api_query_url : str
         API query URL to fetch data from
 
-    logfile : str, optional
-        Path to logfile for writing status messages
-
     stop_event : threading.Event, optional
         Event to signal stopping (not used for one-shot execution)
 
@@ -280,50 +253,40 @@ def start_periodic_data_pull(
 
     """
 
-    def log_message(msg):
-        """Helper function to write to logfile and console."""
-        print(msg)
-        if logfile is not None:
-            try:
-                with open(logfile, "a") as f:
-                    f.write(msg + "\n")
-            except Exception as e:
-                print(f"Warning: Could not write to logfile: {e}")
-
     # Validate parameters
     if api_query_url is None:
         msg = "Error: No API query URL provided."
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, logging.ERROR)
         return None
 
     def _pull_once():
         """Background thread to perform a single weather data fetch/merge."""
         msg = "Automated weather data pull started (runs once per model execution)."
-        log_message(msg)
+        run_logging.log_and_print(logger, msg)
 
         # Fetch and merge data
         msg = f"Pulling weather data from API at {datetime.now()}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg)
 
-        csv_data = fetch_weather_data_from_api(
-            api_query_url, logfile, measurement_time_interval
-        )
+        csv_data = fetch_weather_data_from_api(api_query_url, measurement_time_interval)
 
+        level = logging.ERROR
         if csv_data is not None:
-            success = merge_weather_data(meteo_file_path, csv_data, logfile)
+            success = merge_weather_data(meteo_file_path, csv_data)
             if success:
                 msg = f"Weather data updated successfully at {datetime.now()}"
+                level = logging.INFO
             else:
                 msg = f"Failed to merge weather data at {datetime.now()}"
         else:
             msg = f"Failed to fetch weather data at {datetime.now()}"
 
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, level)
 
     # Create and start background thread
     thread = threading.Thread(target=_pull_once, daemon=True)
     msg = "Starting automated data pull thread..."
-    log_message(msg)
+    run_logging.log_and_print(logger, msg)
 
     return thread
 
@@ -0,0 +1,428 @@
+"""
+Benchmark script timing end-to-end model runs and stage kernels on the bundled Changins seasons.
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import daily_aggregates
+import load_data
+import process_data
+import utils
+import weather_series
+from omegaconf import OmegaConf
+
+repository_dir = Path(__file__).resolve().parent.parent
+
+# Processing kernels timed in-process for every season, in run order.
+kernels = (
+    "load_data",
+    "process_data",
+    "weather_series",
+    "daily_aggregates",
+    "daily_infection_strengths",
+)
+
+
+def get_case_name(season, case_settings):
+    """
+    Returns the name of a benchmark case, e.g. 2025_computational_time_steps-6_fast_mode-true.
+
+    """
+    return "_".join(
+        [str(season)]
+        + [
+            f"{setting}-{format_override_value(value)}"
+            for setting, value in case_settings.items()
+        ]
+    )
+
+
+def format_override_value(value):
+    """
+    Returns a configuration value as a hydra command line override value.
+
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return json.dumps(value)
+    return str(value)
+
+
+def get_peak_memory_mb(rusage):
+    """
+    Returns the peak resident memory of a resource usage in MB (ru_maxrss is in
+    kilobytes on Linux and in bytes on macOS).
+
+    """
+    if sys.platform == "darwin":
+        return rusage.ru_maxrss / 2**20
+    return rusage.ru_maxrss / 2**10
+
+
+def run_model_case(benchmark_config, season, case_settings, output_directory):
+    """
+    **Run the model end-to-end (src/main.py) once for a season and run settings case.**
+
+    The model runs in its own process, so that its peak memory is measured alone.
+    Stage metrics are enabled, and every run is a cold full run: automated data
+    pulls, the processed data cache and incremental runs are disabled.
+
+    return
+    : dictionary of the case settings, exit code, wall time, loop wall time, peak
+    memory, and calls, wall time and rows scanned per stage function
+
+    """
+    run_name = f"benchmark_{get_case_name(season, case_settings)}"
+    overrides = {
+        "input_data.meteo": benchmark_config.meteo.format(season=season),
+        "input_data.spore_counts": benchmark_config.spore_counts.format(season=season),
+        "input_data.automated_weather_pull": False,
+        "input_data.automated_spore_pull": False,
+        "input_data.processed_cache_dir": None,
+        "input_data.incremental_processing": False,
+        "output.directory": output_directory,
+        "output.run_name": run_name,
+        "run_settings.incremental_model": False,
+        "run_settings.stage_metrics": True,
+        "oospore_maturation.date": None,
+    }
+    for setting, value in benchmark_config.site.items():
+        overrides[f"site.{setting}"] = value
+    for setting, value in case_settings.items():
+        overrides[f"run_settings.{setting}"] = value
+
+    with open(repository_dir / output_directory / f"{run_name}.out", "w") as run_output:
+        t_start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "src/main.py"]
+            + [
+                f"{key}={format_override_value(value)}"
+                for key, value in overrides.items()
+            ],
+            cwd=repository_dir,
+            stdout=run_output,
+            stderr=subprocess.STDOUT,
+        )
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall_seconds = time.perf_counter() - t_start
+
+    metrics = {}
+    metrics_file = (
+        repository_dir / output_directory / run_name / f"{run_name}.stage_metrics.json"
+    )
+    if metrics_file.exists():
+        with open(metrics_file) as f:
+            metrics = json.load(f)
+    return {
+        "season": season,
+        **case_settings,
+        "exit_code": os.waitstatus_to_exitcode(status),
+        "wall_seconds": wall_seconds,
+        "loop_seconds": metrics.get("loop_seconds"),
+        "peak_memory_mb": get_peak_memory_mb(rusage),
+        "stage_calls": {
+            stage: stage_metrics["calls"]
+            for stage, stage_metrics in metrics.get("stages", {}).items()
+        },
+        "stage_seconds": {
+            stage: stage_metrics["seconds"]
+            for stage, stage_metrics in metrics.get("stages", {}).items()
+        },
+        "rows_scanned": metrics.get("rows_scanned", {}),
+    }
+
+
+def run_kernels(benchmark_config, model_config, season, output_directory):
+    """
+    **Time the processing kernels once for a season, in-process.**
+
+    The weather file is loaded and processed as by src/main.py, then the weather
+    timeseries, daily aggregates and daily infection strengths are built from it.
+
+    return
+    : dictionary of the wall time per kernel
+
+    """
+    meteo = repository_dir / benchmark_config.meteo.format(season=season)
+    outfile = repository_dir / output_directory / f"benchmark_kernels_{season}"
+    measurement_time_interval = model_config.run_settings.measurement_time_interval
+    kernel_seconds = {}
+
+    t_start = time.perf_counter()
+    data = load_data.load_data(meteo)
+    kernel_seconds["load_data"] = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    processed_data, _ = process_data.process_data(
+        data,
+        model_config.data_columns.use_columns,
+        model_config.data_columns.rename_columns,
+        model_config.data_columns.format_columns,
+        model_config.site.timezone,
+        model_config,
+        Path(f"{outfile}.processed.csv"),
+        Path(f"{outfile}.qc_report.csv"),
+    )
+    kernel_seconds["process_data"] = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    weather = weather_series.WeatherSeries(processed_data)
+    kernel_seconds["weather_series"] = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    daily_aggregates.DailyAggregates(weather)
+    kernel_seconds["daily_aggregates"] = time.perf_counter() - t_start
+
+    t_start = time.perf_counter()
+    utils.get_daily_infection_strengths(weather, measurement_time_interval)
+    kernel_seconds["daily_infection_strengths"] = time.perf_counter() - t_start
+
+    return kernel_seconds
+
+
+def get_best_case_result(case_results):
+    """
+    Returns the result of the fastest successful run of a case, with the largest
+    peak memory of all its runs, or the first failed run if any run failed.
+
+    """
+    for case_result in case_results:
+        if case_result["exit_code"] != 0:
+            return case_result
+    best_case_result = dict(
+        min(case_results, key=lambda result: result["wall_seconds"])
+    )
+    best_case_result["peak_memory_mb"] = max(
+        case_result["peak_memory_mb"] for case_result in case_results
+    )
+    return best_case_result
+
+
+def get_compared_metrics(case_result):
+    """
+    Returns the metrics of a case result compared against the baseline: wall
+    time, loop wall time, peak memory and wall time per stage function.
+
+    """
+    compared_metrics = {
+        "wall_seconds": case_result["wall_seconds"],
+        "loop_seconds": case_result["loop_seconds"],
+        "peak_memory_mb": case_result["peak_memory_mb"],
+    }
+    for stage, seconds in case_result["stage_seconds"].items():
+        compared_metrics[f"stage_seconds.{stage}"] = seconds
+    return compared_metrics
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    **Compare benchmark results with the baseline results.**
+
+    Every metric of every case and kernel is reported with its relative change,
+    and flagged as a regression if it increased by more than tolerance.
+
+    return
+    : comparison report as a printable string, number of regressions
+
+    """
+    report = (
+        f"\nBenchmark comparison with the baseline of {baseline['time']} "
+        f"(commit {baseline.get('commit')}), tolerance {tolerance:.0%}:\n"
+    )
+    regressions = 0
+    for group in ("cases", "kernels"):
+        for name, result in results[group].items():
+            baseline_result = baseline[group].get(name)
+            if baseline_result is None:
+                report += f"\n{name}: no baseline\n"
+                continue
+            if group == "cases":
+                if result["exit_code"] != 0:
+                    report += f"\n{name}: FAILED (exit code {result['exit_code']})\n"
+                    regressions += 1
+                    continue
+                metrics = get_compared_metrics(result)
+                baseline_metrics = get_compared_metrics(baseline_result)
+            else:
+                metrics = result
+                baseline_metrics = baseline_result
+            report += f"\n{name}:\n"
+            for metric, value in metrics.items():
+                baseline_value = baseline_metrics.get(metric)
+                if value is None or not baseline_value:
+                    continue
+                change = value / baseline_value - 1
+                flag = ""
+                if change > tolerance:
+                    flag = "  REGRESSION"
+                    regressions += 1
+                elif change < -tolerance:
+                    flag = "  improvement"
+                report += (
+                    f"\t{metric}: {baseline_value:.3f} -> {value:.3f} "
+                    f"({change:+.1%}){flag}\n"
+                )
+    report += f"\n{regressions} regression(s).\n"
+    return report, regressions
+
+
+def get_commit():
+    """
+    Returns the abbreviated git commit of the repository, or None outside git.
+
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=repository_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(arguments=None):
+    """
+    **Run the benchmark suite.**
+
+    Every season is run end-to-end with every run settings case of the benchmark
+    configuration, and its processing kernels are timed. The results are appended
+    to the JSON history and compared with the stored baseline, if any.
+
+    return
+    : exit code, 1 if a run failed or, with --fail-on-regression, if a metric
+    regressed beyond the tolerance
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--config", default="config/benchmark.yaml")
+    parser.add_argument("--seasons", nargs="+", type=int, help="seasons to run")
+    parser.add_argument("--repeats", type=int, help="runs per case")
+    parser.add_argument(
+        "--kernels-only",
+        action="store_true",
+        help="only time the processing kernels, without end-to-end runs",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="exit with code 1 if a metric regressed beyond the tolerance",
+    )
+    arguments = parser.parse_args(arguments)
+
+    benchmark_config = OmegaConf.load(repository_dir / arguments.config)
+    model_config = OmegaConf.merge(
+        OmegaConf.load(repository_dir / "config" / "main.yaml"),
+        {"site": benchmark_config.site},
+    )
+    seasons = arguments.seasons or list(benchmark_config.seasons)
+    repeats = max(1, arguments.repeats or benchmark_config.repeats)
+    output_directory = benchmark_config.output_directory
+    (repository_dir / output_directory).mkdir(parents=True, exist_ok=True)
+
+    results = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeats": repeats,
+        "cases": {},
+        "kernels": {},
+    }
+    for season in seasons:
+        print(f"Timing processing kernels of season {season}...", flush=True)
+        kernel_runs = [
+            run_kernels(benchmark_config, model_config, season, output_directory)
+            for _ in range(repeats)
+        ]
+        results["kernels"][str(season)] = {
+            kernel: min(kernel_run[kernel] for kernel_run in kernel_runs)
+            for kernel in kernels
+        }
+        if arguments.kernels_only:
+            continue
+        for case_settings in benchmark_config.run_settings:
+            case_settings = OmegaConf.to_container(case_settings)
+            case_name = get_case_name(season, case_settings)
+            print(f"Running case {case_name}...", flush=True)
+            case_result = get_best_case_result(
+                [
+                    run_model_case(
+                        benchmark_config, season, case_settings, output_directory
+                    )
+                    for _ in range(repeats)
+                ]
+            )
+            results["cases"][case_name] = case_result
+            print(
+                f"\t{case_result['wall_seconds']:.1f} s, "
+                f"{case_result['peak_memory_mb']:.0f} MB peak memory, "
+                f"exit code {case_result['exit_code']}",
+                flush=True,
+            )
+
+    history_file = repository_dir / benchmark_config.history
+    history_file.parent.mkdir(parents=True, exist_ok=True)
+    history = []
+    if history_file.exists():
+        with open(history_file) as f:
+            history = json.load(f)
+    history.append(results)
+    with open(history_file, "w") as f:
+        json.dump(history, f, indent=2)
+    print(f"\nBenchmark results appended to: {history_file}")
+
+    failures = [
+        case_name
+        for case_name, case_result in results["cases"].items()
+        if case_result["exit_code"] != 0
+    ]
+    regressions = 0
+    baseline_file = repository_dir / benchmark_config.baseline
+    if baseline_file.exists():
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+        report, regressions = compare_with_baseline(
+            results, baseline, benchmark_config.tolerance
+        )
+        print(report)
+        with open(history_file.with_name("report.txt"), "w") as f:
+            f.write(report)
+    else:
+        print(f"No baseline to compare with: {baseline_file}")
+
+    if arguments.save_baseline:
+        if failures:
+            print("Baseline not saved: some runs failed.")
+        else:
+            with open(baseline_file, "w") as f:
+                json.dump(results, f, indent=2)
+            print(f"Benchmark results saved as the baseline: {baseline_file}")
+
+    if failures:
+        print(f"Failed runs (see {output_directory}/*.out): {', '.join(failures)}")
+        return 1
+    if arguments.fail_on_regression and regressions > 0:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+DailyAggregates class definition script for per-day statistics of the processed timeseries.
+
+"""
+
+from statistics import mean
+
+import numpy as np
+
+
+class DailyAggregates:
+    """
+    Class DailyAggregates holding the day structure of a WeatherSeries (its
+    distinct dates, in timeseries order, with the first and last row index of
+    each) and the daily mean/min/max/sum of any measurement column, so that the
+    oospore maturation and incubation stages read per-day values from arrays
+    instead of nested {date: {row index: measurement}} dictionaries.
+
+    Days are found in one vectorized pass over the date column, which is
+    contiguous per day in a time-ordered timeseries. Aggregates are computed on
+    first request and memoized per (statistic, column), as are the per-day tables
+    of later model stages (see precomputed). Daily means are computed with
+    statistics.mean, so they are the correctly rounded mean of the day's
+    measurements (NaN if any measurement of the day is missing).
+
+    """
+
+    def __init__(self, weather):
+        """
+        Object initialisation function.
+
+        """
+        self.weather = weather
+        day_starts = np.flatnonzero(weather.date[1:] != weather.date[:-1]) + 1
+        self.first_rowindexes = np.r_[0, day_starts]
+        self.last_rowindexes = np.r_[day_starts - 1, len(weather) - 1]
+        self.dates = weather.date[self.first_rowindexes]
+        self.date_positions = {date: i for i, date in enumerate(self.dates)}
+        self._aggregates = {}
+
+    def __len__(self):
+        """
+        Number of distinct days in the timeseries.
+
+        """
+        return len(self.dates)
+
+    def __contains__(self, date):
+        """
+        Membership check by date.
+
+        """
+        return date in self.date_positions
+
+    def first_rowindex(self, date):
+        """
+        Returns the row index of the first measurement of the given date.
+
+        """
+        return int(self.first_rowindexes[self.date_positions[date]])
+
+    def last_rowindex(self, date):
+        """
+        Returns the row index of the last measurement of the given date.
+
+        """
+        return int(self.last_rowindexes[self.date_positions[date]])
+
+    def precomputed(self, key, build, *args):
+        """
+        Returns the per-day table stored under key, building it once with
+        build(self, *args) on first access. The key must include every parameter
+        the table depends on.
+
+        """
+        if key not in self._aggregates:
+            self._aggregates[key] = build(self, *args)
+        return self._aggregates[key]
+
+    def _aggregate(self, statistic, column, reduce):
+        """
+        Returns the memoized array of daily aggregates of a column, one value per
+        date, computing it with reduce(column values, first row indexes of the days)
+        on first request.
+
+        """
+        key = (statistic, column)
+        if key not in self._aggregates:
+            aggregates = np.asarray(
+                reduce(self.weather[column], self.first_rowindexes), dtype=np.float64
+            )
+            aggregates.flags.writeable = False
+            self._aggregates[key] = aggregates
+        return self._aggregates[key]
+
+    def mean(self, column):
+        """
+        Returns the array of daily means of a measurement column.
+
+        """
+        return self._aggregate(
+            "mean",
+            column,
+            lambda values, first_rowindexes: [
+                mean(day.tolist()) for day in np.split(values, first_rowindexes[1:])
+            ],
+        )
+
+    def min(self, column):
+        """
+        Returns the array of daily minima of a measurement column.
+
+        """
+        return self._aggregate("min", column, np.minimum.reduceat)
+
+    def max(self, column):
+        """
+        Returns the array of daily maxima of a measurement column.
+
+        """
+        return self._aggregate("max", column, np.maximum.reduceat)
+
+    def sum(self, column):
+        """
+        Returns the array of daily sums of a measurement column.
+
+        """
+        return self._aggregate("sum", column, np.add.reduceat)
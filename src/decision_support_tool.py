@@ -6,12 +6,16 @@ if the infection model simulation should continue from the sporulation stage
 based on spore count thresholds and trends.
 """
 
+import logging
 from datetime import datetime
 
 import pandas as pd
+import run_logging
 
+logger = run_logging.get_logger(__name__)
 
-def fetch_spore_counts(api_query_url, logfile=None):  # noqa: C901
+
+def fetch_spore_counts(api_query_url):  # noqa: C901
     """
     Fetch spore counts from an online API and return as CSV string.
 
@@ -23,15 +27,6 @@ def fetch_spore_counts(api_query_url, logfile=None):  # noqa: C901
     ``check_spore_counts``.  Returns None if the request or parsing fails.
     """
 
-    def log_message(msg):
-        print(msg)
-        if logfile is not None:
-            try:
-                with open(logfile, "a") as f:
-                    f.write(msg + "\n")
-            except Exception as e:
-                print(f"Warning: Could not write to logfile: {e}")
-
     import requests
 
     try:
@@ -43,15 +38,25 @@ def fetch_spore_counts(api_query_url, logfile=None):  # noqa: C901
         datetime_list = mildiou.get("date", [])
         mildiou_list = mildiou.get("count", [])
         if not datetime_list:
-            log_message("No Mildiou.date found in spore counts API response.")
+            run_logging.log_and_print(
+                logger,
+                "No Mildiou.date found in spore counts API response.",
+                logging.WARNING,
+            )
             return None
         if not mildiou_list:
-            log_message("No Mildiou.count found in spore counts API response.")
+            run_logging.log_and_print(
+                logger,
+                "No Mildiou.count found in spore counts API response.",
+                logging.WARNING,
+            )
             return None
         if len(datetime_list) != len(mildiou_list):
-            log_message(
+            run_logging.log_and_print(
+                logger,
                 f"Length mismatch: Mildiou.date ({len(datetime_list)}) vs "
-                f"Mildiou.count ({len(mildiou_list)}). Truncating to shortest."
+                f"Mildiou.count ({len(mildiou_list)}). Truncating to shortest.",
+                logging.WARNING,
             )
             min_len = min(len(datetime_list), len(mildiou_list))
             datetime_list = datetime_list[:min_len]
@@ -66,7 +71,11 @@ def fetch_spore_counts(api_query_url, logfile=None):  # noqa: C901
                 continue
 
         if not parsed:
-            log_message("No valid datetimes parsed from spore counts API response.")
+            run_logging.log_and_print(
+                logger,
+                "No valid datetimes parsed from spore counts API response.",
+                logging.WARNING,
+            )
             return None
 
         # Aggregate: sum n_mildiou_list counts per calendar day.
@@ -76,20 +85,22 @@ def fetch_spore_counts(api_query_url, logfile=None):  # noqa: C901
         daily["Date"] = pd.to_datetime(daily["date"]).dt.strftime("%d.%m.%Y") + " 00:00"
         result_df = daily[["Date", "Counts"]]
 
-        log_message(
+        run_logging.log_and_print(
+            logger,
             f"Fetched spore counts: {len(result_df)} days, "
-            f"{result_df['Counts'].sum()} total events."
+            f"{result_df['Counts'].sum()} total events.",
         )
         return result_df.to_csv(index=False, sep=";")
 
     except Exception as e:
-        log_message(f"Error fetching spore counts from API: {e}")
+        run_logging.log_and_print(
+            logger, f"Error fetching spore counts from API: {e}", logging.ERROR
+        )
         return None
 
 
 def check_spore_counts(  # noqa: C901
     spore_counts_filepath,
-    logfile=None,
     spore_count_threshold=10,
     spore_count_lookback_days=3,
     spore_count_percent_increase=20,
@@ -119,9 +130,6 @@ def check_spore_counts(  # noqa: C901
         Date format: "DD.MM.YYYY HH:MM"
         Delimiter: semicolon (;)
 
-    logfile : str, optional
-        Path to logfile for writing status messages
-
     spore_count_threshold : int or float, optional
         Flat daily count threshold; if any day exceeds this value condition 1 is met.
         Default: 10.
@@ -159,16 +167,6 @@ def check_spore_counts(  # noqa: C901
             Message describing the analysis results.
     """
 
-    def log_message(msg):
-        """Helper function to write to logfile and console."""
-        print(msg)
-        if logfile is not None:
-            try:
-                with open(logfile, "a") as f:
-                    f.write(msg + "\n")
-            except Exception as e:
-                print(f"Warning: Could not write to logfile: {e}")
-
     try:
         # Read and sort the spore counts file
         df = pd.read_csv(spore_counts_filepath, delimiter=";")
@@ -186,15 +184,16 @@ def check_spore_counts(  # noqa: C901
             ].copy()
             _after = len(df)
             if _before != _after:
-                log_message(
+                run_logging.log_and_print(
+                    logger,
                     f"Season window [{_sw_start} – {_sw_end}]: "
                     f"filtered {_before - _after} out-of-season record(s), "
-                    f"{_after} remaining."
+                    f"{_after} remaining.",
                 )
 
         if df.empty:
             msg = "Spore counts file is empty. No model shortcut will be triggered."
-            log_message(msg)
+            run_logging.log_and_print(logger, msg)
             return {
                 "skip_to_dispersion": False,
                 "dispersion_datetimes": [],
@@ -214,7 +213,7 @@ def check_spore_counts(  # noqa: C901
 
         if daily.empty:
             msg = "Spore counts file has no valid dates."
-            log_message(msg)
+            run_logging.log_and_print(logger, msg)
             return {
                 "skip_to_dispersion": False,
                 "dispersion_datetimes": [],
@@ -270,7 +269,7 @@ def check_spore_counts(  # noqa: C901
             f"{skip_to_sporulation} → {len(sporulation_datetimes)} triggering window(s) detected"
         )
 
-        log_message(analysis_msg)
+        run_logging.log_and_print(logger, analysis_msg)
 
         return {
             "skip_to_dispersion": skip_to_dispersion,
@@ -282,7 +281,7 @@ def check_spore_counts(  # noqa: C901
 
     except FileNotFoundError:
         msg = f"Spore counts file not found: {spore_counts_filepath}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, logging.WARNING)
         return {
             "skip_to_dispersion": False,
             "dispersion_datetimes": [],
@@ -293,7 +292,7 @@ def check_spore_counts(  # noqa: C901
 
     except Exception as e:
         msg = f"Error reading spore counts file: {str(e)}"
-        log_message(msg)
+        run_logging.log_and_print(logger, msg, logging.ERROR)
         return {
             "skip_to_dispersion": False,
             "dispersion_datetimes": [],
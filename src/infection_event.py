@@ -3,13 +3,25 @@ InfectionEvent class defition script for object-oriented instancing of infection
 
 """
 
+import multiprocessing
+
 import infection_model
+import numpy as np
+import run_logging
+from infection_registry import InfectionRegistry
+from stage_cache import StageCache
+from stage_metrics import StageMetrics
+from tqdm import tqdm
+
+# Run-wide arguments of the worker processes, set once per worker by init_worker.
+worker_arguments = {}
 
 
 class InfectionEvent:
     """
     Class InfectionEvent to compute and print out individual instances
-    of infection predictions at different datetimes across the input timeseries.
+    of infection predictions at different datetimes across the input timeseries
+    (a WeatherSeries built from the processed data).
 
     """
 
@@ -19,11 +31,13 @@ class InfectionEvent:
         parameters,
         start_event_rowindex,
         oospore_maturation_date,
-        daily_mean_temperatures,
+        daily_weather,
+        daily_infection_strengths,
         algorithmic_time_steps,
-        logfile,
-        oospore_infection_datetimes,
+        oospore_infection_registry,
         spore_counts_result=None,
+        stage_cache=None,
+        stage_metrics=None,
     ):
         """
         Object initialisation function.
@@ -33,13 +47,17 @@ class InfectionEvent:
         self.parameters = parameters
         self.start_event_rowindex = start_event_rowindex
         self.oospore_maturation_date = oospore_maturation_date
-        self.daily_mean_temperatures = daily_mean_temperatures
+        self.daily_weather = daily_weather
+        self.daily_infection_strengths = daily_infection_strengths
         self.algorithmic_time_steps = algorithmic_time_steps
-        self.logfile = logfile
-        self.oospore_infection_datetimes = oospore_infection_datetimes
+        self.oospore_infection_registry = oospore_infection_registry
         self.spore_counts_result = spore_counts_result
-        self.start_event_datetime = timeseries["datetime"][self.start_event_rowindex]
+        self.stage_cache = stage_cache
+        self.stage_metrics = stage_metrics
+        self.start_event_datetime = timeseries.datetime[self.start_event_rowindex]
         self.id = start_event_rowindex
+        # Stage row indexes and furthest row read by the infection chain, see run_state.
+        self.chain_state = {}
 
     def predict_infection(self):
         """
@@ -51,11 +69,14 @@ class InfectionEvent:
             self.parameters,
             self.start_event_rowindex,
             self.oospore_maturation_date,
-            self.daily_mean_temperatures,
+            self.daily_weather,
+            self.daily_infection_strengths,
             self.algorithmic_time_steps,
-            self.logfile,
-            self.oospore_infection_datetimes,
+            self.oospore_infection_registry,
             self.spore_counts_result,
+            self.stage_cache,
+            self.chain_state,
+            self.stage_metrics,
         )
 
     def __str__(self):
@@ -64,3 +85,271 @@ class InfectionEvent:
 
         """
         return f"{self.id}: START:{self.start_event_datetime}: EVENTS:{self.infection_events}"
+
+
+""" Parallel execution of the start-row loop """
+
+
+def init_worker(
+    timeseries,
+    parameters,
+    oospore_maturation_date,
+    daily_weather,
+    daily_infection_strengths,
+    algorithmic_time_steps,
+    collect_stage_metrics=False,
+):
+    """
+    Worker initialisation function, storing the run-wide arguments once per worker
+    process (inherited when processes are forked) instead of sending them per task.
+    Log records of the worker are written at once, as its buffer is not flushed
+    when the worker exits.
+
+    """
+    run_logging.unbuffer_run_logging()
+    worker_arguments.update(
+        timeseries=timeseries,
+        parameters=parameters,
+        oospore_maturation_date=oospore_maturation_date,
+        daily_weather=daily_weather,
+        daily_infection_strengths=daily_infection_strengths,
+        algorithmic_time_steps=algorithmic_time_steps,
+        collect_stage_metrics=collect_stage_metrics,
+    )
+
+
+def predict_infection_chunk(start_event_rowindexes):
+    """
+    Worker function predicting the infection events of a chunk of consecutive start
+    rows, with its own infection registry, stage cache and stage metrics.
+
+    return
+    : list of (start row index, infection events, chain state), stage cache hits, stage cache misses, stage metrics counters (None if disabled)
+
+    """
+    oospore_infection_registry = InfectionRegistry()
+    stage_cache = StageCache()
+    stage_metrics = (
+        StageMetrics() if worker_arguments["collect_stage_metrics"] else None
+    )
+    chunk_infection_events = []
+    for start_event_rowindex in start_event_rowindexes:
+        infection_prediction = InfectionEvent(
+            worker_arguments["timeseries"],
+            worker_arguments["parameters"],
+            start_event_rowindex,
+            worker_arguments["oospore_maturation_date"],
+            worker_arguments["daily_weather"],
+            worker_arguments["daily_infection_strengths"],
+            worker_arguments["algorithmic_time_steps"],
+            oospore_infection_registry,
+            None,
+            stage_cache,
+            stage_metrics,
+        )
+        infection_prediction.predict_infection()
+        chunk_infection_events.append(
+            (
+                start_event_rowindex,
+                infection_prediction.infection_events,
+                infection_prediction.chain_state,
+            )
+        )
+    return (
+        chunk_infection_events,
+        stage_cache.hits,
+        stage_cache.misses,
+        stage_metrics.get_counters() if stage_metrics is not None else None,
+    )
+
+
+def get_start_rowindex_chunks(start_event_rowindexes, number_of_rows, number_of_chunks):
+    """
+    Function splitting the start rows into consecutive chunks of about equal
+    estimated cost, taken as the number of rows left to scan after each start row,
+    so that early-season chunks hold fewer start rows than late-season ones.
+
+    """
+    start_event_rowindexes = np.asarray(start_event_rowindexes)
+    cumulative_costs = np.cumsum(number_of_rows - start_event_rowindexes)
+    chunk_bounds = np.searchsorted(
+        cumulative_costs,
+        np.linspace(0, cumulative_costs[-1], number_of_chunks + 1)[1:-1],
+    )
+    return [
+        chunk.tolist()
+        for chunk in np.split(start_event_rowindexes, chunk_bounds)
+        if len(chunk) > 0
+    ]
+
+
+def predict_infections_in_pool(
+    timeseries,
+    parameters,
+    start_event_rowindexes,
+    oospore_maturation_date,
+    daily_weather,
+    daily_infection_strengths,
+    algorithmic_time_steps,
+    stage_cache,
+    workers,
+    show_progress=False,
+    stage_metrics=None,
+):
+    """
+    Function predicting the infection events of the given start rows with a pool
+    of worker processes. Chunks of consecutive start rows only de-duplicate oospore
+    infections among their own start rows, so the results still have to be
+    reconciled against the run registry in start-row order, see predict_infections.
+    The stage metrics of the workers, if any, are added to stage_metrics.
+
+    return
+    : dictionary of (infection events, chain state) per start row index
+
+    """
+    if len(start_event_rowindexes) == 0:
+        return {}
+    chunks = get_start_rowindex_chunks(
+        start_event_rowindexes, len(timeseries), 4 * workers
+    )
+    infection_events = {}
+    # Buffered log records are written before forking, so that workers do not
+    # inherit and write them again.
+    run_logging.flush_run_logging()
+    context = multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    )
+    with context.Pool(
+        workers,
+        initializer=init_worker,
+        initargs=(
+            timeseries,
+            parameters,
+            oospore_maturation_date,
+            daily_weather,
+            daily_infection_strengths,
+            algorithmic_time_steps,
+            stage_metrics is not None,
+        ),
+    ) as pool:
+        progress_bar = tqdm(
+            total=len(start_event_rowindexes), disable=not show_progress
+        )
+        for chunk_infection_events, hits, misses, metrics_counters in pool.imap(
+            predict_infection_chunk, chunks
+        ):
+            stage_cache.add_counters(hits, misses)
+            if metrics_counters is not None:
+                stage_metrics.add_counters(*metrics_counters)
+            for start_event_rowindex, events, chain_state in chunk_infection_events:
+                infection_events[start_event_rowindex] = (events, chain_state)
+            progress_bar.update(len(chunk_infection_events))
+        progress_bar.close()
+    return infection_events
+
+
+def predict_infections(
+    timeseries,
+    parameters,
+    start_event_rowindexes,
+    oospore_maturation_date,
+    daily_weather,
+    daily_infection_strengths,
+    algorithmic_time_steps,
+    oospore_infection_registry,
+    stage_cache,
+    stage_metrics=None,
+    workers=1,
+    previous_run_state=None,
+    first_changed_rowindex=0,
+    show_progress=False,
+):
+    """
+    Generator predicting the infection events of the start rows of the model loop,
+    in start-row order, yielding each InfectionEvent and whether its infection
+    chain was reused from the previous run (previous_run_state, see run_state).
+
+    With more than one worker, the start rows whose previous chain is affected by
+    changed weather rows are first computed by a pool of worker processes. Their
+    results are reconciled here, in start-row order, against the run registry,
+    which also holds the oospore infections of the reused chains: a chain whose
+    oospore infection was already registered by an earlier start row of another
+    chunk is predicted again, which stops it after dispersion exactly as in a
+    serial run.
+
+    """
+    parallel_infection_events = None
+    if workers > 1:
+        parallel_infection_events = predict_infections_in_pool(
+            timeseries,
+            parameters,
+            [
+                start_event_rowindex
+                for start_event_rowindex in start_event_rowindexes
+                if previous_run_state is None
+                or previous_run_state.get_unaffected_chain(
+                    start_event_rowindex, first_changed_rowindex
+                )
+                is None
+            ],
+            oospore_maturation_date,
+            daily_weather,
+            daily_infection_strengths,
+            algorithmic_time_steps,
+            stage_cache,
+            workers,
+            show_progress,
+            stage_metrics,
+        )
+
+    for start_event_rowindex in start_event_rowindexes:
+        infection_prediction = InfectionEvent(
+            timeseries,
+            parameters,
+            start_event_rowindex,
+            oospore_maturation_date,
+            daily_weather,
+            daily_infection_strengths,
+            algorithmic_time_steps,
+            oospore_infection_registry,
+            None,  # shortcut events are predicted separately by main.py
+            stage_cache,
+            stage_metrics,
+        )
+        previous_chain = (
+            previous_run_state.get_reusable_chain(
+                start_event_rowindex, first_changed_rowindex, oospore_infection_registry
+            )
+            if previous_run_state is not None
+            else None
+        )
+        if previous_chain is not None:
+            (
+                infection_prediction.infection_events,
+                infection_prediction.chain_state,
+            ) = previous_chain
+            if infection_prediction.chain_state["is_registered"]:
+                oospore_infection_registry.register(
+                    infection_prediction.chain_state["oospore_infection_rowindex"],
+                    infection_prediction.infection_events["oospore_infection"],
+                )
+            yield infection_prediction, True
+            continue
+
+        if (
+            parallel_infection_events is None
+            or start_event_rowindex not in parallel_infection_events
+        ):
+            infection_prediction.predict_infection()
+        else:
+            events, chain_state = parallel_infection_events[start_event_rowindex]
+            if chain_state["is_registered"] and not oospore_infection_registry.register(
+                chain_state["oospore_infection_rowindex"], events["oospore_infection"]
+            ):
+                # Predicted again, so that its events and chain state stop at the
+                # registered oospore infection as in a serial run.
+                infection_prediction.predict_infection()
+            else:
+                infection_prediction.infection_events = events
+                infection_prediction.chain_state = chain_state
+        yield infection_prediction, False
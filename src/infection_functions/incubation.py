@@ -6,6 +6,8 @@ Incubation algorithm after successful primary or secondary infection events.
 import datetime
 from math import ceil
 
+import numpy as np
+
 
 def get_incubation_days(mean_daily_temperature):
     """
@@ -25,10 +27,10 @@ def get_incubation_days(mean_daily_temperature):
 
 
 def launch_incubation(
-    processed_data,
+    weather,
     infection_datetime,
     infection_datetime_rowindex,
-    mean_daily_temperatures,
+    daily_weather,
     measurement_time_interval,
 ):
     """
@@ -40,8 +42,11 @@ def launch_incubation(
     first_incubation_day = infection_datetime.date()
     incubation_day = first_incubation_day
 
-    while incubation_progress < 1 and incubation_day in mean_daily_temperatures.keys():
-        mean_daily_temperature = mean_daily_temperatures[incubation_day]
+    mean_daily_temperatures = daily_weather.mean("temperature")
+    while incubation_progress < 1 and incubation_day in daily_weather:
+        mean_daily_temperature = mean_daily_temperatures[
+            daily_weather.date_positions[incubation_day]
+        ]
         incubation_days = get_incubation_days(mean_daily_temperature)
         incubation_progress_step = 1 / incubation_days
         incubation_progress += incubation_progress_step
@@ -64,12 +69,150 @@ def launch_incubation(
             * 60  # hours to minutes conversion
             / measurement_time_interval  # minutes to measurement interval conversion
         )
-        if end_incubation_datetime_rowindex < len(processed_data):
-            end_incubation_datetime = processed_data["datetime"][end_incubation_datetime_rowindex]
+        if end_incubation_datetime_rowindex < len(weather):
+            end_incubation_datetime = weather.datetime[end_incubation_datetime_rowindex]
         else:
             end_incubation_datetime = None
-            
+
     else:
         return None, None, None
 
     return incubation_days, end_incubation_datetime, end_incubation_datetime_rowindex
+
+
+""" Cumulative incubation-progress index """
+
+
+def incubation_progress_index(daily_weather):
+    """
+    Builds the season-wide incubation-progress index of the timeseries: the daily
+    incubation increments (1 / incubation days at the daily mean temperature),
+    their cumulative sum, and the day on which incubation completes for an
+    infection on each day, resolved for all days in one batched call.
+
+    return
+    : incubation days per day, last incubation day position per day (-1 if incubation does not complete)
+
+    """
+    incubation_days = np.array(
+        [
+            get_incubation_days(mean_daily_temperature)
+            for mean_daily_temperature in daily_weather.mean("temperature")
+        ]
+    )
+    incubation_progress_steps = 1 / incubation_days
+    last_incubation_day_positions = get_last_incubation_day_positions(
+        daily_weather, incubation_progress_steps, np.arange(len(daily_weather))
+    )
+    return incubation_days, last_incubation_day_positions
+
+
+def get_last_incubation_day_positions(
+    daily_weather, incubation_progress_steps, first_incubation_day_positions
+):
+    """
+    Returns, for each first incubation day position, the position of the day on
+    which the incubation progress reaches 1, or -1 if it does not complete before
+    the next missing day (a date gap or a day without mean temperature).
+
+    The candidate day is found by a searchsorted on the cumulative sum of the
+    daily increments. The few days around it are then summed again from the first
+    incubation day, in the same order as launch_incubation, so that the result
+    does not depend on the rounding of the season-wide cumulative sum.
+
+    """
+    dates = daily_weather.dates
+    number_of_days = len(dates)
+    # Last position of the run of consecutive, fully measured days starting at each day.
+    is_run_end = np.isnan(incubation_progress_steps[1:]) | (
+        np.array(
+            [
+                (later - earlier).days
+                for earlier, later in zip(dates[:-1], dates[1:], strict=True)
+            ]
+        )
+        != 1
+    )
+    run_ends = np.flatnonzero(np.r_[is_run_end, True])
+    last_valid_positions = run_ends[
+        np.searchsorted(run_ends, np.arange(number_of_days))
+    ]
+
+    cumulative_progress = np.cumsum(np.nan_to_num(incubation_progress_steps, nan=0.0))
+    last_incubation_day_positions = []
+    for first_position in first_incubation_day_positions:
+        if np.isnan(incubation_progress_steps[first_position]):
+            last_incubation_day_positions.append(-1)
+            continue
+        previous_progress = (
+            cumulative_progress[first_position - 1] if first_position > 0 else 0.0
+        )
+        candidate_position = np.searchsorted(
+            cumulative_progress, previous_progress + 1, side="left"
+        )
+        window_end = min(
+            candidate_position + 2, last_valid_positions[first_position] + 1
+        )
+        incubation_progress = np.cumsum(
+            incubation_progress_steps[first_position:window_end]
+        )
+        is_complete = incubation_progress >= 1
+        last_incubation_day_positions.append(
+            first_position + int(is_complete.argmax()) if is_complete.any() else -1
+        )
+    return np.array(last_incubation_day_positions, dtype=np.int64)
+
+
+def lookup_incubation(
+    weather,
+    infection_datetime,
+    infection_datetime_rowindex,
+    daily_weather,
+    measurement_time_interval,
+):
+    """
+    Function returning the same incubation event as launch_incubation, looked up
+    in the season-wide incubation-progress index instead of walking day by day.
+
+    """
+    incubation_days, last_incubation_day_positions = daily_weather.precomputed(
+        "incubation_progress_index", incubation_progress_index
+    )
+    first_incubation_day = infection_datetime.date()
+    if first_incubation_day not in daily_weather:
+        return None, None, None
+    first_position = daily_weather.date_positions[first_incubation_day]
+    last_position = last_incubation_day_positions[first_position]
+    if last_position < 0:
+        return None, None, None
+
+    total_incubation_days = int(last_position - first_position + 1)
+    end_incubation_datetime_rowindex = infection_datetime_rowindex + ceil(
+        total_incubation_days * 24 * 60 / measurement_time_interval
+    )
+    if end_incubation_datetime_rowindex < len(weather):
+        end_incubation_datetime = weather.datetime[end_incubation_datetime_rowindex]
+    else:
+        end_incubation_datetime = None
+
+    return (
+        incubation_days[last_position],
+        end_incubation_datetime,
+        end_incubation_datetime_rowindex,
+    )
+
+
+def get_last_incubation_day(daily_weather, infection_datetime):
+    """
+    Returns the date of the last incubation day found by lookup_incubation for an
+    infection at the given datetime, whose incubation completes.
+
+    """
+    _incubation_days, last_incubation_day_positions = daily_weather.precomputed(
+        "incubation_progress_index", incubation_progress_index
+    )
+    return daily_weather.dates[
+        last_incubation_day_positions[
+            daily_weather.date_positions[infection_datetime.date()]
+        ]
+    ]
@@ -8,8 +8,7 @@ def oospore_maturation(
     processed_data,
     oospore_maturation_base_temperature,
     oospore_maturation_sum_degree_days_threshold,
-    daily_temperatures,
-    daily_mean_temperatures,
+    daily_weather,
 ):
     """
     Function returning the datetime (datetime and row index) at which activation
@@ -27,6 +26,9 @@ def oospore_maturation(
     argument3
     : sdd_maturation_threshold
 
+    argument4
+    : DailyAggregates of the processed timeseries
+
     return
     : maturation_date, maturation_datetime_rowindex
 
@@ -35,12 +37,10 @@ def oospore_maturation(
     oospore_maturation_date = None
     oospore_maturation_datetime_rowindex = None
     sum_degree_days = 0
-    # temps_per_days = utils.get_measurements_per_days(processed_data, "temperature")
-    # avg_temps_per_days = utils.get_average_measurements_per_days(
-    #     processed_data, "temperature"
-    # )
-    for day in daily_mean_temperatures.keys():
-        daily_mean_temperature = daily_mean_temperatures[day]
+    daily_mean_temperatures = daily_weather.mean("temperature")
+    for day, daily_mean_temperature in zip(
+        daily_weather.dates, daily_mean_temperatures, strict=True
+    ):
         if daily_mean_temperature > oospore_maturation_base_temperature:
             sum_degree_days = (
                 sum_degree_days
@@ -50,9 +50,7 @@ def oospore_maturation(
         if sum_degree_days >= oospore_maturation_sum_degree_days_threshold:
             oospore_maturation_date = day
             # Extracting the first datetime row index corresponding to the maturation day. Needed for quicker access to row index for data splicing in next algorithm.
-            oospore_maturation_datetime_rowindex = sorted(
-                daily_temperatures[day].keys()
-            )[0]
+            oospore_maturation_datetime_rowindex = daily_weather.first_rowindex(day)
             break
     # Returning the row index considerably speeds up the program, as no matching search needs to be performed to find the starting datetime for the following steps of the model.
     return oospore_maturation_date, oospore_maturation_datetime_rowindex
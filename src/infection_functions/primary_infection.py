@@ -4,11 +4,16 @@ Primary infection algorithms.
 """
 from math import ceil
 
+import numpy as np
+import run_logging
+
+logger = run_logging.get_logger(__name__)
+
 """ Stage 1: oospore germination """
 
 
 def oospore_germination(  # noqa: C901
-    processed_data,
+    weather,
     start_event_rowindex,
     oospore_germination_relative_humidity_threshold,
     oospore_germination_base_temperature,
@@ -20,7 +25,6 @@ def oospore_germination(  # noqa: C901
     moisturization_rainfall_period,
     measurement_time_interval,
     algorithmic_time_steps,
-    logfile,
 ):
     """
     Function returning the datetime (datetime and row index) at which activation
@@ -33,33 +37,33 @@ def oospore_germination(  # noqa: C901
     oospore_germination_datetime = None
     oospore_germination_datetime_rowindex = None
 
+    temperature = weather.temperature
+    rainfall = weather.rainfall
+    time = weather.time
+
     cumulative_datetime = 0
-    start_conditions_datetime = processed_data["datetime"][start_event_rowindex]
+    start_conditions_time = time[start_event_rowindex]
 
     # If specified, use algorithm 1, oospore development
     if oospore_germination_algorithm == 1:
-        for i in range(
-            start_event_rowindex, len(processed_data.index) - 1, algorithmic_time_steps
-        ):
-            if processed_data["temperature"][i] > oospore_germination_base_temperature:
+        humidity = weather.humidity
+        leaf_wetness = weather.leaf_wetness
+        for i in range(start_event_rowindex, len(weather) - 1, algorithmic_time_steps):
+            if temperature[i] > oospore_germination_base_temperature:
                 if (
-                    processed_data["humidity"][i]
-                    > oospore_germination_relative_humidity_threshold
-                    or processed_data["leaf_wetness"][i]
-                    >= oospore_germination_leaf_wetness_threshold
+                    humidity[i] > oospore_germination_relative_humidity_threshold
+                    or leaf_wetness[i] >= oospore_germination_leaf_wetness_threshold
                 ):
-                    cumulative_datetime = (
-                        processed_data["datetime"][i] - start_conditions_datetime
-                    )
-                    cumulative_datetime = cumulative_datetime.total_seconds()
+                    # Elapsed seconds since favourable conditions started.
+                    cumulative_datetime = time[i] - start_conditions_time
                     if (
                         cumulative_datetime >= oospore_germination_base_duration * 3600
                     ):  # hours to seconds conversion
-                        oospore_germination_datetime = processed_data["datetime"][i]
+                        oospore_germination_datetime = weather.datetime[i]
                         oospore_germination_datetime_rowindex = i
                         break
                 else:
-                    start_conditions_datetime = processed_data["datetime"][i]
+                    start_conditions_time = time[i]
 
     ## If specified, use algorithm 2, moisture penetration
 
@@ -106,21 +110,17 @@ def oospore_germination(  # noqa: C901
             moisturization_rainfall_period * 60 / measurement_time_interval
         )
         # Start the search for the datetimes where we obtain the required cumulative rainfall
-        for i in range(
-            start_event_rowindex, len(processed_data.index), algorithmic_time_steps
-        ):
+        for i in range(start_event_rowindex, len(weather), algorithmic_time_steps):
             # Allow the possibility that the required cumulative rainfall is obtained in less than
             # the allowed period, so to reach all the rows even approaching the end of the dataset.
-            rainfall_period_index = min(
-                i + rainfall_period_range, len(processed_data.index) - 1
-            )
+            rainfall_period_index = min(i + rainfall_period_range, len(weather) - 1)
             # Extract the hourly rainfall intensities values and correct them by the sampling interval factor.
             # i.e. convert the measurement time interval from minutes to hours and multiply it by the
             # hourly rainfall intensity values, so to obtain an effective cumulative rainfall list of values
             # corresponding to the effective sampling interval.
             rainfalls = tuple(
-                (measurement_time_interval / 60) * rainfall
-                for rainfall in processed_data["rainfall"][i:rainfall_period_index]
+                (measurement_time_interval / 60) * rainfall_intensity
+                for rainfall_intensity in rainfall[i:rainfall_period_index]
             )
             # If the sum is equal or exceeds the required threshold, then continue to find the exact row index at
             # which we reached the condition, so to capture the earlist datetime also when this happens
@@ -137,9 +137,7 @@ def oospore_germination(  # noqa: C901
                 successful_cumulative_rainfall_index = i + j
                 # We extract the temperatures on the given subset of indexes.
                 temperatures = tuple(
-                    processed_data["temperature"][
-                        i:successful_cumulative_rainfall_index
-                    ]
+                    temperature[i:successful_cumulative_rainfall_index]
                 )
                 # We check that the temperature never drops below the allowed threshold across the whole period of
                 # successful cumulative rainfall.
@@ -152,7 +150,7 @@ def oospore_germination(  # noqa: C901
                 # If the temperature check is successful, then we store the row index at the end of the
                 # rainfall accumulation period as our germination datetime.
                 else:
-                    oospore_germination_datetime = processed_data["datetime"][
+                    oospore_germination_datetime = weather.datetime[
                         successful_cumulative_rainfall_index
                     ]
                     oospore_germination_datetime_rowindex = (
@@ -215,18 +213,367 @@ def oospore_germination(  # noqa: C901
         #         cumulative_rainfall = 0
 
     else:
-        with open(logfile, "a") as logf:
-            logf.write(
-                "\nWARNING: could not read a valid oospore germination algorithm number from the config file.\n"
-            )
+        logger.warning(
+            "\nCould not read a valid oospore germination algorithm number from the config file.\n"
+        )
     return (oospore_germination_datetime, oospore_germination_datetime_rowindex)
 
 
+def next_true_rowindexes(mask, algorithmic_time_steps=1):
+    """
+    Function returning, for every row, the first row index at or after it (moving
+    forward by algorithmic_time_steps, i.e. within the same sequence of rows visited
+    by the search loops) at which mask is True, or len(mask) if there is none.
+    Computed with a reverse sweep (running minimum) per row sequence.
+
+    """
+    number_of_rows = len(mask)
+    rowindexes = np.where(mask, np.arange(number_of_rows), number_of_rows)
+    for offset in range(algorithmic_time_steps):
+        rowindexes[offset::algorithmic_time_steps] = np.minimum.accumulate(
+            rowindexes[offset::algorithmic_time_steps][::-1]
+        )[::-1]
+    return rowindexes
+
+
+def oospore_development_germination_map(
+    weather,
+    oospore_germination_relative_humidity_threshold,
+    oospore_germination_base_temperature,
+    oospore_germination_base_duration,
+    oospore_germination_leaf_wetness_threshold,
+    algorithmic_time_steps,
+):
+    """
+    Batch version of algorithm 1 (oospore development) of oospore_germination,
+    returning the germination row index for every start row of the season at once
+    (-1 where germination conditions are never met).
+
+    Rows visited by the per-row search are either favourable (temperature above base
+    and humidity or leaf wetness above threshold), resetting (temperature above base
+    but neither moisture condition met) or neutral (too cold or missing). From a start
+    row, favourable conditions are counted from the start datetime up to the first
+    resetting row, and from the latest resetting row afterwards. The first part is
+    solved with searchsorted on the datetimes, the second one does not depend on the
+    start row and is solved once with the index of the latest resetting row.
+
+    return
+    : numpy array of oospore germination row indexes per start row index
+
+    """
+    number_of_rows = len(weather)
+    rowindexes = np.arange(number_of_rows)
+    time = weather.time
+    base_duration = oospore_germination_base_duration * 3600  # hours to seconds
+
+    # The last row is never visited by the per-row search.
+    is_visited = rowindexes < number_of_rows - 1
+    is_warm = is_visited & (weather.temperature > oospore_germination_base_temperature)
+    is_moist = (weather.humidity > oospore_germination_relative_humidity_threshold) | (
+        weather.leaf_wetness >= oospore_germination_leaf_wetness_threshold
+    )
+    is_favourable = is_warm & is_moist
+    is_resetting = is_warm & ~is_moist
+
+    next_favourable_rowindexes = next_true_rowindexes(
+        is_favourable, algorithmic_time_steps
+    )
+    next_resetting_rowindexes = next_true_rowindexes(
+        is_resetting, algorithmic_time_steps
+    )
+
+    # Latest resetting row at or before each row, within the same sequence of rows.
+    last_resetting_rowindexes = np.where(is_resetting, rowindexes, -1)
+    for offset in range(algorithmic_time_steps):
+        last_resetting_rowindexes[
+            offset::algorithmic_time_steps
+        ] = np.maximum.accumulate(
+            last_resetting_rowindexes[offset::algorithmic_time_steps]
+        )
+    has_reset = last_resetting_rowindexes >= 0
+    is_germinating = is_favourable & has_reset
+    is_germinating[is_germinating] = (
+        time[is_germinating] - time[last_resetting_rowindexes[is_germinating]]
+        >= base_duration
+    )
+    next_germinating_rowindexes = np.append(
+        next_true_rowindexes(is_germinating, algorithmic_time_steps), number_of_rows
+    )
+
+    # Before the first resetting row: first favourable row, in the sequence of rows of
+    # the start row, lying at least base_duration after the start datetime.
+    elapsed_rowindexes = np.maximum(
+        np.searchsorted(time, time + base_duration, side="left"), rowindexes
+    )
+    elapsed_rowindexes += (rowindexes - elapsed_rowindexes) % algorithmic_time_steps
+    first_germination_rowindexes = np.append(
+        next_favourable_rowindexes, number_of_rows
+    )[np.minimum(elapsed_rowindexes, number_of_rows)]
+
+    oospore_germination_rowindexes = np.where(
+        first_germination_rowindexes < next_resetting_rowindexes,
+        first_germination_rowindexes,
+        next_germinating_rowindexes[next_resetting_rowindexes],
+    )
+    oospore_germination_rowindexes[
+        oospore_germination_rowindexes >= number_of_rows
+    ] = -1
+    return oospore_germination_rowindexes
+
+
+def moisture_penetration_germination_map(
+    weather,
+    moisturization_temperature_threshold,
+    moisturization_rainfall_threshold,
+    moisturization_rainfall_period,
+    measurement_time_interval,
+    algorithmic_time_steps,
+):
+    """
+    Batch version of algorithm 2 (moisture penetration) of oospore_germination,
+    returning the germination row index for every start row of the season at once
+    (-1 where germination conditions are never met).
+
+    Each candidate row i of the per-row search either succeeds, at the row where the
+    running rainfall sum over its window first reaches the threshold, or fails,
+    independently of the start row. Candidates are solved all together with cumulative
+    rainfall sums and searchsorted, the temperature check (minimum temperature above
+    threshold between i and the germination row) with the index of the next too-cold
+    row, and the result of each start row is the one of its first successful candidate.
+
+    Cumulative sums are not bitwise equal to the running sums of the per-row search,
+    so rows whose sums fall within rounding distance of the threshold are re-summed
+    exactly as in oospore_germination. The running sum starting at a dry row is the one
+    starting at the next rainy row, hence each rainy row is re-summed at most once.
+
+    return
+    : numpy array of oospore germination row indexes per start row index
+
+    """
+    number_of_rows = len(weather)
+    rowindexes = np.arange(number_of_rows)
+
+    # Same window as in oospore_germination: [i, rainfall_period_index[i]).
+    rainfall_period_range = int(
+        moisturization_rainfall_period * 60 / measurement_time_interval
+    )
+    rainfall_period_indexes = np.minimum(
+        rowindexes + rainfall_period_range, number_of_rows - 1
+    )
+
+    # Rainfall per measurement interval, as in oospore_germination.
+    rainfalls = (measurement_time_interval / 60) * weather.rainfall
+    is_missing = np.isnan(rainfalls)
+    cumulative_rainfalls = np.concatenate(
+        ([0.0], np.cumsum(np.where(is_missing, 0.0, rainfalls)))
+    )
+    cumulative_missing = np.concatenate(([0], np.cumsum(is_missing)))
+
+    # A missing value anywhere in the window makes the rainfall sum NaN, i.e. failing.
+    is_complete = (
+        cumulative_missing[rainfall_period_indexes] == cumulative_missing[rowindexes]
+    )
+    window_rainfalls = (
+        cumulative_rainfalls[rainfall_period_indexes] - cumulative_rainfalls[rowindexes]
+    )
+    is_rainy = is_complete & (window_rainfalls >= moisturization_rainfall_threshold)
+
+    # Row at which the running rainfall sum first reaches the threshold.
+    target_rainfalls = cumulative_rainfalls[:-1] + moisturization_rainfall_threshold
+    reached_rowindexes = np.searchsorted(
+        cumulative_rainfalls, target_rainfalls, side="left"
+    )
+    germination_rowindexes = np.maximum(reached_rowindexes - 1, rowindexes)
+
+    if moisturization_rainfall_threshold > 0:
+        # Resolve sums lying within rounding distance of the threshold exactly.
+        tolerance = (
+            4
+            * np.finfo(np.float64).eps
+            * (number_of_rows + 1)
+            * (cumulative_rainfalls[-1] + moisturization_rainfall_threshold + 1)
+        )
+        is_ambiguous = is_complete & (
+            (np.abs(window_rainfalls - moisturization_rainfall_threshold) <= tolerance)
+            | (
+                np.abs(
+                    cumulative_rainfalls[np.minimum(reached_rowindexes, number_of_rows)]
+                    - target_rainfalls
+                )
+                <= tolerance
+            )
+            | (
+                np.abs(
+                    cumulative_rainfalls[np.maximum(reached_rowindexes - 1, 0)]
+                    - target_rainfalls
+                )
+                <= tolerance
+            )
+        )
+        first_rainy_rowindexes = next_true_rowindexes(rainfalls > 0)
+        exact_rowindexes = {}
+        for i in np.flatnonzero(is_ambiguous):
+            first_rainy_rowindex = first_rainy_rowindexes[i]
+            if first_rainy_rowindex not in exact_rowindexes:
+                exact_rowindexes[first_rainy_rowindex] = number_of_rows
+                running_sum = 0
+                for j in range(
+                    first_rainy_rowindex,
+                    min(first_rainy_rowindex + rainfall_period_range, number_of_rows),
+                ):
+                    running_sum += rainfalls[j]
+                    if running_sum >= moisturization_rainfall_threshold:
+                        exact_rowindexes[first_rainy_rowindex] = j
+                        break
+            germination_rowindexes[i] = exact_rowindexes[first_rainy_rowindex]
+            is_rainy[i] = germination_rowindexes[i] < rainfall_period_indexes[i]
+    else:
+        # A non-positive threshold is reached at the first row of every window.
+        germination_rowindexes = rowindexes
+
+    # The temperature must stay above threshold from the candidate row up to (and
+    # excluding) the germination row, i.e. the next too-cold row must not come earlier.
+    next_cold_rowindexes = next_true_rowindexes(
+        weather.temperature <= moisturization_temperature_threshold
+    )
+    is_germinating = is_rainy & (next_cold_rowindexes >= germination_rowindexes)
+
+    # Each start row takes the result of its first successful candidate row.
+    next_germinating_rowindexes = next_true_rowindexes(
+        is_germinating, algorithmic_time_steps
+    )
+    oospore_germination_rowindexes = np.full(number_of_rows, -1)
+    is_found = next_germinating_rowindexes < number_of_rows
+    oospore_germination_rowindexes[is_found] = germination_rowindexes[
+        next_germinating_rowindexes[is_found]
+    ]
+    return oospore_germination_rowindexes
+
+
+def lookup_oospore_germination(
+    weather,
+    start_event_rowindex,
+    oospore_germination_relative_humidity_threshold,
+    oospore_germination_base_temperature,
+    oospore_germination_base_duration,
+    oospore_germination_leaf_wetness_threshold,
+    oospore_germination_algorithm,
+    moisturization_temperature_threshold,
+    moisturization_rainfall_threshold,
+    moisturization_rainfall_period,
+    measurement_time_interval,
+    algorithmic_time_steps,
+):
+    """
+    Function returning the same result as oospore_germination, read from the
+    season-wide germination map, which is computed only once per set of parameters.
+    Falls back to oospore_germination for unknown algorithm numbers, which logs the
+    warning.
+
+    return
+    : oospore_germination_datetime, oospore_germination_datetime_rowindex
+
+    """
+    if oospore_germination_algorithm == 1:
+        oospore_germination_rowindexes = weather.precomputed(
+            (
+                "oospore_germination",
+                oospore_germination_algorithm,
+                oospore_germination_relative_humidity_threshold,
+                oospore_germination_base_temperature,
+                oospore_germination_base_duration,
+                oospore_germination_leaf_wetness_threshold,
+                algorithmic_time_steps,
+            ),
+            oospore_development_germination_map,
+            oospore_germination_relative_humidity_threshold,
+            oospore_germination_base_temperature,
+            oospore_germination_base_duration,
+            oospore_germination_leaf_wetness_threshold,
+            algorithmic_time_steps,
+        )
+    elif oospore_germination_algorithm == 2:
+        oospore_germination_rowindexes = weather.precomputed(
+            (
+                "oospore_germination",
+                oospore_germination_algorithm,
+                moisturization_temperature_threshold,
+                moisturization_rainfall_threshold,
+                moisturization_rainfall_period,
+                measurement_time_interval,
+                algorithmic_time_steps,
+            ),
+            moisture_penetration_germination_map,
+            moisturization_temperature_threshold,
+            moisturization_rainfall_threshold,
+            moisturization_rainfall_period,
+            measurement_time_interval,
+            algorithmic_time_steps,
+        )
+    else:
+        return oospore_germination(
+            weather,
+            start_event_rowindex,
+            oospore_germination_relative_humidity_threshold,
+            oospore_germination_base_temperature,
+            oospore_germination_base_duration,
+            oospore_germination_leaf_wetness_threshold,
+            oospore_germination_algorithm,
+            moisturization_temperature_threshold,
+            moisturization_rainfall_threshold,
+            moisturization_rainfall_period,
+            measurement_time_interval,
+            algorithmic_time_steps,
+        )
+
+    oospore_germination_datetime_rowindex = int(
+        oospore_germination_rowindexes[start_event_rowindex]
+    )
+    if oospore_germination_datetime_rowindex < 0:
+        return None, None
+    return (
+        weather.datetime[oospore_germination_datetime_rowindex],
+        oospore_germination_datetime_rowindex,
+    )
+
+
 """ Stage 2: oospore dispersion """
 
 
+def next_dispersion_rowindexes(
+    weather,
+    oospore_dispersion_rainfall_threshold,
+    measurement_time_interval,
+    algorithmic_time_steps,
+):
+    """
+    Function returning, for every row, the first row index at or after it (within
+    the sequence of rows visited with algorithmic_time_steps) whose rainfall meets
+    the oospore dispersion threshold, or len(weather) if there is none. Built once
+    per threshold with a reverse sweep and cached on the WeatherSeries.
+
+    """
+    # The oospore_dispersion_rainfall_threshold is in mm/h, but each row in
+    # processed_data represents one measurement interval.  Scale the threshold
+    # to the interval so the comparison is in consistent units (mm per interval).
+    adjusted_oospore_dispersion_rainfall_threshold = (
+        oospore_dispersion_rainfall_threshold * measurement_time_interval / 60
+    )
+    return weather.precomputed(
+        (
+            "oospore_dispersion",
+            adjusted_oospore_dispersion_rainfall_threshold,
+            algorithmic_time_steps,
+        ),
+        lambda weather: next_true_rowindexes(
+            weather.rainfall >= adjusted_oospore_dispersion_rainfall_threshold,
+            algorithmic_time_steps,
+        ),
+    )
+
+
 def oospore_dispersion(
-    processed_data,
+    weather,
     measurement_time_interval,
     oospore_germination_datetime_rowindex,
     oospore_dispersion_rainfall_threshold,
@@ -263,30 +610,24 @@ def oospore_dispersion(
 
     # Making sure that we do not go beyond the maximum dataset size
     stop_oospore_dispersion_latency_rowindex = min(
-        stop_oospore_dispersion_latency_rowindex, len(processed_data.index) - 1
+        stop_oospore_dispersion_latency_rowindex, len(weather) - 1
     )
 
     oospore_dispersion_datetime = None
     oospore_dispersion_datetime_rowindex = None
-    for i in range(
-        oospore_germination_datetime_rowindex,
-        stop_oospore_dispersion_latency_rowindex
-        + 1,  # we need to add +1 for Python's range function to actually loop through the last index in the for loop
-        algorithmic_time_steps,
-    ):
-        # The oospore_dispersion_rainfall_threshold is in mm/h, but each row in
-        # processed_data represents one measurement interval.  Scale the threshold
-        # to the interval so the comparison is in consistent units (mm per interval).
-        adjusted_oospore_dispersion_rainfall_threshold = (
-            oospore_dispersion_rainfall_threshold * measurement_time_interval / 60
-        )
-        if (
-            processed_data["rainfall"][i]
-            >= adjusted_oospore_dispersion_rainfall_threshold
-        ):
-            oospore_dispersion_datetime = processed_data["datetime"][i]
-            oospore_dispersion_datetime_rowindex = i
-            break
+    # First row with qualifying rainfall among the rows visited from the germination
+    # row onwards, which disperses if it lies within the latency window.
+    next_dispersion_rowindex = int(
+        next_dispersion_rowindexes(
+            weather,
+            oospore_dispersion_rainfall_threshold,
+            measurement_time_interval,
+            algorithmic_time_steps,
+        )[oospore_germination_datetime_rowindex]
+    )
+    if next_dispersion_rowindex <= stop_oospore_dispersion_latency_rowindex:
+        oospore_dispersion_datetime = weather.datetime[next_dispersion_rowindex]
+        oospore_dispersion_datetime_rowindex = next_dispersion_rowindex
     return (
         oospore_dispersion_datetime,
         oospore_dispersion_datetime_rowindex,
@@ -295,7 +636,7 @@ def oospore_dispersion(
 
 
 def launch_dispersion_loop(
-    processed_data,
+    weather,
     start_event_rowindex,
     oospore_germination_datetime_rowindex,
     oospore_germination_relative_humidity_threshold,
@@ -310,7 +651,6 @@ def launch_dispersion_loop(
     oospore_dispersion_latency,
     measurement_time_interval,
     algorithmic_time_steps,
-    logfile,
 ):
     """
     Function that launches a loop for dispersion datetime search, in case the first run did not succeed.
@@ -326,11 +666,11 @@ def launch_dispersion_loop(
 
     while (
         oospore_dispersion_datetime is None
-        and new_start_event_rowindex < len(processed_data.index)
-        and new_oospore_germination_datetime_rowindex < len(processed_data.index)
+        and new_start_event_rowindex < len(weather)
+        and new_oospore_germination_datetime_rowindex < len(weather)
     ):
         new_oospore_germination_datetime_rowindex += algorithmic_time_steps
-        new_oospore_germination_datetime = processed_data["datetime"][
+        new_oospore_germination_datetime = weather.datetime[
             new_oospore_germination_datetime_rowindex
         ]
         # (
@@ -371,7 +711,7 @@ def launch_dispersion_loop(
                 oospore_dispersion_datetime_rowindex,
                 stop_oospore_dispersion_latency_rowindex,
             ) = oospore_dispersion(
-                processed_data,
+                weather,
                 measurement_time_interval,
                 oospore_germination_datetime_rowindex,
                 oospore_dispersion_rainfall_threshold,
@@ -387,7 +727,7 @@ def launch_dispersion_loop(
 
 
 def oospore_infection(
-    processed_data,
+    weather,
     measurement_time_interval,
     oospore_dispersion_datetime_rowindex,
     oospore_infection_leaf_wetness_latency,
@@ -414,9 +754,12 @@ def oospore_infection(
 
     # Making sure that we do not go beyond the maximum dataset size
     stop_oospore_infection_latency_rowindex = min(
-        stop_oospore_infection_latency_rowindex, len(processed_data.index) - 1
+        stop_oospore_infection_latency_rowindex, len(weather) - 1
     )
 
+    temperature = weather.temperature
+    leaf_wetness = weather.leaf_wetness
+
     oospore_infection_datetime = None
     oospore_infection_datetime_rowindex = None
     sum_degree_hours = 0
@@ -424,10 +767,10 @@ def oospore_infection(
 
     for i in range(
         oospore_dispersion_datetime_rowindex,
-        len(processed_data.index),
+        len(weather),
         algorithmic_time_steps,
     ):
-        if processed_data["leaf_wetness"][i] == 0:
+        if leaf_wetness[i] == 0:
             no_leaf_wetness_minutes_counter += (
                 measurement_time_interval * algorithmic_time_steps
             )
@@ -440,13 +783,11 @@ def oospore_infection(
             # to the temeprature values per measurement interval. So we divide the hour-threshold by 60 minutes,
             # and we multiply it by the minutes span of the measurement interval.
 
-            if processed_data["temperature"][i] > oospore_infection_base_temperature:
-                sum_degree_hours += (
-                    processed_data["temperature"][i] * measurement_time_interval / 60
-                )
+            if temperature[i] > oospore_infection_base_temperature:
+                sum_degree_hours += temperature[i] * measurement_time_interval / 60
 
                 if sum_degree_hours >= oospore_infection_sum_degree_hours_threshold:
-                    oospore_infection_datetime = processed_data["datetime"][i]
+                    oospore_infection_datetime = weather.datetime[i]
                     oospore_infection_datetime_rowindex = i
 
                     return (
@@ -460,8 +801,203 @@ def oospore_infection(
     )
 
 
+def oospore_infection_map(
+    weather,
+    measurement_time_interval,
+    oospore_infection_leaf_wetness_latency,
+    oospore_infection_base_temperature,
+    oospore_infection_sum_degree_hours_threshold,
+    algorithmic_time_steps,
+):
+    """
+    Batch version of oospore_infection, returning the infection row index for every
+    possible dispersion row of the season at once (-1 where no infection happens).
+
+    From a dispersion row, degree-hours of the wet rows above base temperature are
+    summed until the threshold is reached, unless a dry spell (consecutive rows
+    without leaf wetness) exceeding the leaf wetness latency comes first. The
+    threshold crossing is found with cumulative sums and searchsorted within each
+    sequence of rows visited with algorithmic_time_steps, and the first too-long dry
+    spell with a reverse sweep over the dry runs.
+
+    As in moisture_penetration_germination_map, sums falling within rounding
+    distance of the threshold are re-summed exactly as in oospore_infection.
+
+    return
+    : numpy array of oospore infection row indexes per dispersion row index
+
+    """
+    number_of_rows = len(weather)
+    temperature = weather.temperature
+
+    is_dry = weather.leaf_wetness == 0
+    is_contributing = ~is_dry & (temperature > oospore_infection_base_temperature)
+    degree_hours = np.where(
+        is_contributing, temperature * measurement_time_interval / 60, 0.0
+    )
+
+    # Number of consecutive dry rows after which oospore_infection gives up, i.e. the
+    # first count whose dry minutes exceed the leaf wetness latency.
+    dry_minutes_step = measurement_time_interval * algorithmic_time_steps
+    dry_rows_limit = 1
+    while dry_rows_limit * dry_minutes_step <= oospore_infection_leaf_wetness_latency:
+        dry_rows_limit += 1
+
+    oospore_infection_rowindexes = np.full(number_of_rows, -1)
+    tolerance = (
+        4
+        * np.finfo(np.float64).eps
+        * (number_of_rows + 1)
+        * (
+            np.abs(degree_hours).sum()
+            + abs(oospore_infection_sum_degree_hours_threshold)
+            + 1
+        )
+    )
+    for offset in range(min(algorithmic_time_steps, number_of_rows)):
+        rowindexes = np.arange(offset, number_of_rows, algorithmic_time_steps)
+        number_of_steps = len(rowindexes)
+        positions = np.arange(number_of_steps)
+        sequence_degree_hours = degree_hours[rowindexes]
+        sequence_is_contributing = is_contributing[rowindexes]
+        sequence_is_dry = is_dry[rowindexes]
+        next_contributing_positions = np.append(
+            next_true_rowindexes(sequence_is_contributing), number_of_steps
+        )
+
+        # Threshold crossing of the running degree-hours sum from every start.
+        cumulative_degree_hours = np.concatenate(
+            ([0.0], np.cumsum(sequence_degree_hours))
+        )
+        target_degree_hours = (
+            cumulative_degree_hours[:-1] + oospore_infection_sum_degree_hours_threshold
+        )
+        if (sequence_degree_hours >= 0).all():
+            reached_positions = np.searchsorted(
+                cumulative_degree_hours, target_degree_hours, side="left"
+            )
+            infection_positions = next_contributing_positions[
+                np.maximum(reached_positions - 1, positions)
+            ]
+            is_ambiguous = (
+                np.abs(
+                    cumulative_degree_hours[
+                        np.minimum(reached_positions, number_of_steps)
+                    ]
+                    - target_degree_hours
+                )
+                <= tolerance
+            ) | (
+                np.abs(
+                    cumulative_degree_hours[np.maximum(reached_positions - 1, 0)]
+                    - target_degree_hours
+                )
+                <= tolerance
+            )
+        else:
+            # Negative contributions (base temperature below zero) make the running
+            # sum non-monotonic, so every start is summed exactly.
+            infection_positions = np.full(number_of_steps, number_of_steps)
+            is_ambiguous = np.ones(number_of_steps, dtype=bool)
+
+        # Exact running sums, computed once per first contributing row, since the
+        # sum starting at a non-contributing row is the one starting at the next one.
+        exact_positions = {}
+        for position in np.flatnonzero(is_ambiguous):
+            first_position = next_contributing_positions[position]
+            if first_position not in exact_positions:
+                exact_positions[first_position] = number_of_steps
+                sum_degree_hours = 0
+                for j in range(first_position, number_of_steps):
+                    sum_degree_hours += sequence_degree_hours[j]
+                    if (
+                        sequence_is_contributing[j]
+                        and sum_degree_hours
+                        >= oospore_infection_sum_degree_hours_threshold
+                    ):
+                        exact_positions[first_position] = j
+                        break
+            infection_positions[position] = exact_positions[first_position]
+
+        # First position at which the dry spell counted from each start is too long:
+        # within the dry run containing the start, counted from the start itself,
+        # and in any later dry run, counted from the beginning of that run.
+        dry_run_starts = np.where(
+            sequence_is_dry & ~np.append(False, sequence_is_dry[:-1]), positions, 0
+        )
+        dry_run_starts = np.maximum.accumulate(dry_run_starts)
+        is_run_limit = sequence_is_dry & (
+            positions - dry_run_starts + 1 == dry_rows_limit
+        )
+        next_run_limit_positions = np.append(
+            next_true_rowindexes(is_run_limit), number_of_steps
+        )
+        next_wet_positions = np.append(
+            next_true_rowindexes(~sequence_is_dry), number_of_steps
+        )
+        start_limit_positions = positions + dry_rows_limit - 1
+        stop_positions = np.where(
+            sequence_is_dry & (start_limit_positions < next_wet_positions[positions]),
+            start_limit_positions,
+            next_run_limit_positions[
+                np.where(sequence_is_dry, next_wet_positions[positions], positions)
+            ],
+        )
+
+        is_infected = infection_positions < stop_positions
+        oospore_infection_rowindexes[rowindexes[is_infected]] = rowindexes[
+            infection_positions[is_infected]
+        ]
+    return oospore_infection_rowindexes
+
+
+def lookup_oospore_infection(
+    weather,
+    measurement_time_interval,
+    oospore_dispersion_datetime_rowindex,
+    oospore_infection_leaf_wetness_latency,
+    oospore_infection_base_temperature,
+    oospore_infection_sum_degree_hours_threshold,
+    algorithmic_time_steps,
+):
+    """
+    Function returning the same result as oospore_infection, read from the
+    season-wide infection table, which is computed only once per set of
+    primary_infection parameters.
+
+    return
+    : oospore_infection_datetime, oospore_infection_datetime_rowindex
+
+    """
+    oospore_infection_rowindexes = weather.precomputed(
+        (
+            "oospore_infection",
+            oospore_infection_leaf_wetness_latency,
+            oospore_infection_base_temperature,
+            oospore_infection_sum_degree_hours_threshold,
+            measurement_time_interval,
+            algorithmic_time_steps,
+        ),
+        oospore_infection_map,
+        measurement_time_interval,
+        oospore_infection_leaf_wetness_latency,
+        oospore_infection_base_temperature,
+        oospore_infection_sum_degree_hours_threshold,
+        algorithmic_time_steps,
+    )
+    oospore_infection_datetime_rowindex = int(
+        oospore_infection_rowindexes[oospore_dispersion_datetime_rowindex]
+    )
+    if oospore_infection_datetime_rowindex < 0:
+        return None, None
+    return (
+        weather.datetime[oospore_infection_datetime_rowindex],
+        oospore_infection_datetime_rowindex,
+    )
+
+
 def launch_infection_loop(
-    processed_data,
+    weather,
     measurement_time_interval,
     start_event_rowindex,
     oospore_germination_datetime,
@@ -481,7 +1017,6 @@ def launch_infection_loop(
     oospore_infection_base_temperature,
     oospore_infection_sum_degree_hours_threshold,
     algorithmic_time_steps,
-    logfile,
 ):
     """
     Function that launches a loop for primary (oospore) infection datetime search, in case the first run did not succeed.
@@ -497,14 +1032,14 @@ def launch_infection_loop(
 
     while (
         oospore_infection_datetime is None
-        and new_oospore_germination_datetime_rowindex < len(processed_data.index)
+        and new_oospore_germination_datetime_rowindex < len(weather)
     ):
         (
             new_oospore_dispersion_datetime,
             new_oospore_dispersion_datetime_rowindex,
             stop_oospore_dispersion_latency_rowindex,
         ) = oospore_dispersion(
-            processed_data,
+            weather,
             measurement_time_interval,
             new_oospore_germination_datetime_rowindex,
             oospore_dispersion_rainfall_threshold,
@@ -512,7 +1047,27 @@ def launch_infection_loop(
             algorithmic_time_steps,
         )
         if new_oospore_dispersion_datetime is None:
-            new_oospore_germination_datetime_rowindex += algorithmic_time_steps
+            # Jump over the germination rows whose latency window cannot reach the
+            # next row with qualifying rainfall, since their dispersion fails too.
+            next_dispersion_rowindex = next_dispersion_rowindexes(
+                weather,
+                oospore_dispersion_rainfall_threshold,
+                measurement_time_interval,
+                algorithmic_time_steps,
+            )[new_oospore_germination_datetime_rowindex]
+            if next_dispersion_rowindex >= len(weather):
+                break
+            next_viable_rowindex = (
+                next_dispersion_rowindex
+                - ceil(oospore_dispersion_latency * 60 / measurement_time_interval)
+                - 1
+            )
+            new_oospore_germination_datetime_rowindex = max(
+                new_oospore_germination_datetime_rowindex + algorithmic_time_steps,
+                next_viable_rowindex
+                + (new_oospore_germination_datetime_rowindex - next_viable_rowindex)
+                % algorithmic_time_steps,
+            )
             continue
         # if new_oospore_dispersion_datetime is None:
         #     (
@@ -549,8 +1104,8 @@ def launch_infection_loop(
             (
                 oospore_infection_datetime,
                 oospore_infection_datetime_rowindex,
-            ) = oospore_infection(
-                processed_data,
+            ) = lookup_oospore_infection(
+                weather,
                 measurement_time_interval,
                 oospore_dispersion_datetime_rowindex,
                 oospore_infection_leaf_wetness_latency,
@@ -6,9 +6,34 @@ Secondary infection algorithms.
 from math import ceil, floor, isnan
 from statistics import mean
 
+import numpy as np
 
-def secondary_infection(  # noqa: C901
-    processed_data,
+
+def hourly_mean_temperatures(weather, measurement_time_interval):
+    """
+    Function returning the rolling hourly mean temperature at every row with leaf
+    wetness (NaN elsewhere): the mean of the non-missing temperatures over the hour
+    up to and including the row, as summed into degree-hours by secondary_infection.
+    Means are computed with statistics.mean, so that the sums are exactly the same.
+
+    """
+    temperatures = weather.temperature
+    hourly_rows = floor(60 / measurement_time_interval)
+    hourly_means = np.full(len(weather), np.nan)
+    is_wet = (weather.leaf_wetness != 0) & ~np.isnan(weather.leaf_wetness)
+    for i in np.flatnonzero(is_wet & ~np.isnan(temperatures)):
+        hourly_temps = [
+            t
+            for t in temperatures[max(0, i - hourly_rows) : i + 1].tolist()
+            if not isnan(t)
+        ]
+        hourly_means[i] = mean(hourly_temps)
+    hourly_means.flags.writeable = False
+    return hourly_means
+
+
+def secondary_infection(
+    weather,
     sporulation_datetime_rowindex,
     spore_lifespan,
     secondary_infection_min_temperature,
@@ -23,6 +48,13 @@ def secondary_infection(  # noqa: C901
     Algorithm to calculate whether secondary infections can occure given current
     meteorological conditions and the previously computed spore lifespans.
 
+    Over the spore lifespan, rows with missing data or temperatures out of range are
+    skipped. Every full hour of leaf wetness adds the hourly mean temperature to the
+    degree-hours sum, until the threshold is reached (a secondary infection). Dry
+    spells longer than the leaf wetness latency reset the sum. The dry-spell resets
+    and the hourly additions are located with array operations, and the sums are
+    accumulated with cumsum from every reset, i.e. exactly as running sums.
+
     """
 
     secondary_infection_datetimes = []
@@ -42,80 +74,111 @@ def secondary_infection(  # noqa: C901
     )
 
     # We make sure that the estimated rowindex does not go over the length of the dataframe.
-    end_of_lifespan_rowindex = min(
-        end_of_lifespan_rowindex, len(processed_data.index) - 1
-    )
-    no_leaf_wetness_minutes_counter = 0
-    sum_degree_hours = 0
-    sum_degree_hours_minutes_counter = 0
+    end_of_lifespan_rowindex = min(end_of_lifespan_rowindex, len(weather) - 1)
 
-    for i in range(
+    # Rows visited over the lifespan, without missing data and within the temperature range.
+    rowindexes = np.arange(
         sporulation_datetime_rowindex,
-        end_of_lifespan_rowindex
-        + 1,  # we need to add +1 for Python's range function to actually loop through the last index in the foor loop
+        end_of_lifespan_rowindex + 1,
         algorithmic_time_steps,
-    ):
-        temperature = processed_data["temperature"][i]
-        leaf_wetness = processed_data["leaf_wetness"][i]
-
-        # Skip rows where weather data is missing (large gap left as NaN).
-        if isnan(temperature) or isnan(leaf_wetness):
-            continue
-
-        # Temperature thresholds
-        if (
-            temperature < secondary_infection_min_temperature
-            or temperature > secondary_infection_max_temperature
-        ):
-            continue
-
-        # Sum degree hours threshold
-        if leaf_wetness == 0:
-            no_leaf_wetness_minutes_counter += (
-                measurement_time_interval * algorithmic_time_steps
+    )
+    temperatures = weather.temperature[rowindexes]
+    leaf_wetnesses = weather.leaf_wetness[rowindexes]
+    is_counted = (
+        ~np.isnan(leaf_wetnesses)
+        & (temperatures >= secondary_infection_min_temperature)
+        & (temperatures <= secondary_infection_max_temperature)
+    )
+    rowindexes = rowindexes[is_counted]
+    is_dry = leaf_wetnesses[is_counted] == 0
+    positions = np.arange(len(rowindexes))
+
+    # The degree-hours sum is reset at every dry_rows_limit-th consecutive dry row,
+    # i.e. when the dry minutes exceed the leaf wetness latency.
+    step_minutes = measurement_time_interval * algorithmic_time_steps
+    dry_rows_limit = 1
+    while dry_rows_limit * step_minutes <= secondary_infection_leaf_wetness_latency:
+        dry_rows_limit += 1
+    dry_run_starts = np.maximum.accumulate(
+        np.where(is_dry & ~np.append(False, is_dry[:-1]), positions, 0)
+    )
+    is_reset = is_dry & ((positions - dry_run_starts + 1) % dry_rows_limit == 0)
+    reset_positions = np.flatnonzero(is_reset)
+
+    # A full hour of leaf wetness is reached at the wet rows where the wet minutes
+    # counted since the last reset pass a multiple of 60.
+    wet_counts = np.cumsum(~is_dry)
+    wet_ordinals = wet_counts - np.maximum.accumulate(np.where(is_reset, wet_counts, 0))
+    hourly_means = weather.precomputed(
+        ("hourly_mean_temperature", measurement_time_interval),
+        hourly_mean_temperatures,
+        measurement_time_interval,
+    )
+
+    def get_hour_positions(wet_positions, wet_ordinals):
+        if step_minutes >= 60:
+            return wet_positions
+        return wet_positions[
+            wet_ordinals * step_minutes // 60 > (wet_ordinals - 1) * step_minutes // 60
+        ]
+
+    # Segments between resets whose degree-hours cannot reach the threshold are
+    # skipped, screened with global cumulative sums (with a rounding margin).
+    hour_positions = get_hour_positions(np.flatnonzero(~is_dry), wet_ordinals[~is_dry])
+    degree_hours = np.zeros(len(rowindexes))
+    degree_hours[hour_positions] = hourly_means[rowindexes[hour_positions]]
+    cumulative_degree_hours = np.concatenate(([0.0], np.cumsum(degree_hours)))
+    segment_starts = np.concatenate(([0], reset_positions + 1))
+    segment_stops = np.concatenate((reset_positions, [len(rowindexes)]))
+    if (degree_hours >= 0).all():
+        tolerance = (
+            4
+            * np.finfo(np.float64).eps
+            * (len(rowindexes) + 1)
+            * (
+                cumulative_degree_hours[-1]
+                + abs(secondary_infection_sum_degree_hours_threshold)
+                + 1
+            )
+        )
+        is_candidate = (
+            cumulative_degree_hours[segment_stops]
+            - cumulative_degree_hours[segment_starts]
+            >= secondary_infection_sum_degree_hours_threshold - tolerance
+        )
+        segment_starts = segment_starts[is_candidate]
+        segment_stops = segment_stops[is_candidate]
+
+    for segment_start, segment_stop in zip(segment_starts, segment_stops, strict=True):
+        wet_positions = segment_start + np.flatnonzero(
+            ~is_dry[segment_start:segment_stop]
+        )
+        # After each secondary infection, the sum restarts from the next wet row.
+        while len(wet_positions) > 0:
+            hour_positions = get_hour_positions(
+                wet_positions, np.arange(1, len(wet_positions) + 1)
+            )
+            sum_degree_hours = np.cumsum(hourly_means[rowindexes[hour_positions]])
+            reached = np.flatnonzero(
+                sum_degree_hours >= secondary_infection_sum_degree_hours_threshold
+            )
+            if len(reached) == 0:
+                break
+            secondary_infection_datetime_rowindex = int(
+                rowindexes[hour_positions[reached[0]]]
+            )
+            secondary_infection_datetimes.append(
+                weather.datetime[secondary_infection_datetime_rowindex]
             )
-            if (
-                no_leaf_wetness_minutes_counter
-                > secondary_infection_leaf_wetness_latency
-            ):
-                no_leaf_wetness_minutes_counter = 0
-                sum_degree_hours = 0
-                sum_degree_hours_minutes_counter = 0
-                continue
-        else:
-            no_leaf_wetness_minutes_counter = 0
-            sum_degree_hours_minutes_counter += (
-                measurement_time_interval * algorithmic_time_steps
+            secondary_infection_datetime_rowindexes.append(
+                secondary_infection_datetime_rowindex
             )
-            if sum_degree_hours_minutes_counter >= 60:
-                start_hourly_rowindex = max(
-                    0, i - floor(60 / measurement_time_interval)
+            if fast_mode is True:
+                return (
+                    secondary_infection_datetimes,
+                    secondary_infection_datetime_rowindexes,
                 )
-                stop_hourly_rowindex = min(i + 1, len(processed_data.index))
-                hourly_temps = [
-                    t
-                    for t in processed_data["temperature"][
-                        start_hourly_rowindex:stop_hourly_rowindex
-                    ]
-                    if not isnan(t)
-                ]
-                if not hourly_temps:
-                    continue
-                mean_hourly_temperature = mean(hourly_temps)
-                sum_degree_hours += mean_hourly_temperature
-                sum_degree_hours_minutes_counter -= 60
-                if sum_degree_hours >= secondary_infection_sum_degree_hours_threshold:
-                    secondary_infection_datetime = processed_data["datetime"][i]
-                    secondary_infection_datetime_rowindex = i
-                    secondary_infection_datetimes.append(secondary_infection_datetime)
-                    secondary_infection_datetime_rowindexes.append(
-                        secondary_infection_datetime_rowindex
-                    )
-                    sum_degree_hours = 0
-                    sum_degree_hours_minutes_counter = 0
-                    no_leaf_wetness_minutes_counter = 0
-                    if fast_mode is True:
-                        break
+            wet_positions = wet_positions[wet_positions > hour_positions[reached[0]]]
 
     return (
         secondary_infection_datetimes,
@@ -124,7 +187,7 @@ def secondary_infection(  # noqa: C901
 
 
 def launch_secondary_infections(
-    processed_data,
+    weather,
     sporulation_datetime_rowindexes,
     spore_lifespan_days,
     secondary_infection_min_temperature,
@@ -150,7 +213,7 @@ def launch_secondary_infections(
             local_secondary_infection_datetimes,
             local_secondary_infection_datetime_rowindexes,
         ) = secondary_infection(
-            processed_data,
+            weather,
             sporulation_datetime_rowindex,
             spore_lifespan_days[i],
             secondary_infection_min_temperature,
@@ -6,11 +6,12 @@ Sporangia density algorithms.
 from math import ceil
 from statistics import mean
 
-import utils
+import numpy as np
+import sun_table
 
 
 def get_sporangia_density(
-    processed_data,
+    weather,
     measurement_time_interval,
     longitude,
     latitude,
@@ -32,21 +33,21 @@ def get_sporangia_density(
 
     sporangia_density = None
 
-    sporulation_date = sporulation_datetime.date()
-    suntimes = utils.get_suntimes(longitude, latitude, elevation, sporulation_date)
-    sunset_t = suntimes["sunset"]
+    # Sunset of the sporulation date (the date of the sporulation row).
+    sunset_time = sun_table.get_sun_table(
+        weather, longitude, latitude, elevation
+    ).sunset_time[sporulation_datetime_rowindex]
 
-    start_sporangia_latency_rowindex = None
-
-    for i in range(
-        sporulation_datetime_rowindex, len(processed_data.index), algorithmic_time_steps
-    ):
-        start_sporangia_latency_datetime = processed_data["datetime"][i]
-        if start_sporangia_latency_datetime >= sunset_t:
-            start_sporangia_latency_rowindex = i
-            break
+    # First row from sporulation onwards (at the algorithmic time step) reaching sunset.
+    start_sporangia_latency_rowindex = max(
+        int(np.searchsorted(weather.time, sunset_time, side="left")),
+        sporulation_datetime_rowindex,
+    )
+    start_sporangia_latency_rowindex += (
+        sporulation_datetime_rowindex - start_sporangia_latency_rowindex
+    ) % algorithmic_time_steps
 
-    if start_sporangia_latency_rowindex is None:
+    if start_sporangia_latency_rowindex >= len(weather):
         # print(
         #     "WARNING: starting datetime for sporangia latency period after sporulation could not be determined."
         # )
@@ -60,9 +61,10 @@ def get_sporangia_density(
     )
 
     stop_sporangia_latency_rowindex = min(
-        stop_sporangia_latency_rowindex, len(processed_data.index) - 1
+        stop_sporangia_latency_rowindex, len(weather) - 1
     )
 
+    temperature = weather.temperature
     sporangia_latency_temperatures = []
 
     for i in range(
@@ -70,8 +72,8 @@ def get_sporangia_density(
         stop_sporangia_latency_rowindex + 1,
         algorithmic_time_steps,
     ):
-        if processed_data["temperature"][i] is not None:
-            sporangia_latency_temperatures.append(processed_data["temperature"][i])
+        if temperature[i] is not None:
+            sporangia_latency_temperatures.append(temperature[i])
 
     avg_latency_temperature = mean(sporangia_latency_temperatures)
 
@@ -90,7 +92,7 @@ def get_sporangia_density(
 
 
 def launch_sporangia_densities(
-    processed_data,
+    weather,
     measurement_time_interval,
     longitude,
     latitude,
@@ -110,9 +112,9 @@ def launch_sporangia_densities(
     sporangia_densities = []
 
     for sporulation_datetime_rowindex in sporulation_datetime_rowindexes:
-        sporulation_datetime = processed_data["datetime"][sporulation_datetime_rowindex]
+        sporulation_datetime = weather.datetime[sporulation_datetime_rowindex]
         sporangia_density = get_sporangia_density(
-            processed_data,
+            weather,
             measurement_time_interval,
             longitude,
             latitude,
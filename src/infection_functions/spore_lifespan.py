@@ -41,7 +41,7 @@ def get_spore_lifespan(saturation_deficit, spore_lifespan_constant):
 
 
 def launch_spore_lifespans(
-    processed_data,
+    weather,
     saturation_vapor_pressure,
     spore_lifespan_constant,
     sporulation_datetime_rowindexes,
@@ -70,8 +70,8 @@ def launch_spore_lifespans(
     spore_lifespan_days = []
 
     for sporulation_datetime_rowindex in sporulation_datetime_rowindexes:
-        humidity = processed_data["humidity"][sporulation_datetime_rowindex]
-        temperature = processed_data["temperature"][sporulation_datetime_rowindex]
+        humidity = weather.humidity[sporulation_datetime_rowindex]
+        temperature = weather.temperature[sporulation_datetime_rowindex]
 
         saturation_deficit = get_saturation_deficit(
             saturation_vapor_pressure, humidity, temperature
@@ -3,15 +3,15 @@ Sporulation algorithms.
 
 """
 
-from datetime import timedelta
 from math import ceil
 from statistics import mean
 
-import utils
+import numpy as np
+import sun_table
 
 
 def sporulation(
-    processed_data,
+    weather,
     start_sporulation_datetime_rowindex,
     sporulation_leaf_wetness_threshold,
     sporulation_min_humidity,
@@ -35,24 +35,12 @@ def sporulation(
     sporulation_datetime = None
     sporulation_datetime_rowindex = None
 
-    start_sporulation_datetime = processed_data["datetime"][
-        start_sporulation_datetime_rowindex
-    ]
-    start_sporulation_date = start_sporulation_datetime.date()
-    suntimes = utils.get_suntimes(
-        longitude, latitude, elevation, start_sporulation_date
-    )
-    sunrise_t = suntimes["sunrise"]
-    sunset_t = suntimes["sunset"]
-    max_sporulation_datetime = sunrise_t - timedelta(
-        hours=sporulation_min_darkness_hours
+    is_dark = sun_table.get_sun_table(weather, longitude, latitude, elevation).is_dark(
+        sporulation_min_darkness_hours
     )
 
     # If sporulation is found to start not within the minimum amount of hours of darkness, sporulation cannot happen.
-    if (
-        start_sporulation_datetime < sunset_t
-        and start_sporulation_datetime > max_sporulation_datetime
-    ):
+    if not is_dark[start_sporulation_datetime_rowindex]:
         return sporulation_datetime, sporulation_datetime_rowindex
 
     # Finding max rowindex at which conditions must be met for succesful sporulation.
@@ -66,6 +54,10 @@ def sporulation(
         )  # minutes to measurement interval conversion ##### NOT THE BEST SOLUTION
     )
 
+    leaf_wetnesses = weather.leaf_wetness
+    humidities = weather.humidity
+    temperatures = weather.temperature
+
     sporulation_humidities = []
     sporulation_temperatures = []
 
@@ -73,14 +65,14 @@ def sporulation(
     # within the moving average measurements during the darkness period required for sporulation.
     for i in range(
         start_sporulation_datetime_rowindex,
-        min(stop_sporulation_datetime_rowindex + 1, len(processed_data.index)),
+        min(stop_sporulation_datetime_rowindex + 1, len(weather)),
         algorithmic_time_steps,
     ):
-        leaf_wetness = processed_data["leaf_wetness"][i]
-        humidity = processed_data["humidity"][i]
+        leaf_wetness = leaf_wetnesses[i]
+        humidity = humidities[i]
         sporulation_humidities.append(humidity)
         avg_humidity = mean(sporulation_humidities)
-        temperature = processed_data["temperature"][i]
+        temperature = temperatures[i]
         sporulation_temperatures.append(temperature)
         avg_temperature = mean(sporulation_temperatures)
         if (
@@ -91,14 +83,129 @@ def sporulation(
         else:
             return None, None
 
-    sporulation_datetime = processed_data["datetime"][i]
+    sporulation_datetime = weather.datetime[i]
     sporulation_datetime_rowindex = i
 
     return sporulation_datetime, sporulation_datetime_rowindex
 
 
+def sporulation_map(
+    weather,
+    sporulation_leaf_wetness_threshold,
+    sporulation_min_humidity,
+    sporulation_min_temperature,
+    sporulation_min_darkness_hours,
+    measurement_time_interval,
+    longitude,
+    latitude,
+    elevation,
+    algorithmic_time_steps,
+):
+    """
+    Batch version of sporulation, returning the sporulation row index for every
+    start row of the season at once (-1 where sporulation conditions are not met).
+
+    A start row is feasible if it lies within darkness and, at every row visited over
+    the following darkness period, leaf wetness or the running mean humidity and the
+    running mean temperature are above threshold. Running sums are advanced one
+    visited row at a time for all start rows together. Means are computed exactly by
+    statistics.mean in sporulation, so means within rounding distance of a threshold
+    are recomputed the same way.
+
+    return
+    : numpy array of sporulation row indexes per start row index
+
+    """
+    number_of_rows = len(weather)
+    rowindexes = np.arange(number_of_rows)
+    humidities = weather.humidity
+    temperatures = weather.temperature
+
+    is_feasible = (
+        sun_table.get_sun_table(weather, longitude, latitude, elevation)
+        .is_dark(sporulation_min_darkness_hours)
+        .copy()
+    )
+
+    # Last row visited from each start row, as in sporulation.
+    stop_rowindexes = np.minimum(
+        np.ceil(
+            rowindexes
+            + (60 * sporulation_min_darkness_hours / measurement_time_interval)
+        ).astype(int),
+        number_of_rows - 1,
+    )
+    last_rowindexes = (
+        rowindexes
+        + (stop_rowindexes - rowindexes)
+        // algorithmic_time_steps
+        * algorithmic_time_steps
+    )
+
+    sum_humidities = np.zeros(number_of_rows)
+    sum_temperatures = np.zeros(number_of_rows)
+    sum_abs_temperatures = np.zeros(number_of_rows)
+    count = 0
+    eps = np.finfo(np.float64).eps
+    while True:
+        step_rowindexes = rowindexes + count * algorithmic_time_steps
+        is_active = is_feasible & (step_rowindexes <= last_rowindexes)
+        if not is_active.any():
+            break
+        step_rowindexes = np.where(is_active, step_rowindexes, 0)
+        sum_humidities += humidities[step_rowindexes]
+        sum_temperatures += temperatures[step_rowindexes]
+        sum_abs_temperatures += np.abs(temperatures[step_rowindexes])
+        count += 1
+        avg_humidities = sum_humidities / count
+        avg_temperatures = sum_temperatures / count
+
+        is_wet = (
+            weather.leaf_wetness[step_rowindexes] > sporulation_leaf_wetness_threshold
+        )
+        is_humid = avg_humidities >= sporulation_min_humidity
+        is_warm = avg_temperatures >= sporulation_min_temperature
+
+        # Exact means where the running sums are within rounding distance of a
+        # threshold and the outcome depends on them.
+        tolerance = 4 * (count + 1) * eps
+        is_ambiguous = is_active & (
+            (
+                ~is_wet
+                & (
+                    np.abs(avg_humidities - sporulation_min_humidity)
+                    <= tolerance
+                    * (np.abs(avg_humidities) + abs(sporulation_min_humidity))
+                )
+            )
+            | (
+                np.abs(avg_temperatures - sporulation_min_temperature)
+                <= tolerance
+                * (sum_abs_temperatures / count + abs(sporulation_min_temperature))
+            )
+        )
+        for start_rowindex in np.flatnonzero(is_ambiguous):
+            visited_rowindexes = slice(
+                start_rowindex,
+                step_rowindexes[start_rowindex] + 1,
+                algorithmic_time_steps,
+            )
+            is_humid[start_rowindex] = (
+                mean(humidities[visited_rowindexes].tolist())
+                >= sporulation_min_humidity
+            )
+            is_warm[start_rowindex] = (
+                mean(temperatures[visited_rowindexes].tolist())
+                >= sporulation_min_temperature
+            )
+
+        is_feasible &= ~is_active | ((is_wet | is_humid) & is_warm)
+
+    return np.where(is_feasible, last_rowindexes, -1)
+
+
 def launch_sporulation(
-    processed_data,
+    weather,
     infection_datetime_rowindex,
     end_incubation_datetime_rowindex,
     sporulation_leaf_wetness_threshold,
@@ -117,20 +224,10 @@ def launch_sporulation(
 
     """
 
-    sporulation_datetimes = []
-    sporulation_datetime_rowindexes = []
-
-    for i in range(
-        end_incubation_datetime_rowindex,
-        len(processed_data.index),
-        algorithmic_time_steps,
-    ):
+    # Season-wide sporulation rows per start row, computed once per set of parameters.
+    sporulation_rowindexes = weather.precomputed(
         (
-            sporulation_datetime,
-            sporulation_datetime_rowindex,
-        ) = sporulation(
-            processed_data,
-            i,
+            "sporulation",
             sporulation_leaf_wetness_threshold,
             sporulation_min_humidity,
             sporulation_min_temperature,
@@ -140,11 +237,28 @@ def launch_sporulation(
             latitude,
             elevation,
             algorithmic_time_steps,
-        )
-        if sporulation_datetime is not None:
-            sporulation_datetimes.append(sporulation_datetime)
-            sporulation_datetime_rowindexes.append(sporulation_datetime_rowindex)
-            if fast_mode is True:
-                break
+        ),
+        sporulation_map,
+        sporulation_leaf_wetness_threshold,
+        sporulation_min_humidity,
+        sporulation_min_temperature,
+        sporulation_min_darkness_hours,
+        measurement_time_interval,
+        longitude,
+        latitude,
+        elevation,
+        algorithmic_time_steps,
+    )[end_incubation_datetime_rowindex::algorithmic_time_steps]
+
+    # Sporulation from every feasible start row, or only from the first one in fast mode.
+    sporulation_rowindexes = sporulation_rowindexes[sporulation_rowindexes >= 0]
+    if fast_mode is True:
+        sporulation_rowindexes = sporulation_rowindexes[:1]
+
+    sporulation_datetime_rowindexes = sporulation_rowindexes.tolist()
+    sporulation_datetimes = [
+        weather.datetime[sporulation_datetime_rowindex]
+        for sporulation_datetime_rowindex in sporulation_datetime_rowindexes
+    ]
 
     return sporulation_datetimes, sporulation_datetime_rowindexes
@@ -3,8 +3,10 @@ Script calling the specific infection algorithm submodules and functions.
 
 """
 
+from math import ceil, isnan
+
 import pandas as pd
-import utils
+import run_logging
 from infection_functions import (
     incubation,
     oospore_maturation,
@@ -14,6 +16,10 @@ from infection_functions import (
     spore_lifespan,
     sporulation,
 )
+from stage_cache import StageCache
+from stage_metrics import timed
+
+logger = run_logging.get_logger(__name__)
 
 # Global variable, defining the number of infection events that we will store and print as output.
 number_of_infection_events = 10
@@ -73,9 +79,7 @@ def get_oospore_maturation_date(
     model_parameters,
     standard_colformats,
     timezone,
-    daily_temperatures,
-    daily_mean_temperatures,
-    logfile,
+    daily_weather,
 ):
     """
     Function directing the determination of oospore maturation date, a unique date per season, thus only computed once or manually inserted.
@@ -93,13 +97,11 @@ def get_oospore_maturation_date(
             "oospore_maturation"
         ]["sum_degree_days_threshold"]
     except TypeError:
-        with open(logfile, "a") as logf:
-            logf.write(
-                "\nRun Infection Model Error: could not correctly read or send parameters from config file to oospore maturation date determination function.\n"
-            )
+        logger.error(
+            "\nRun Infection Model Error: could not correctly read or send parameters from config file to oospore maturation date determination function.\n"
+        )
     if oospore_maturation_date is None:
-        with open(logfile, "a") as logf:
-            logf.write("\nNo pre-set oospore maturation date.")
+        logger.info("\nNo pre-set oospore maturation date.")
         (
             oospore_maturation_date,
             oospore_maturation_datetime_rowindex,
@@ -107,8 +109,7 @@ def get_oospore_maturation_date(
             processed_data,
             oospore_maturation_base_temperature,
             oospore_sum_degree_days_maturation_threshold,
-            daily_temperatures,
-            daily_mean_temperatures,
+            daily_weather,
         )
     else:
         oospore_maturation_date = pd.to_datetime(
@@ -121,59 +122,97 @@ def get_oospore_maturation_date(
             _data_start = processed_data["datetime"].iloc[0]
             _data_end = processed_data["datetime"].iloc[-1]
             _msg = (
-                f"\nERROR: manually set oospore maturation date ({oospore_maturation_date}) "
+                f"\nManually set oospore maturation date ({oospore_maturation_date}) "
                 f"was not found in the available weather data. "
                 f"Weather data spans {_data_start} to {_data_end}. "
                 f"The manually set date likely falls outside this range (e.g. coordinates were recently changed "
                 f"and the new data file starts after the configured date). "
                 f"Please update the oospore maturation date in the config or provide weather data covering that date.\n"
             )
-            with open(logfile, "a") as logf:
-                logf.write(_msg)
-            print(_msg)
+            logger.error(_msg)
+            print(f"\nERROR: {_msg.lstrip()}")
             return None, None
         oospore_maturation_datetime_rowindex = processed_data.index.get_loc(
             _matching_rows.index[0]
         )
-        with open(logfile, "a") as logf:
-            logf.write(
-                f"\nLoading oospore maturation date from config file: {oospore_maturation_date}\n"
-            )
+        logger.info(
+            f"\nLoading oospore maturation date from config file: {oospore_maturation_date}\n"
+        )
 
     if oospore_maturation_date is None:
-        log_message = "\nWARNING: threshold conditions for oospore maturation not reached. Normal model loop will be skipped; spore count shortcut events will still be processed if available.\n"
-        with open(logfile, "a") as logf:
-            logf.write(log_message)
-        print(log_message)
+        log_message = "\nThreshold conditions for oospore maturation not reached. Normal model loop will be skipped; spore count shortcut events will still be processed if available.\n"
+        logger.warning(log_message)
+        print(f"\nWARNING: {log_message.lstrip()}")
         return None, None
     else:
-        with open(logfile, "a") as logf:
-            logf.write(
-                f"\nOospore maturation date computationally determined on day: {oospore_maturation_date}\n"
-            )
+        logger.info(
+            f"\nOospore maturation date computationally determined on day: {oospore_maturation_date}\n"
+        )
 
     return oospore_maturation_date, oospore_maturation_datetime_rowindex
 
 
+def record_stage(
+    chain_state,
+    stage,
+    rowindexes,
+    read_rowindex,
+    stage_metrics=None,
+    from_rowindex=None,
+):
+    """
+    Records the row index(es) found by a stage of an infection chain, and extends
+    the furthest row index read by the chain to read_rowindex. If stage metrics
+    are enabled, the rows from from_rowindex (where the stage search starts) to
+    read_rowindex are counted as scanned by the stage.
+
+    """
+    chain_state["stage_rowindexes"][stage] = rowindexes
+    extend_read_rowindex(chain_state, read_rowindex)
+    if stage_metrics is not None:
+        stage_metrics.add_rows_scanned(stage, from_rowindex, read_rowindex)
+
+
+def extend_read_rowindex(chain_state, read_rowindex):
+    """
+    Extends the furthest row index read by an infection chain to read_rowindex.
+
+    """
+    chain_state["read_rowindex"] = max(chain_state["read_rowindex"], int(read_rowindex))
+
+
+def get_day_read_rowindex(daily_weather, date):
+    """
+    Returns the row index up to which a per-day value (daily mean, daily infection
+    strength) of the given date is read: the first row of the next day, so that the
+    last day of the timeseries, which later data may complete, reads up to its end.
+
+    """
+    return daily_weather.last_rowindex(date) + 1
+
+
 """ Main function coordinating the call of infection algorithms """
 
 
 def run_infection_model(  # noqa: C901
-    processed_data,
+    weather,
     model_parameters,
     start_event_rowindex,
     oospore_maturation_date,
-    daily_mean_temperatures,
+    daily_weather,
+    daily_infection_strengths,
     algorithmic_time_steps,
-    logfile,
-    oospore_infection_datetimes,
+    oospore_infection_registry,
     spore_counts_result=None,
+    stage_cache=None,
+    chain_state=None,
+    stage_metrics=None,
 ):
     """
     Main function directing the steps of the full infection prediction model.
 
     argument1
-    : processed time series pandas dataframe
+    : processed time series as a WeatherSeries
 
     argument2
     : dictionary of model parameters
@@ -187,6 +226,18 @@ def run_infection_model(  # noqa: C901
     argument5
     : optional spore counts analysis result dictionary for continuing from sporulation stage
 
+    argument6
+    : optional StageCache shared by all infection events of the run, to reuse stage results
+
+    argument7
+    : optional dictionary, filled with the row indexes found by each stage of the
+    infection chain and the furthest row index read by the chain (len(weather) if it
+    depends on the end of the timeseries), see run_state
+
+    argument8
+    : optional StageMetrics counting the calls, wall time and rows scanned of the
+    stage functions (None when stage metrics are disabled)
+
     return
     : dicionary of infection events' datetimes and properties
 
@@ -194,6 +245,19 @@ def run_infection_model(  # noqa: C901
     measurement_time_interval = model_parameters["run_settings"][
         "measurement_time_interval"
     ]
+    if stage_cache is None:
+        stage_cache = StageCache()
+    if chain_state is None:
+        chain_state = {}
+    chain_state.update(
+        stage_rowindexes={},
+        read_rowindex=start_event_rowindex,
+        oospore_infection_rowindex=None,
+        is_registered=False,
+    )
+    if spore_counts_result is not None:
+        # Shortcut datetimes are matched against the whole timeseries.
+        extend_read_rowindex(chain_state, len(weather))
 
     # Initialise all primary-stage outputs to None so the events dictionary
     # is always fully populated regardless of which execution path is taken.
@@ -224,36 +288,24 @@ def run_infection_model(  # noqa: C901
         # Skip germination / dispersion / infection / incubation and jump #
         # directly to sporulation using the spore-trap datetime.          #
         # -------------------------------------------------------------- #
-        with open(logfile, "a") as logf:
-            logf.write(
-                "\nPercent-increase condition met: "
-                "skipping directly to sporulation stage.\n"
-            )
+        logger.info(
+            "\nPercent-increase condition met: "
+            "skipping directly to sporulation stage.\n"
+        )
 
         raw_spore_dt = spore_counts_result.get("sporulation_datetime")
         if raw_spore_dt is None:
-            with open(logfile, "a") as logf:
-                logf.write(
-                    "ERROR: sporulation_datetime missing from spore counts result.\n"
-                )
+            logger.error("\nsporulation_datetime missing from spore counts result.\n")
             return get_infection_events_dictionary(
                 oospore_maturation_date, *[None] * (number_of_infection_events - 1)
             )
 
-        spore_dt = pd.to_datetime(raw_spore_dt)
-        if processed_data["datetime"].dt.tz is not None and spore_dt.tzinfo is None:
-            spore_dt = spore_dt.tz_localize(processed_data["datetime"].dt.tz)
-
-        closest_idx = (processed_data["datetime"] - spore_dt).abs().argmin()
-        shortcut_rowindex = processed_data.index.get_loc(
-            processed_data.index[closest_idx]
-        )
-        end_incubation_datetime = processed_data["datetime"][shortcut_rowindex]
+        shortcut_rowindex = weather.nearest_rowindex(raw_spore_dt)
+        end_incubation_datetime = weather.datetime[shortcut_rowindex]
         end_incubation_datetime_rowindex = shortcut_rowindex
         oospore_infection_datetime_rowindex = shortcut_rowindex
 
-        with open(logfile, "a") as logf:
-            logf.write(f"Sporulation stage start datetime: {end_incubation_datetime}\n")
+        logger.info(f"Sporulation stage start datetime: {end_incubation_datetime}\n")
 
     else:
         # -------------------------------------------------------------- #
@@ -271,38 +323,28 @@ def run_infection_model(  # noqa: C901
             # ---------------------------------------------------------- #
             # DISPERSION SHORTCUT                                         #
             # ---------------------------------------------------------- #
-            with open(logfile, "a") as logf:
-                logf.write(
-                    "\nFlat-threshold condition met: "
-                    "skipping to oospore dispersion stage.\n"
-                )
+            logger.info(
+                "\nFlat-threshold condition met: "
+                "skipping to oospore dispersion stage.\n"
+            )
 
             raw_disp_dt = spore_counts_result.get("dispersion_datetime")
             if raw_disp_dt is None:
-                with open(logfile, "a") as logf:
-                    logf.write(
-                        "ERROR: dispersion_datetime missing from spore counts result.\n"
-                    )
+                logger.error(
+                    "\ndispersion_datetime missing from spore counts result.\n"
+                )
                 return get_infection_events_dictionary(
                     oospore_maturation_date, *[None] * (number_of_infection_events - 1)
                 )
 
-            disp_dt = pd.to_datetime(raw_disp_dt)
-            if processed_data["datetime"].dt.tz is not None and disp_dt.tzinfo is None:
-                disp_dt = disp_dt.tz_localize(processed_data["datetime"].dt.tz)
-
-            closest_idx = (processed_data["datetime"] - disp_dt).abs().argmin()
-            oospore_dispersion_datetime_rowindex = processed_data.index.get_loc(
-                processed_data.index[closest_idx]
-            )
-            oospore_dispersion_datetime = processed_data["datetime"][
+            oospore_dispersion_datetime_rowindex = weather.nearest_rowindex(raw_disp_dt)
+            oospore_dispersion_datetime = weather.datetime[
                 oospore_dispersion_datetime_rowindex
             ]
 
-            with open(logfile, "a") as logf:
-                logf.write(
-                    f"Dispersion stage anchored at datetime: {oospore_dispersion_datetime}\n"
-                )
+            logger.info(
+                f"Dispersion stage anchored at datetime: {oospore_dispersion_datetime}\n"
+            )
 
         else:
             # ---------------------------------------------------------- #
@@ -336,18 +378,17 @@ def run_infection_model(  # noqa: C901
                     "oospore_germination"
                 ]["moisturization_rainfall_period"]
             except TypeError:
-                with open(logfile, "a") as logf:
-                    logf.write(
-                        "\nRun Infection Model Error: could not correctly read or send parameters from config file to soil infection determination functions.\n"
-                    )
+                logger.error(
+                    "\nRun Infection Model Error: could not correctly read or send parameters from config file to soil infection determination functions.\n"
+                )
 
             """ Oospore germination """
 
             (
                 oospore_germination_datetime,
                 oospore_germination_datetime_rowindex,
-            ) = primary_infection.oospore_germination(
-                processed_data,
+            ) = timed(stage_metrics, primary_infection.lookup_oospore_germination)(
+                weather,
                 start_event_rowindex,
                 oospore_germination_relative_humidity_threshold,
                 oospore_germination_base_temperature,
@@ -359,7 +400,22 @@ def run_infection_model(  # noqa: C901
                 moisturization_rainfall_period,
                 measurement_time_interval,
                 algorithmic_time_steps,
-                logfile,
+            )
+            # Algorithm 2 reads the rainfall period window after every candidate row.
+            record_stage(
+                chain_state,
+                "oospore_germination",
+                oospore_germination_datetime_rowindex,
+                len(weather)
+                if oospore_germination_datetime is None
+                else oospore_germination_datetime_rowindex
+                + (
+                    int(moisturization_rainfall_period * 60 / measurement_time_interval)
+                    if oospore_germination_algorithm == 2
+                    else 0
+                ),
+                stage_metrics,
+                start_event_rowindex,
             )
             if oospore_germination_datetime is None:
                 return get_infection_events_dictionary(
@@ -380,8 +436,8 @@ def run_infection_model(  # noqa: C901
                 oospore_dispersion_datetime,
                 oospore_dispersion_datetime_rowindex,
                 stop_oospore_dispersion_latency_rowindex,
-            ) = primary_infection.oospore_dispersion(
-                processed_data,
+            ) = timed(stage_metrics, primary_infection.oospore_dispersion)(
+                weather,
                 measurement_time_interval,
                 oospore_germination_datetime_rowindex,
                 oospore_dispersion_rainfall_threshold,
@@ -389,12 +445,13 @@ def run_infection_model(  # noqa: C901
                 algorithmic_time_steps,
             )
 
+            dispersion_read_rowindex = oospore_dispersion_datetime_rowindex
             if oospore_dispersion_datetime is None:
                 (
                     oospore_dispersion_datetime,
                     oospore_dispersion_datetime_rowindex,
-                ) = primary_infection.launch_dispersion_loop(
-                    processed_data,
+                ) = timed(stage_metrics, primary_infection.launch_dispersion_loop)(
+                    weather,
                     start_event_rowindex,
                     oospore_germination_datetime_rowindex,
                     oospore_germination_relative_humidity_threshold,
@@ -409,8 +466,25 @@ def run_infection_model(  # noqa: C901
                     oospore_dispersion_latency,
                     measurement_time_interval,
                     algorithmic_time_steps,
-                    logfile,
                 )
+                # The loop retries dispersion once, from two time steps after germination.
+                dispersion_read_rowindex = (
+                    ceil(
+                        oospore_germination_datetime_rowindex
+                        + 2 * algorithmic_time_steps
+                        + oospore_dispersion_latency * 60 / measurement_time_interval
+                    )
+                    if oospore_dispersion_datetime is not None
+                    else len(weather)
+                )
+            record_stage(
+                chain_state,
+                "oospore_dispersion",
+                oospore_dispersion_datetime_rowindex,
+                dispersion_read_rowindex,
+                stage_metrics,
+                oospore_germination_datetime_rowindex,
+            )
 
             if oospore_dispersion_datetime is None:
                 return get_infection_events_dictionary(
@@ -439,8 +513,8 @@ def run_infection_model(  # noqa: C901
         (
             oospore_infection_datetime,
             oospore_infection_datetime_rowindex,
-        ) = primary_infection.oospore_infection(
-            processed_data,
+        ) = timed(stage_metrics, primary_infection.lookup_oospore_infection)(
+            weather,
             measurement_time_interval,
             oospore_dispersion_datetime_rowindex,
             oospore_infection_leaf_wetness_latency,
@@ -448,6 +522,13 @@ def run_infection_model(  # noqa: C901
             oospore_infection_sum_degree_hours_threshold,
             algorithmic_time_steps,
         )
+        # A failed infection search reads up to a dry spell or to the end, and
+        # the re-search loop further on.
+        infection_read_rowindex = (
+            oospore_infection_datetime_rowindex
+            if oospore_infection_datetime is not None
+            else len(weather)
+        )
 
         # On the normal path only, fall back to the full re-search loop if
         # the initial infection check returned nothing.
@@ -455,8 +536,8 @@ def run_infection_model(  # noqa: C901
             (
                 oospore_infection_datetime,
                 oospore_infection_datetime_rowindex,
-            ) = primary_infection.launch_infection_loop(
-                processed_data,
+            ) = timed(stage_metrics, primary_infection.launch_infection_loop)(
+                weather,
                 measurement_time_interval,
                 start_event_rowindex,
                 oospore_germination_datetime,
@@ -476,8 +557,15 @@ def run_infection_model(  # noqa: C901
                 oospore_infection_base_temperature,
                 oospore_infection_sum_degree_hours_threshold,
                 algorithmic_time_steps,
-                logfile,
             )
+        record_stage(
+            chain_state,
+            "oospore_infection",
+            oospore_infection_datetime_rowindex,
+            infection_read_rowindex,
+            stage_metrics,
+            oospore_dispersion_datetime_rowindex,
+        )
 
         if oospore_infection_datetime is None:
             return get_infection_events_dictionary(
@@ -489,39 +577,51 @@ def run_infection_model(  # noqa: C901
         else:
             # Checking whether the oospore_infection_datetime has already been found,
             # so that only one incubation event is launched per same datetime.
-            is_already_found = False
-            with open(oospore_infection_datetimes, "r") as f:
-                lines = f.readlines()
-            if len(lines) == 0:
-                with open(oospore_infection_datetimes, "a") as f:
-                    f.write(str(oospore_infection_datetime) + "\n")
-            else:
-                for line in lines:
-                    if str(oospore_infection_datetime) in line:
-                        is_already_found = True
-                if is_already_found:
-                    return get_infection_events_dictionary(
-                        oospore_maturation_date,
-                        oospore_germination_datetime,
-                        oospore_dispersion_datetime,
-                        *[None] * (number_of_infection_events - 3),
-                    )
-                else:
-                    with open(oospore_infection_datetimes, "a") as f:
-                        f.write(str(oospore_infection_datetime) + "\n")
+            chain_state[
+                "oospore_infection_rowindex"
+            ] = oospore_infection_datetime_rowindex
+            chain_state["is_registered"] = oospore_infection_registry.register(
+                oospore_infection_datetime_rowindex, oospore_infection_datetime
+            )
+            if not chain_state["is_registered"]:
+                return get_infection_events_dictionary(
+                    oospore_maturation_date,
+                    oospore_germination_datetime,
+                    oospore_dispersion_datetime,
+                    *[None] * (number_of_infection_events - 3),
+                )
 
         """ Incubation """
         (
             incubation_days,
             end_incubation_datetime,
             end_incubation_datetime_rowindex,
-        ) = incubation.launch_incubation(
-            processed_data,
+        ) = timed(stage_metrics, incubation.lookup_incubation)(
+            weather,
             oospore_infection_datetime,
             oospore_infection_datetime_rowindex,
-            daily_mean_temperatures,
+            daily_weather,
             measurement_time_interval,
         )
+        # The daily mean temperatures are read up to the last incubation day.
+        record_stage(
+            chain_state,
+            "completed_incubation",
+            end_incubation_datetime_rowindex,
+            len(weather)
+            if incubation_days is None
+            else max(
+                end_incubation_datetime_rowindex,
+                get_day_read_rowindex(
+                    daily_weather,
+                    incubation.get_last_incubation_day(
+                        daily_weather, oospore_infection_datetime
+                    ),
+                ),
+            ),
+            stage_metrics,
+            oospore_infection_datetime_rowindex,
+        )
 
         if incubation_days is None:
             return get_infection_events_dictionary(
@@ -554,8 +654,8 @@ def run_infection_model(  # noqa: C901
     (
         sporulation_datetimes,
         sporulation_datetime_rowindexes,
-    ) = sporulation.launch_sporulation(
-        processed_data,
+    ) = timed(stage_metrics, sporulation.launch_sporulation)(
+        weather,
         oospore_infection_datetime_rowindex,
         end_incubation_datetime_rowindex,
         sporulation_leaf_wetness_threshold,
@@ -569,6 +669,19 @@ def run_infection_model(  # noqa: C901
         fast_mode,
         algorithmic_time_steps,
     )
+    # In fast mode, the first sporulation reads its darkness period, otherwise
+    # sporulations are searched up to the end of the timeseries.
+    record_stage(
+        chain_state,
+        "sporulations",
+        sporulation_datetime_rowindexes,
+        sporulation_datetime_rowindexes[0]
+        + ceil(60 * sporulation_min_darkness_hours / measurement_time_interval)
+        if fast_mode is True and sporulation_datetime_rowindexes
+        else len(weather),
+        stage_metrics,
+        end_incubation_datetime_rowindex,
+    )
 
     if not sporulation_datetimes:  # check if sporulation_datetimes list is empty
         return get_infection_events_dictionary(
@@ -590,8 +703,22 @@ def run_infection_model(  # noqa: C901
     sporangia_max_temperature = model_parameters["sporangia"]["max_temperature"]
     sporangia_max_density = model_parameters["sporangia"]["max_density"]
 
-    sporangia_densities = sporangia_density.launch_sporangia_densities(
-        processed_data,
+    sporangia_densities = stage_cache.fetch(
+        "sporangia_density",
+        tuple(sporulation_datetime_rowindexes),
+        (
+            measurement_time_interval,
+            longitude,
+            latitude,
+            elevation,
+            sporangia_latency,
+            sporangia_min_temperature,
+            sporangia_max_temperature,
+            sporangia_max_density,
+            algorithmic_time_steps,
+        ),
+        timed(stage_metrics, sporangia_density.launch_sporangia_densities),
+        weather,
         measurement_time_interval,
         longitude,
         latitude,
@@ -603,6 +730,16 @@ def run_infection_model(  # noqa: C901
         sporangia_max_density,
         algorithmic_time_steps,
     )
+    # Sporangia latency periods start at the first row after sunset.
+    for sporulation_datetime_rowindex in sporulation_datetime_rowindexes:
+        extend_read_rowindex(
+            chain_state,
+            get_day_read_rowindex(
+                daily_weather, weather.date[sporulation_datetime_rowindex]
+            )
+            + algorithmic_time_steps
+            + ceil(sporangia_latency * 60 / measurement_time_interval),
+        )
 
     """ Spore lifespan """
 
@@ -611,8 +748,12 @@ def run_infection_model(  # noqa: C901
     ]
     spore_lifespan_constant = model_parameters["spore_lifespan"]["constant"]
 
-    spore_lifespan_days = spore_lifespan.launch_spore_lifespans(
-        processed_data,
+    spore_lifespan_days = stage_cache.fetch(
+        "spore_lifespan",
+        tuple(sporulation_datetime_rowindexes),
+        (saturation_vapor_pressure, spore_lifespan_constant),
+        timed(stage_metrics, spore_lifespan.launch_spore_lifespans),
+        weather,
         saturation_vapor_pressure,
         spore_lifespan_constant,
         sporulation_datetime_rowindexes,
@@ -636,8 +777,22 @@ def run_infection_model(  # noqa: C901
     (
         secondary_infections_datetimes,
         secondary_infections_datetimes_rowindexes,
-    ) = secondary_infection.launch_secondary_infections(
-        processed_data,
+    ) = stage_cache.fetch(
+        "secondary_infection",
+        tuple(sporulation_datetime_rowindexes),
+        (
+            saturation_vapor_pressure,
+            spore_lifespan_constant,
+            secondary_infection_min_temperature,
+            secondary_infection_max_temperature,
+            secondary_infection_leaf_wetness_latency,
+            secondary_infection_sum_degree_hours_threshold,
+            measurement_time_interval,
+            fast_mode,
+            algorithmic_time_steps,
+        ),
+        timed(stage_metrics, secondary_infection.launch_secondary_infections),
+        weather,
         sporulation_datetime_rowindexes,
         spore_lifespan_days,
         secondary_infection_min_temperature,
@@ -648,27 +803,47 @@ def run_infection_model(  # noqa: C901
         fast_mode,
         algorithmic_time_steps,
     )
+    # Secondary infections are searched over the whole lifespan of the spores.
+    record_stage(
+        chain_state,
+        "secondary_infections",
+        secondary_infections_datetimes_rowindexes,
+        max(
+            sporulation_datetime_rowindex
+            if isnan(spore_lifespan)
+            else ceil(
+                sporulation_datetime_rowindex
+                + spore_lifespan * 24 * 60 / measurement_time_interval
+            )
+            for sporulation_datetime_rowindex, spore_lifespan in zip(
+                sporulation_datetime_rowindexes, spore_lifespan_days, strict=True
+            )
+        ),
+        stage_metrics,
+        sporulation_datetime_rowindexes[0],
+    )
 
     """ Daily infection strength index (degree-hours under leaf wetness) """
     oospore_infection_strength = None
     if oospore_infection_datetime is not None:
-        oospore_infection_strength = utils.compute_daily_infection_strength(
-            processed_data,
-            oospore_infection_datetime.date(),
-            measurement_time_interval,
-        )
+        oospore_infection_strength = daily_infection_strengths[
+            oospore_infection_datetime.date()
+        ]
 
     secondary_infection_strengths = [
-        [
-            utils.compute_daily_infection_strength(
-                processed_data,
-                si_dt.date(),
-                measurement_time_interval,
-            )
-            for si_dt in spor_sec_list
-        ]
+        [daily_infection_strengths[si_dt.date()] for si_dt in spor_sec_list]
         for spor_sec_list in secondary_infections_datetimes
     ]
+    for infection_datetime in [oospore_infection_datetime] + [
+        si_dt
+        for spor_sec_list in secondary_infections_datetimes
+        for si_dt in spor_sec_list
+    ]:
+        if infection_datetime is not None:
+            extend_read_rowindex(
+                chain_state,
+                get_day_read_rowindex(daily_weather, infection_datetime.date()),
+            )
 
     """ Returning list of infection events' datetimes and properties """
     events = get_infection_events_dictionary(
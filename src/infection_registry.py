@@ -0,0 +1,58 @@
+"""
+InfectionRegistry class definition script for de-duplicating oospore infections within a model run.
+
+"""
+
+
+class InfectionRegistry:
+    """
+    Class InfectionRegistry holding the oospore infections already found during
+    one model run, so that only one incubation event is launched per infection
+    datetime. Infections are stored as a set of timeseries row indexes for O(1)
+    membership checks, and their datetimes are kept in order of discovery so
+    that the registry can be written out at the end of the run.
+
+    """
+
+    def __init__(self):
+        """
+        Object initialisation function.
+
+        """
+        self.rowindexes = set()
+        self.datetimes = []
+
+    def __contains__(self, rowindex):
+        """
+        Membership check by timeseries row index.
+
+        """
+        return rowindex in self.rowindexes
+
+    def __len__(self):
+        """
+        Number of distinct oospore infections registered.
+
+        """
+        return len(self.rowindexes)
+
+    def register(self, rowindex, datetime):
+        """
+        Registers the oospore infection at the given row index and datetime.
+        Returns False if it was already registered, True otherwise.
+
+        """
+        if rowindex in self.rowindexes:
+            return False
+        self.rowindexes.add(rowindex)
+        self.datetimes.append(datetime)
+        return True
+
+    def save(self, filename):
+        """
+        Writes the registered oospore infection datetimes, one per line.
+
+        """
+        with open(filename, "w") as f:
+            for datetime in self.datetimes:
+                f.write(str(datetime) + "\n")
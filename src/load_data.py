@@ -6,9 +6,12 @@ Data loading functions.
 import sys
 
 import pandas as pd
+import run_logging
 
+logger = run_logging.get_logger(__name__)
 
-def load_data(raw_data_path, logfile):
+
+def load_data(raw_data_path):
     """
     **Load raw data: vitimeteo timeseries.**
 
@@ -21,27 +24,23 @@ def load_data(raw_data_path, logfile):
 
     """
 
-    logf = open(logfile, "a")
-    logf.write(f"\nLoading timeseries data from: {raw_data_path}\n")
+    logger.info(f"\nLoading timeseries data from: {raw_data_path}\n")
     try:
         data = pd.read_csv(raw_data_path, sep=";")
         if data.empty:
             # pandas raises EmptyDataError when there is literally no content; but
             # if the file has a header only (no rows) this catches that case too.
-            logf.write("\nLoad Data Warning: input file contains no rows.\n")
-            logf.close()
+            logger.warning("\nLoad Data Warning: input file contains no rows.\n")
             return data
         nrows = len(data.index)
-        logf.write(f"\nNumber of rows: {nrows}\n")
+        logger.info(f"\nNumber of rows: {nrows}\n")
         for i in range(1, len(data.columns)):
-            logf.write(
+            logger.info(
                 f"\t{data.columns.values[i]}: min={min(data.iloc[:,i])}; max={max(data.iloc[:,i])}\n"
             )
-        logf.close()
         return data
     except (IOError, pd.errors.EmptyDataError):
         error_msg = f"\nLoad Data Error: could not read {raw_data_path} file as pandas dataframe.\n"
-        logf.write(error_msg)
-        logf.close()
+        logger.error(error_msg)
         print(error_msg)
         sys.exit()
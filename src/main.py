@@ -3,25 +3,38 @@ Main script orchestrating all modeling steps and launching specific submodules.
 
 """
 
-import csv
+import cProfile
 import pickle
 import sys
 import threading
+import time
 from datetime import datetime
 
 import automated_weather_pull
+import daily_aggregates
 import decision_support_tool
 import hydra
 import infection_event
 import infection_model
+import infection_registry
 import load_data
+import output_writer
 import pandas as pd
 import plots
 import process_data
+import processed_cache
+import result_store
+import run_logging
+import run_state
+import stage_cache
+import stage_metrics
 import utils
+import weather_series
 from omegaconf import DictConfig, OmegaConf
 from tqdm import tqdm
 
+logger = run_logging.get_logger("main")
+
 
 @hydra.main(config_path="../config", config_name="main", version_base=None)
 def main(config: DictConfig):  # noqa: C901
@@ -66,13 +79,18 @@ def main(config: DictConfig):  # noqa: C901
         run_name=getattr(config, "output", {}).get("run_name"),
     )
 
-    # Parse log filename.
-    logfile = output_files.logfile
-
-    # Open logfile.
-    logf = open(logfile, "w")
+    # Run-scoped logger, writing the logfile and a JSON-lines log through buffered
+    # handlers. The INFO messages of the quiet loggers are dropped in the model loop.
+    logging_settings = config.get("logging", {}) or {}
+    run_logging.setup_run_logging(
+        output_files.logfile,
+        output_files.json_log if logging_settings.get("json_log", True) else None,
+        level=logging_settings.get("level", "INFO"),
+        buffer_records=logging_settings.get("buffer_records", 200),
+        quiet_loggers=logging_settings.get("quiet_in_hot_loop", []) or [],
+    )
 
-    logf.write(
+    logger.info(
         "©Plasmopy\
         \n\nPython implementation of Vitimeteo Plasmopara\
         \n\nLivio Ruzzante\
@@ -83,10 +101,7 @@ def main(config: DictConfig):  # noqa: C901
 
     # Start timer.
     t_start = datetime.now()
-    logf.write(f"\nRuntime start: {t_start}\n")
-
-    # Close log file.
-    logf.close()
+    logger.info(f"\nRuntime start: {t_start}\n")
 
     # Running model computation.
 
@@ -151,9 +166,7 @@ def main(config: DictConfig):  # noqa: C901
             # rather than overwriting, so accumulated API forecast rows are kept.
             with open(str(_flat_path), "r") as _fh:
                 _flat_csv = _fh.read()
-            automated_weather_pull.merge_weather_data(
-                _combined_path, _flat_csv, logfile
-            )
+            automated_weather_pull.merge_weather_data(_combined_path, _flat_csv)
         # If neither condition is true the combined file already exists and the
         # flat file has not changed: leave it untouched so the API data that was
         # merged on previous runs is preserved.
@@ -178,11 +191,10 @@ def main(config: DictConfig):  # noqa: C901
                     # allow small tolerance
                     if abs(api_lat - cfg_lat) > 1e-4 or abs(api_lon - cfg_lon) > 1e-4:
                         msg = (
-                            f"\nERROR: API coordinates ({api_lat},{api_lon}) do not match",
+                            f"\nAPI coordinates ({api_lat},{api_lon}) do not match",
                             f"config coordinates ({cfg_lat},{cfg_lon}).\nPlease correct them and rerun.\n",
                         )
-                        with open(logfile, "a") as logf:
-                            logf.write("".join(msg))
+                        logger.error("".join(msg))
                         print(
                             "ERROR: API coordinates do not match config; check settings."
                         )
@@ -195,25 +207,20 @@ def main(config: DictConfig):  # noqa: C901
                         # allow 1 m tolerance
                         if abs(api_asl - cfg_elev) > 1.0:
                             msg = (
-                                f"\nERROR: API elevation asl={api_asl} does not",
+                                f"\nAPI elevation asl={api_asl} does not",
                                 f"match config elevation={cfg_elev}.\nPlease correct and rerun.\n",
                             )
-                            with open(logfile, "a") as logf:
-                                logf.write("".join(msg))
+                            logger.error("".join(msg))
                             print(
                                 "ERROR: API elevation does not match config; check settings."
                             )
                             sys.exit(1)
                     except ValueError:
-                        with open(logfile, "a") as logf:
-                            logf.write(
-                                "\nWARNING: could not parse asl value from API query URL.\n"
-                            )
+                        logger.warning(
+                            "\nCould not parse asl value from API query URL.\n"
+                        )
             except ValueError:
-                with open(logfile, "a") as logf:
-                    logf.write(
-                        "\nWARNING: could not parse coordinates from API query URL.\n"
-                    )
+                logger.warning("\nCould not parse coordinates from API query URL.\n")
 
     # Start periodic background thread only if enabled and has API query
     if config.input_data.get("automated_weather_pull", False) and api_query is not None:
@@ -221,7 +228,6 @@ def main(config: DictConfig):  # noqa: C901
         data_pull_thread = automated_weather_pull.start_periodic_data_pull(
             meteo_file_path=meteo_file_path,
             api_query_url=api_query,
-            logfile=logfile,
             stop_event=data_pull_stop_event,
             measurement_time_interval=config.run_settings.measurement_time_interval,
         )
@@ -248,23 +254,13 @@ def main(config: DictConfig):  # noqa: C901
                 with open(input_meteo_file, "w") as fh:
                     fh.write("datetime;temperature;humidity;rainfall;leaf_wetness\n")
         else:
-            err = "\nERROR: no meteo input file provided and automated_weather_pull is disabled."
-            print(err)
-            with open(logfile, "a") as logf:
-                logf.write(err + "\n")
+            err = (
+                "\nNo meteo input file provided and automated_weather_pull is disabled."
+            )
+            print(f"\nERROR: {err.lstrip()}")
+            logger.error(err + "\n")
             sys.exit(1)
 
-    loaded_data = load_data.load_data(input_meteo_file, logfile)
-    if loaded_data is None or getattr(loaded_data, "empty", False):
-        msg = (
-            "\nERROR: meteorological file contains no data. "
-            "Provide a valid meteo input or wait until the automated pull populates the file.\n"
-        )
-        print(msg)
-        with open(logfile, "a") as logf:
-            logf.write(msg)
-        sys.exit(1)
-
     # Select columns to use as specified in the config files.
     selected_columns = config.data_columns.use_columns
     standard_colnames = config.data_columns.rename_columns
@@ -281,24 +277,93 @@ def main(config: DictConfig):  # noqa: C901
     # Load model parameters from config files.
     # model_parameters = config
 
-    # Format columns and check that measurements fall within the tolerated ranges.
-    processed_data = process_data.process_data(
-        loaded_data,
-        selected_columns,
-        standard_colnames,
-        standard_colformats,
-        timezone,
-        config,
-        logfile,
-        outfile,
+    # Look up the processed data in the cache, keyed by the raw input file content and
+    # by the configuration it is processed with, skipping loading and processing on a hit.
+    processed_data = None
+    processed_cache_dir = config.input_data.get("processed_cache_dir")
+    if processed_cache_dir:
+        processed_cache_key = processed_cache.get_cache_key(
+            input_meteo_file,
+            OmegaConf.to_container(config.data_columns),
+            timezone,
+            config.run_settings.measurement_time_interval,
+        )
+        processed_data = processed_cache.load_processed_data(
+            processed_cache_dir,
+            processed_cache_key,
+            outfile,
+            output_files.qc_report,
+        )
+
+    if processed_data is None:
+        loaded_data = load_data.load_data(input_meteo_file)
+        if loaded_data is None or getattr(loaded_data, "empty", False):
+            msg = (
+                "\nMeteorological file contains no data. "
+                "Provide a valid meteo input or wait until the automated pull populates the file.\n"
+            )
+            print(f"\nERROR: {msg.lstrip()}")
+            logger.error(msg)
+            sys.exit(1)
+
+        # With incremental processing, the snapshot of the previous run on the same
+        # input file lets process_data reprocess only the rows from the first change.
+        processing_snapshot = None
+        incremental_processing = processed_cache_dir and config.input_data.get(
+            "incremental_processing", False
+        )
+        if incremental_processing:
+            processing_snapshot_key = processed_cache.get_snapshot_key(
+                input_meteo_file,
+                OmegaConf.to_container(config.data_columns),
+                timezone,
+                config.run_settings.measurement_time_interval,
+            )
+            processing_snapshot = processed_cache.load_snapshot(
+                processed_cache_dir, processing_snapshot_key
+            )
+
+        # Format columns and check that measurements fall within the tolerated ranges.
+        processed_data, processing_snapshot = process_data.process_data(
+            loaded_data,
+            selected_columns,
+            standard_colnames,
+            standard_colformats,
+            timezone,
+            config,
+            outfile,
+            output_files.qc_report,
+            processing_snapshot,
+        )
+        if incremental_processing:
+            processed_cache.save_snapshot(
+                processed_cache_dir,
+                processing_snapshot_key,
+                processing_snapshot,
+            )
+        if processed_cache_dir:
+            processed_cache.save_processed_data(
+                processed_cache_dir,
+                processed_cache_key,
+                processed_data,
+                outfile,
+                output_files.qc_report,
+            )
+
+    # Array-backed, read-only copy of the processed timeseries shared by all infection stages.
+    weather = weather_series.WeatherSeries(processed_data)
+
+    # Daily infection strength index (degree-hours under leaf wetness) of every date,
+    # computed once and shared by the infection events and the risk heatmap.
+    daily_infection_strengths = utils.get_daily_infection_strengths(
+        weather, config.run_settings.measurement_time_interval
     )
 
     # Run infection model for all datetime rows, starting from the oospore maturation datetime predicted above.
-    logf = open(logfile, "a")
-    logf.write("\nRunning infection model...\n")
-    logf.write("\nModel parameters:\n")
+    logger.info("\nRunning infection model...\n")
+    logger.info("\nModel parameters:\n")
     for key, value in config.items():
-        logf.write(f"\t{key}: {value}\n")
+        logger.info(f"\t{key}: {value}\n")
 
     # Determine which spore counts file (if any) to use
     spore_counts_result = None
@@ -311,67 +376,62 @@ def main(config: DictConfig):  # noqa: C901
                 tmpfile = f"data/input/automated_spore_{_spore_url_stem}.csv"
                 Path(tmpfile).parent.mkdir(parents=True, exist_ok=True)
                 try:
-                    csvtext = decision_support_tool.fetch_spore_counts(
-                        api_query, logfile
-                    )
+                    csvtext = decision_support_tool.fetch_spore_counts(api_query)
                     if csvtext:
                         with open(tmpfile, "w") as f:
                             f.write(csvtext)
                         input_spore_file = tmpfile
                         msg = f"Spore counts saved to {tmpfile}"
                         print(msg)
-                        logf.write(f"\n{msg}\n")
+                        logger.info(f"\n{msg}\n")
                     else:
                         msg = "Unable to fetch spore counts from API; running normal flow."
                         print(msg)
-                        logf.write(f"\n{msg}\n")
+                        logger.warning(f"\n{msg}\n")
                 except Exception as e:
                     msg = f"Error pulling spore counts: {e}"
                     print(msg)
-                    logf.write(f"\n{msg}\n")
+                    logger.error(f"\n{msg}\n")
             else:
-                logf.write(
+                logger.warning(
                     "\nAutomated spore pull enabled but no API query provided.\n"
                 )
 
     # Check spore counts to determine if model should skip to sporulation stage
     _sdm = config.get("spore_driven_model", {}) or {}
     if _sdm.get("enabled", False) and input_spore_file is not None:
-        logf.write(
+        logger.info(
             "\nSpore-driven model enabled. Checking spore counts file for algorithmic shortcuts...\n"
         )
         _season_dates = processed_data["datetime"].dt.date
         _season_window = (_season_dates.min(), _season_dates.max())
         spore_counts_result = decision_support_tool.check_spore_counts(
             input_spore_file,
-            logfile,
             spore_count_threshold=_sdm.get("spore_count_threshold", 40),
             spore_count_lookback_days=_sdm.get("spore_count_lookback_days", 5),
             spore_count_percent_increase=_sdm.get("spore_count_percent_increase", 30),
             season_window=_season_window,
         )
         if spore_counts_result.get("skip_to_dispersion"):
-            logf.write(
+            logger.info(
                 "\nSpore counts flat threshold exceeded. "
                 "Model will jump to oospore dispersion stage.\n"
             )
         if spore_counts_result.get("skip_to_sporulation"):
-            logf.write(
+            logger.info(
                 "\nSpore counts percent-increase threshold exceeded. "
                 "Model will jump to sporulation stage.\n"
             )
     else:
         if _sdm.get("enabled", False):
-            logf.write(
+            logger.info(
                 "\nSpore-driven model enabled but no spore counts file available. Running normal model flow.\n"
             )
         else:
-            logf.write("\nSpore-driven model disabled. Running normal model flow.\n")
+            logger.info("\nSpore-driven model disabled. Running normal model flow.\n")
 
-    daily_temperatures = utils.get_daily_measurements(processed_data, "temperature")
-    daily_mean_temperatures = utils.get_daily_mean_measurements(
-        processed_data, "temperature"
-    )
+    # Per-day structure and statistics (daily mean temperatures) of the timeseries.
+    daily_weather = daily_aggregates.DailyAggregates(weather)
 
     # Determine oospore maturation date from the model (always run normal path).
     # Spore count shortcut events are injected after the main loop as supplements.
@@ -383,9 +443,7 @@ def main(config: DictConfig):  # noqa: C901
         config,
         standard_colformats,
         timezone,
-        daily_temperatures,
-        daily_mean_temperatures,
-        logfile,
+        daily_weather,
     )
 
     # Extract the oospore maturation date from the processed datetime column,
@@ -398,107 +456,135 @@ def main(config: DictConfig):  # noqa: C901
 
     algorithmic_time_steps = int(config.run_settings.algorithmic_time_steps // 1)
     if algorithmic_time_steps < 1:
-        logf.write(
-            "WARNING: algorithmic time-step cannot be lower than 1. Running model at 1 time-step intervals..."
+        logger.warning(
+            "\nAlgorithmic time-step cannot be lower than 1. Running model at 1 time-step intervals...\n"
         )
         algorithmic_time_steps = 1
     computational_time_steps = int(config.run_settings.computational_time_steps // 1)
     if computational_time_steps < 1:
-        logf.write(
-            "WARNING: computational time-step cannot be lower than 1. Running model at 1 time-step intervals..."
+        logger.warning(
+            "\nComputational time-step cannot be lower than 1. Running model at 1 time-step intervals...\n"
         )
         computational_time_steps = 1
-
-    # Clearing the output file content. We need to clear it before hand to avoid later "appending"
-    # results from previous model runs.
-
-    # For temporary oospore_infection_datetime processing:
-    oospore_infection_datetimes = "data/tmp/oospore_infection_datetimes.csv"
-    f = open(oospore_infection_datetimes, "w")
-    f.close()
-
-    # For result events output file:
-    f = open(output_files.events_text, "w")
-    f.close()
-
-    # And for infection results output file.
-    with open(output_files.infection_datetimes, "w") as f:
-        header_str = (
-            "id"
-            + ","
-            + "start"
-            + ","
-            + "oospore_maturation"
-            + ","
-            + "oospore_germination"
-            + ","
-            + "oospore_dispersion"
-            + ","
-            + "oospore_infection"
-            + ","
-            + "completed_incubation"
-            + ","
-            + "sporulation"
-            + ","
-            + "sporangia_density"
-            + ","
-            + "secondary_infection"
-            + ","
-            + "oospore_infection_strength"
-            + ","
-            + "secondary_infection_strength"
-            + "\n"
+    workers = int(config.run_settings.get("workers", 1) or 1)
+    if workers < 1:
+        logger.warning(
+            "\nNumber of workers cannot be lower than 1. Running model serially...\n"
         )
-        f.write(header_str)
+        workers = 1
+
+    # Per-start-row output files (events log and infection datetimes), cleared to
+    # avoid appending results from previous model runs and written through one
+    # buffered handle each.
+    run_output_writer = output_writer.OutputWriter(
+        output_files.events_text,
+        output_files.infection_datetimes,
+        config.output.get("flush_rows", 1000),
+    )
 
     infection_predictions = []
     infection_events = []
 
-    if oospore_maturation_datetime_rowindex is not None:
-        _n_steps = len(
-            range(
-                oospore_maturation_datetime_rowindex,
-                len(processed_data.index),
-                computational_time_steps,
+    # Stage results shared by all infection events of this run.
+    run_stage_cache = stage_cache.StageCache()
+
+    # Calls, wall time and rows scanned of the stage functions, only collected when
+    # enabled in run_settings, as is the profile of the start-row loop.
+    run_stage_metrics = (
+        stage_metrics.StageMetrics()
+        if config.run_settings.get("stage_metrics", False)
+        else None
+    )
+    loop_seconds = None
+
+    # Oospore infections already found in this run, so that each one is
+    # incubated only once.
+    oospore_infection_registry = infection_registry.InfectionRegistry()
+
+    # Infection chains of the previous run on the same run name, reused when they
+    # read no weather row at or after the first row changed since then.
+    previous_run_state = None
+    first_changed_rowindex = 0
+    reused_chains = 0
+    incremental_model = config.run_settings.get("incremental_model", False)
+    if incremental_model and oospore_maturation_datetime_rowindex is not None:
+        previous_run_state = run_state.load_run_state(output_files.run_state)
+        if previous_run_state is not None:
+            first_changed_rowindex = previous_run_state.get_first_changed_rowindex(
+                config, weather, oospore_maturation_datetime_rowindex
             )
+    current_run_state = run_state.RunState(
+        config, weather, oospore_maturation_datetime_rowindex
+    )
+
+    if oospore_maturation_datetime_rowindex is not None:
+        start_event_rowindexes = range(
+            oospore_maturation_datetime_rowindex,
+            len(weather),
+            computational_time_steps,
         )
         _interactive = sys.stderr.isatty()
         if not _interactive:
-            print(f"Running infection model: {_n_steps} steps...", flush=True)
+            print(
+                f"Running infection model: {len(start_event_rowindexes)} steps...",
+                flush=True,
+            )
+
+        profiler = None
+        if config.run_settings.get("profile", False):
+            profiler = cProfile.Profile()
+            profiler.enable()
+        t_loop_start = time.perf_counter()
+
+        # INFO messages of the quiet loggers are dropped from here to the end of
+        # the start-row loop, see run_logging.set_hot_loop.
+        run_logging.set_hot_loop(True)
+
+        # In parallel mode, the start rows to recompute are computed up front by a
+        # pool of worker processes, and the loop below only collects and writes out
+        # their results.
+        if workers > 1:
+            logger.info(f"\nRunning infection model with {workers} worker processes.\n")
         progress_bar = tqdm(
-            range(
-                oospore_maturation_datetime_rowindex,
-                len(processed_data.index),
-                computational_time_steps,
+            infection_event.predict_infections(
+                weather,
+                config,
+                start_event_rowindexes,
+                oospore_maturation_datetime,
+                daily_weather,
+                daily_infection_strengths,
+                algorithmic_time_steps,
+                oospore_infection_registry,
+                run_stage_cache,
+                run_stage_metrics,
+                workers,
+                previous_run_state,
+                first_changed_rowindex,
+                _interactive,
             ),
+            total=len(start_event_rowindexes),
             disable=not _interactive,
         )
 
         # Progress bar output on terminal.
-        for i in progress_bar:
-            infection_prediction = infection_event.InfectionEvent(
-                processed_data,
-                config,
+        for infection_prediction, is_reused in progress_bar:
+            i = infection_prediction.start_event_rowindex
+            reused_chains += is_reused
+            current_run_state.add_chain(
                 i,
-                oospore_maturation_datetime,
-                daily_mean_temperatures,
-                algorithmic_time_steps,
-                logfile,
-                oospore_infection_datetimes,
-                None,  # shortcut events are injected separately after this loop
+                infection_prediction.infection_events,
+                infection_prediction.chain_state,
             )
-            infection_prediction.predict_infection()
             infection_events.append(infection_prediction.infection_events)
             infection_predictions.append(infection_prediction)
 
             progress_bar.set_description(
-                f"DateTime Row {i}/{len(processed_data.index)}: {infection_prediction.start_event_datetime}"
+                f"DateTime Row {i}/{len(weather)}: {infection_prediction.start_event_datetime}"
             )
 
-            ## Appending InfectionEvent results at every iteration so to make the results dynamically
-            ## accessible during model runtime.
-            with open(output_files.events_text, "a") as f:
-                f.write(str(infection_prediction) + "\n")
+            ## Buffering InfectionEvent results at every iteration, written in batches so
+            ## that the results remain dynamically accessible during model runtime.
+            run_output_writer.write(infection_prediction)
 
             ## Adding collateral infection counts (i.e. subsequent secondary infections
             ## from succesful secondary infections) to overall secondary infections.
@@ -569,59 +655,28 @@ def main(config: DictConfig):  # noqa: C901
             #             + "\n"
             #         )
             #         f.write(output_str)
-            with open(output_files.infection_datetimes, "a") as f:
-                _ev = infection_prediction.infection_events
-                if _ev["oospore_infection"] is not None:
-                    _sec_infs = [
-                        si
-                        for sl in (_ev.get("secondary_infections") or [])
-                        for si in sl
-                    ]
-                    _sporuls = _ev.get("sporulations") or []
-                    _spor_dens = _ev.get("sporangia_densities") or []
-                    _oosp_strength = _ev.get("oospore_infection_strength")
-                    _sec_strengths = [
-                        s
-                        for sl in (_ev.get("secondary_infection_strengths") or [])
-                        for s in sl
-                    ]
-                    _n_rows = max(1, len(_sec_infs), len(_sporuls))
-                    for _ri in range(_n_rows):
-                        f.write(
-                            str(infection_prediction.start_event_rowindex)
-                            + ","
-                            + str(infection_prediction.start_event_datetime)
-                            + ","
-                            + str(_ev["oospore_maturation"])
-                            + ","
-                            + str(_ev["oospore_germination"])
-                            + ","
-                            + str(_ev["oospore_dispersion"])
-                            + ","
-                            + str(_ev["oospore_infection"])
-                            + ","
-                            + str(_ev["completed_incubation"])
-                            + ","
-                            + str(_sporuls[_ri] if _ri < len(_sporuls) else "NA")
-                            + ","
-                            + str(_spor_dens[_ri] if _ri < len(_spor_dens) else "NA")
-                            + ","
-                            + str(_sec_infs[_ri] if _ri < len(_sec_infs) else "NA")
-                            + ","
-                            + str(
-                                _oosp_strength if _oosp_strength is not None else "NA"
-                            )
-                            + ","
-                            + str(
-                                _sec_strengths[_ri]
-                                if _ri < len(_sec_strengths)
-                                else "NA"
-                            )
-                            + "\n"
-                        )
+
+        run_logging.set_hot_loop(False)
+        loop_seconds = time.perf_counter() - t_loop_start
+        if profiler is not None:
+            # In parallel mode, the profile only covers the main process.
+            profiler.disable()
+            profiler.dump_stats(output_files.profile)
+            logger.info(
+                f"\nProfile of the infection model loop written to: {output_files.profile}\n"
+            )
+        run_output_writer.flush()
+        run_logging.flush_run_logging()
+
+        if previous_run_state is not None:
+            logger.info(
+                f"\nIncremental model run: {reused_chains}/{len(current_run_state)} infection chains reused from the previous run (first changed weather row: {first_changed_rowindex}).\n"
+            )
+        if incremental_model:
+            current_run_state.save(output_files.run_state)
 
     else:
-        logf.write(
+        logger.info(
             "\nOospore maturation conditions not reached. Normal model loop skipped; "
             "processing spore count shortcut events only.\n"
         )
@@ -667,9 +722,7 @@ def main(config: DictConfig):  # noqa: C901
             )
             if _anchor_raw is None:
                 continue
-            _sc_dt = pd.to_datetime(_anchor_raw)
-            if processed_data["datetime"].dt.tz is not None and _sc_dt.tzinfo is None:
-                _sc_dt = _sc_dt.tz_localize(timezone)
+            _sc_dt = weather.localize(_anchor_raw)
 
             # ---------------------------------------------------------- #
             # GUARD: sporulation shortcuts (percent-increase condition)   #
@@ -686,117 +739,73 @@ def main(config: DictConfig):  # noqa: C901
                 ]
                 _has_prior = any(pi <= _sc_dt for pi in _prior_infections)
                 if not _has_prior:
-                    with open(logfile, "a") as _logf:
-                        _logf.write(
-                            f"\nSporulation shortcut at {_sc_dt} skipped: "
-                            f"no prior oospore/primary infection event found.\n"
-                        )
+                    logger.info(
+                        f"\nSporulation shortcut at {_sc_dt} skipped: "
+                        f"no prior oospore/primary infection event found.\n"
+                    )
                     continue
 
-            _closest = (processed_data["datetime"] - _sc_dt).abs().argmin()
-            _sc_rowindex = processed_data.index.get_loc(processed_data.index[_closest])
+            _sc_rowindex = weather.nearest_rowindex(_sc_dt)
 
             _sc_event = infection_event.InfectionEvent(
-                processed_data,
+                weather,
                 config,
                 _sc_rowindex,
                 oospore_maturation_datetime,
-                daily_mean_temperatures,
+                daily_weather,
+                daily_infection_strengths,
                 algorithmic_time_steps,
-                logfile,
-                oospore_infection_datetimes,
+                oospore_infection_registry,
                 _sc_result,
+                run_stage_cache,
+                run_stage_metrics,
             )
             _sc_event.predict_infection()
             infection_events.append(_sc_event.infection_events)
             infection_predictions.append(_sc_event)
 
-            with open(output_files.events_text, "a") as f:
-                f.write(str(_sc_event) + "\n")
-
-            with open(output_files.infection_datetimes, "a") as f:
-                _sc_ev = _sc_event.infection_events
-                if _sc_ev["oospore_infection"] is not None:
-                    _sc_sec = [
-                        si
-                        for sl in (_sc_ev.get("secondary_infections") or [])
-                        for si in sl
-                    ]
-                    _sc_spor = _sc_ev.get("sporulations") or []
-                    _sc_dens = _sc_ev.get("sporangia_densities") or []
-                    _sc_oosp_strength = _sc_ev.get("oospore_infection_strength")
-                    _sc_sec_strengths = [
-                        s
-                        for sl in (_sc_ev.get("secondary_infection_strengths") or [])
-                        for s in sl
-                    ]
-                    _sc_rows = max(1, len(_sc_sec), len(_sc_spor))
-                    for _sc_ri in range(_sc_rows):
-                        f.write(
-                            str(_sc_event.start_event_rowindex)
-                            + ","
-                            + str(_sc_event.start_event_datetime)
-                            + ","
-                            + str(_sc_ev["oospore_maturation"])
-                            + ","
-                            + str(_sc_ev["oospore_germination"])
-                            + ","
-                            + str(_sc_ev["oospore_dispersion"])
-                            + ","
-                            + str(_sc_ev["oospore_infection"])
-                            + ","
-                            + str(_sc_ev["completed_incubation"])
-                            + ","
-                            + str(_sc_spor[_sc_ri] if _sc_ri < len(_sc_spor) else "NA")
-                            + ","
-                            + str(_sc_dens[_sc_ri] if _sc_ri < len(_sc_dens) else "NA")
-                            + ","
-                            + str(_sc_sec[_sc_ri] if _sc_ri < len(_sc_sec) else "NA")
-                            + ","
-                            + str(
-                                _sc_oosp_strength
-                                if _sc_oosp_strength is not None
-                                else "NA"
-                            )
-                            + ","
-                            + str(
-                                _sc_sec_strengths[_sc_ri]
-                                if _sc_ri < len(_sc_sec_strengths)
-                                else "NA"
-                            )
-                            + "\n"
-                        )
+            run_output_writer.write(_sc_event)
+
+    run_output_writer.close()
+
+    logger.info(run_stage_cache.summary())
+
+    if run_stage_metrics is not None:
+        logger.info(run_stage_metrics.summary())
+        run_stage_metrics.save(
+            output_files.stage_metrics,
+            loop_seconds=loop_seconds,
+            start_rows=len(current_run_state),
+            reused_chains=reused_chains,
+            workers=workers,
+            stage_cache_hits=run_stage_cache.hits,
+            stage_cache_misses=run_stage_cache.misses,
+        )
+
+    if config.output.get("save_infection_registry", False):
+        oospore_infection_registry.save(output_files.oospore_infection_datetimes)
+
+    # Typed result tables of all infection events, read back by the plots.
+    run_result_store = result_store.ResultStore.from_infection_predictions(
+        infection_predictions, weather
+    )
+    run_result_store.save(output_files.result_store)
+    run_result_store.get_events_table().to_csv(
+        output_files.events_dataframe, index=False, na_rep="None"
+    )
 
     if not infection_events:
-        logf.write(
+        logger.info(
             "\nNo infection events produced (no maturation and no spore count shortcuts triggered).\n"
         )
 
-        # Write empty events dataframe (headers only) so plots can be generated
-        _EMPTY_EVENT_COLS = [
-            "id",
-            "start",
-            "oospore_maturation",
-            "oospore_germination",
-            "oospore_dispersion",
-            "oospore_infection",
-            "completed_incubation",
-            "sporulations",
-            "sporangia_densities",
-            "secondary_infections",
-            "oospore_infection_strength",
-            "secondary_infection_strengths",
-        ]
-        with open(output_files.events_dataframe, "w") as _ef:
-            _ef.write(",".join(_EMPTY_EVENT_COLS) + "\n")
-
         # Derive fallback date range from the processed weather data
         _meteo_dates = processed_data["datetime"].dt.date
         _fallback_range = (_meteo_dates.min(), _meteo_dates.max())
 
         # Generate all plots even with no infection events
         plots.plot_model_infection_chains_pdf(
-            output_files.events_dataframe,
+            output_files.result_store,
             output_files.analysis_pdf,
             model_parameters=config,
             spore_counts_path=input_spore_file,
@@ -806,7 +815,7 @@ def main(config: DictConfig):  # noqa: C901
         )
 
         analysis_fig = plots.plot_model_infection_chains(
-            output_files.events_dataframe,
+            output_files.result_store,
             output_files.analysis_html,
             model_parameters=config,
             spore_counts_path=input_spore_file,
@@ -816,7 +825,7 @@ def main(config: DictConfig):  # noqa: C901
             weather_data_path=output_files.processed_file_meteo,
         )
         plots.plot_spore_driven_model_overview(
-            output_files.events_dataframe,
+            output_files.result_store,
             output_files.overview_html,
             model_parameters=config,
             spore_counts_result=spore_counts_result,
@@ -825,11 +834,12 @@ def main(config: DictConfig):  # noqa: C901
             + (config.input_data.meteo or "automated pull"),
         )
         risk_heatmap_fig = plots.plot_risk_heatmap(
-            output_files.events_dataframe,
+            output_files.result_store,
             output_files.decision_support_html,
             model_parameters=config,
             spore_counts_path=input_spore_file,
             fallback_date_range=_fallback_range,
+            daily_infection_strengths=daily_infection_strengths,
         )
         _spore_graph_url = config.input_data.get("spore_counts_graph") or None
         plots.write_combined_html(
@@ -840,107 +850,39 @@ def main(config: DictConfig):  # noqa: C901
         )
 
         t_end = datetime.now()
-        logf.write(f"Runtime end: {t_end}\nRuntime total: {t_end - t_start}\n")
+        logger.info(f"Runtime end: {t_end}\nRuntime total: {t_end - t_start}\n")
         if data_pull_stop_event is not None:
             data_pull_stop_event.set()
             if data_pull_thread is not None and data_pull_thread.is_alive():
                 data_pull_thread.join(timeout=5)
-        logf.close()
+        run_logging.close_run_logging()
         return
 
-    logf.write(
+    logger.info(
         f"\nModel run complete. Infection events details and summary of predicted infection datetimes are stored in '{output_files.logfile.parent}'.\n"
     )
 
     # End the timer.
     t_end = datetime.now()
-    logf.write(f"Runtime end: {t_end}\n")
+    logger.info(f"Runtime end: {t_end}\n")
 
     # Calculate the elapsed time.
     t_diff = t_end - t_start
-    logf.write(f"Runtime total: {t_diff}\n")
+    logger.info(f"Runtime total: {t_diff}\n")
 
     # Stop automated data pull if it was started
     if data_pull_stop_event is not None:
-        logf.write("\nStopping automated weather data pull thread...\n")
+        logger.info("\nStopping automated weather data pull thread...\n")
         data_pull_stop_event.set()
         if data_pull_thread is not None and data_pull_thread.is_alive():
             data_pull_thread.join(timeout=5)
 
-    # Close the log file.
-    logf.close()
+    # Write the buffered log records and close the log files.
+    run_logging.close_run_logging()
 
-    with open(output_files.events_dict, "wb") as pickle_file:
-        pickle.dump(infection_events, pickle_file)
     with open(output_files.model_params, "wb") as pickle_file:
         pickle.dump(config, pickle_file)
 
-    ### WRITE CSV "DATAFRAME" OF ALL INFECTION EVENTS DATETIMES
-    # secondary_infections and secondary_infection_strengths are list-of-lists:
-    # one sublist per sporulation. Expand to one row per (sporulation, secondary
-    # infection) pair so every event appears with its correct paired sporulation.
-    with open(output_files.events_dataframe, "w") as f:
-        event_columns = list(infection_events[0].keys())
-        event_columns.insert(0, "id")
-        event_columns.insert(1, "start")
-        wr = csv.writer(f, quoting=csv.QUOTE_NONE)
-        wr.writerow(event_columns)
-        for event_id, event in enumerate(infection_events):
-            start_time = infection_predictions[event_id].start_event_datetime
-            chain_id = infection_predictions[event_id].id
-            sporulations = event.get("sporulations") or []
-            sporangia = event.get("sporangia_densities") or []
-            lifespan = event.get("spore_lifespan_days") or []
-            sec_infs_nested = event.get("secondary_infections") or []
-            sec_str_nested = event.get("secondary_infection_strengths") or []
-            n_spors = len(sporulations) if sporulations else 1
-            for spor_idx in range(n_spors):
-                spor_sec = (
-                    sec_infs_nested[spor_idx] if spor_idx < len(sec_infs_nested) else []
-                )
-                spor_str = (
-                    sec_str_nested[spor_idx] if spor_idx < len(sec_str_nested) else []
-                )
-                n_secs = len(spor_sec) if spor_sec else 1
-                for sec_idx in range(n_secs):
-                    row = [str(chain_id), str(start_time)]
-                    for key, item in event.items():
-                        if key == "sporulations":
-                            row.append(
-                                str(sporulations[spor_idx])
-                                if spor_idx < len(sporulations)
-                                else "None"
-                            )
-                        elif key == "sporangia_densities":
-                            row.append(
-                                str(sporangia[spor_idx])
-                                if spor_idx < len(sporangia)
-                                else "None"
-                            )
-                        elif key == "spore_lifespan_days":
-                            row.append(
-                                str(lifespan[spor_idx])
-                                if spor_idx < len(lifespan)
-                                else "None"
-                            )
-                        elif key == "secondary_infections":
-                            val = (
-                                spor_sec[sec_idx]
-                                if spor_sec and sec_idx < len(spor_sec)
-                                else None
-                            )
-                            row.append(str(val) if val is not None else "None")
-                        elif key == "secondary_infection_strengths":
-                            val = (
-                                spor_str[sec_idx]
-                                if spor_str and sec_idx < len(spor_str)
-                                else None
-                            )
-                            row.append(str(val) if val is not None else "None")
-                        else:
-                            row.append(str(item))
-                    f.write(",".join(row) + "\n")
-
     # Full weather date range — used by plots to extend the default view to
     # include forecast dates beyond the last infection event or spore count.
     _meteo_dates = processed_data["datetime"].dt.date
@@ -948,7 +890,7 @@ def main(config: DictConfig):  # noqa: C901
 
     # PDF reproduction of the infection-chain analysis plot.
     plots.plot_model_infection_chains_pdf(
-        output_files.events_dataframe,
+        output_files.result_store,
         output_files.analysis_pdf,
         model_parameters=config,
         spore_counts_path=input_spore_file,
@@ -958,7 +900,7 @@ def main(config: DictConfig):  # noqa: C901
 
     # Detailed infection chain plot (developer / analysis view).
     analysis_fig = plots.plot_model_infection_chains(
-        output_files.events_dataframe,
+        output_files.result_store,
         output_files.analysis_html,
         model_parameters=config,
         spore_counts_path=input_spore_file,
@@ -969,7 +911,7 @@ def main(config: DictConfig):  # noqa: C901
 
     # Spore-driven model overview: spore counts integrated into the algorithm.
     overview_fig = plots.plot_spore_driven_model_overview(
-        output_files.events_dataframe,
+        output_files.result_store,
         output_files.overview_html,
         model_parameters=config,
         spore_counts_result=spore_counts_result,
@@ -981,11 +923,12 @@ def main(config: DictConfig):  # noqa: C901
 
     # Risk heatmap: independent model + spore rows, visual only, smartphone view.
     risk_heatmap_fig = plots.plot_risk_heatmap(
-        output_files.events_dataframe,
+        output_files.result_store,
         output_files.decision_support_html,
         model_parameters=config,
         spore_counts_path=input_spore_file,
         fallback_date_range=_fallback_range,
+        daily_infection_strengths=daily_infection_strengths,
     )
 
     # Combined mobile HTML: risk heatmap (primary) + infection chains (secondary).
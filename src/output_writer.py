@@ -0,0 +1,165 @@
+"""
+OutputWriter class definition script for the per-start-row output files of a model run.
+
+"""
+
+import csv
+
+import pandas as pd
+
+# Header of the infection datetimes output file.
+infection_datetimes_header = (
+    "id",
+    "start",
+    "oospore_maturation",
+    "oospore_germination",
+    "oospore_dispersion",
+    "oospore_infection",
+    "completed_incubation",
+    "sporulation",
+    "sporangia_density",
+    "secondary_infection",
+    "oospore_infection_strength",
+    "secondary_infection_strength",
+)
+
+
+class OutputWriter:
+    """
+    Class OutputWriter keeping one buffered handle open per output file written
+    during the infection model loop (events log and infection datetimes), instead
+    of opening both files in append mode for every start row.
+
+    Rows are buffered in memory and written every flush_rows infection events, at
+    checkpoints (flush) and when the writer is closed, so that the results remain
+    accessible during long model runs. The infection datetimes are written with the
+    csv module, formatted as before (datetimes and numbers as strings, "None" for
+    missing events and "NA" for missing per-sporulation values).
+
+    """
+
+    def __init__(self, events_text, infection_datetimes, flush_rows=1000):
+        """
+        Object initialisation function, clearing both output files to avoid
+        appending the results of a previous model run.
+
+        """
+        self.events_file = open(events_text, "w")
+        self.infection_datetimes_file = open(infection_datetimes, "w", newline="")
+        self.infection_datetimes_writer = csv.writer(
+            self.infection_datetimes_file, lineterminator="\n"
+        )
+        self.infection_datetimes_writer.writerow(infection_datetimes_header)
+        self.flush_rows = max(1, flush_rows)
+        self.events_buffer = []
+        self.infection_datetimes_buffer = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, infection_prediction):
+        """
+        Buffers the events log line and the infection datetimes rows of the given
+        InfectionEvent, and writes the buffers every flush_rows infection events.
+
+        """
+        self.events_buffer.append(str(infection_prediction) + "\n")
+        self.infection_datetimes_buffer.extend(
+            get_infection_datetimes_rows(infection_prediction)
+        )
+        if len(self.events_buffer) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered rows and flushes both output files.
+
+        """
+        self.events_file.writelines(self.events_buffer)
+        self.infection_datetimes_writer.writerows(self.infection_datetimes_buffer)
+        self.events_buffer.clear()
+        self.infection_datetimes_buffer.clear()
+        self.events_file.flush()
+        self.infection_datetimes_file.flush()
+
+    def close(self):
+        """
+        Writes the buffered rows and closes both output files.
+
+        """
+        if self.events_file.closed:
+            return
+        self.flush()
+        self.events_file.close()
+        self.infection_datetimes_file.close()
+
+
+def format_value(value):
+    """
+    Formats an infection event value for the infection datetimes output file.
+
+    """
+    if value is None:
+        return "None"
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat(sep=" ")
+    return str(value)
+
+
+def get_infection_datetimes_rows(infection_prediction):
+    """
+    Returns the infection datetimes rows of an InfectionEvent: none if it has no
+    oospore infection, else one row per sporulation or secondary infection (at
+    least one), missing per-sporulation values being written as "NA".
+
+    """
+    infection_events = infection_prediction.infection_events
+    if infection_events["oospore_infection"] is None:
+        return []
+    secondary_infections = [
+        secondary_infection
+        for secondary_infections in (infection_events.get("secondary_infections") or [])
+        for secondary_infection in secondary_infections
+    ]
+    sporulations = infection_events.get("sporulations") or []
+    sporangia_densities = infection_events.get("sporangia_densities") or []
+    oospore_infection_strength = infection_events.get("oospore_infection_strength")
+    secondary_infection_strengths = [
+        secondary_infection_strength
+        for secondary_infection_strengths in (
+            infection_events.get("secondary_infection_strengths") or []
+        )
+        for secondary_infection_strength in secondary_infection_strengths
+    ]
+    leading_values = [
+        str(infection_prediction.start_event_rowindex),
+        format_value(infection_prediction.start_event_datetime),
+        format_value(infection_events["oospore_maturation"]),
+        format_value(infection_events["oospore_germination"]),
+        format_value(infection_events["oospore_dispersion"]),
+        format_value(infection_events["oospore_infection"]),
+        format_value(infection_events["completed_incubation"]),
+    ]
+    oospore_infection_strength = (
+        "NA"
+        if oospore_infection_strength is None
+        else format_value(oospore_infection_strength)
+    )
+
+    def _get(values, rowindex):
+        return format_value(values[rowindex]) if rowindex < len(values) else "NA"
+
+    return [
+        leading_values
+        + [
+            _get(sporulations, rowindex),
+            _get(sporangia_densities, rowindex),
+            _get(secondary_infections, rowindex),
+            oospore_infection_strength,
+            _get(secondary_infection_strengths, rowindex),
+        ]
+        for rowindex in range(max(1, len(secondary_infections), len(sporulations)))
+    ]
@@ -41,6 +41,7 @@ import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
 import pandas as pd
 import plotly.graph_objects as go
+import result_store
 
 # ---------------------------------------------------------------------------
 # PDF — infection event scatter (matplotlib)
@@ -48,7 +49,7 @@ import plotly.graph_objects as go
 
 
 def plot_model_infection_chains_pdf(  # noqa: C901
-    events_dataframe_path,
+    result_store_path,
     pdf_path,
     model_parameters=None,
     spore_counts_path=None,
@@ -72,26 +73,9 @@ def plot_model_infection_chains_pdf(  # noqa: C901
     import datetime as _dt
 
     # ------------------------------------------------------------------ #
-    # Load and parse events dataframe                                     #
+    # Load typed events table from the result store                      #
     # ------------------------------------------------------------------ #
-    df = pd.read_csv(events_dataframe_path)
-    _dt_cols = [
-        "start",
-        "oospore_maturation",
-        "oospore_germination",
-        "oospore_dispersion",
-        "oospore_infection",
-        "completed_incubation",
-        "sporulations",
-        "secondary_infections",
-    ]
-    for col in _dt_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
-    if "sporangia_densities" in df.columns:
-        df["sporangia_densities"] = pd.to_numeric(
-            df["sporangia_densities"], errors="coerce"
-        )
+    df = result_store.load_events_table(result_store_path)
     df["_shortcut"] = df["oospore_germination"].isna() & (
         df["oospore_dispersion"].notna() | df["sporulations"].notna()
     )
@@ -134,7 +118,7 @@ def plot_model_infection_chains_pdf(  # noqa: C901
     # Determine full date range and figure width                          #
     # ------------------------------------------------------------------ #
     _all_dts = []
-    for col in _dt_cols:
+    for col in result_store.events_datetime_columns:
         if col in df.columns:
             _all_dts.extend(df[col].dropna().tolist())
     _first = min(v.date() for v in _all_dts) if _all_dts else _dt.date.today()
@@ -355,7 +339,7 @@ def plot_model_infection_chains_pdf(  # noqa: C901
 
 
 def plot_model_infection_chains(  # noqa: C901
-    events_dataframe_path,
+    result_store_path,
     output_html_path,
     model_parameters=None,
     spore_counts_path=None,
@@ -373,26 +357,7 @@ def plot_model_infection_chains(  # noqa: C901
       - Chains triggered by the spore-driven model shortcut are drawn in red.
       - Daily spore counts as light-blue bars on the right y-axis.
     """
-    df = pd.read_csv(events_dataframe_path)
-
-    dt_cols = [
-        "start",
-        "oospore_maturation",
-        "oospore_germination",
-        "oospore_dispersion",
-        "oospore_infection",
-        "completed_incubation",
-        "sporulations",
-        "secondary_infections",
-    ]
-    for col in dt_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
-
-    if "sporangia_densities" in df.columns:
-        df["sporangia_densities"] = pd.to_numeric(
-            df["sporangia_densities"], errors="coerce"
-        )
+    df = result_store.load_events_table(result_store_path)
 
     # Spore-driven model shortcut detection:
     # skip_to_dispersion : germination=NaN, dispersion=not NaN
@@ -689,7 +654,7 @@ def plot_model_infection_chains(  # noqa: C901
     import json as _json
 
     _chain_all_dt: list = []
-    for col in dt_cols:
+    for col in result_store.events_datetime_columns:
         if col in df.columns:
             _chain_all_dt.extend(df[col].dropna().tolist())
     _chain_last = (
@@ -834,7 +799,7 @@ def plot_model_infection_chains(  # noqa: C901
 
 
 def plot_spore_driven_model_overview(  # noqa: C901
-    events_dataframe_path,
+    result_store_path,
     output_html_path,
     model_parameters=None,
     spore_counts_result=None,
@@ -857,18 +822,7 @@ def plot_spore_driven_model_overview(  # noqa: C901
     """
     import datetime as _dt
 
-    df = pd.read_csv(events_dataframe_path)
-
-    dt_cols = [
-        "start",
-        "oospore_dispersion",
-        "oospore_infection",
-        "sporulations",
-        "secondary_infections",
-    ]
-    for col in dt_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
+    df = result_store.load_events_table(result_store_path)
 
     sc_x, sc_y = [], []
     sc_days: set = set()
@@ -915,7 +869,7 @@ def plot_spore_driven_model_overview(  # noqa: C901
             col_start = df["start"].dropna().min().date()
             range_start = min(range_start, col_start)
         df_dates = []
-        for col in dt_cols:
+        for col in result_store.events_datetime_columns:
             if col in df.columns:
                 df_dates += [ts.date() for ts in df[col].dropna()]
         all_endpoint_dates = (
@@ -1048,12 +1002,13 @@ def plot_spore_driven_model_overview(  # noqa: C901
 
 
 def plot_risk_heatmap(  # noqa: C901
-    events_dataframe_path,
+    result_store_path,
     output_html_path,
     model_parameters=None,
     spore_counts_path=None,
     title="Risk heatmap",
     fallback_date_range=None,
+    daily_infection_strengths=None,
 ):
     """
     Smartphone-optimised three-row heatmap saved to *output_html_path*.
@@ -1070,6 +1025,11 @@ def plot_risk_heatmap(  # noqa: C901
       model_thresholds:   lower boundaries of light-pink / salmon / red bands (°C·h)
       spore_count_thresholds: same for the Spore-count row (counts)
       Risk:               no separate thresholds — derived from the two category indices
+
+    When *daily_infection_strengths* (the per-date table of
+    utils.get_daily_infection_strengths) is given, the strength of each
+    infection carrying one in the events dataframe is looked up there instead
+    of being parsed back from the CSV.
     """
     import datetime as _dt
 
@@ -1085,21 +1045,12 @@ def plot_risk_heatmap(  # noqa: C901
     # ------------------------------------------------------------------ #
     # Load events dataframe                                               #
     # ------------------------------------------------------------------ #
-    df = pd.read_csv(events_dataframe_path)
-    for col in ("oospore_infection", "secondary_infections"):
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601")
-    for col in ("oospore_infection_strength", "secondary_infection_strengths"):
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = result_store.load_events_table(result_store_path)
 
     # ---- Filter out spore-count shortcut infections ---- #
     # Shortcuts are events where germination is absent but the model jumped
     # directly to dispersion or sporulation because spore counts met the
     # threshold.  These must not appear in the weather-only "Weather" row.
-    for _scol in ("oospore_germination", "oospore_dispersion", "sporulations"):
-        if _scol in df.columns:
-            df[_scol] = pd.to_datetime(df[_scol], errors="coerce")
     _has_germ = "oospore_germination" in df.columns
     _has_disp = "oospore_dispersion" in df.columns
     _has_spor = "sporulations" in df.columns
@@ -1112,25 +1063,23 @@ def plot_risk_heatmap(  # noqa: C901
 
     model_strength_by_day: dict = {}
     infection_days: set = set()  # calendar dates with a successful infection
-    if "oospore_infection" in df.columns:
-        for _, row in df.iterrows():
-            dt = row.get("oospore_infection")
-            s = row.get("oospore_infection_strength")
-            if pd.notna(dt):
-                infection_days.add(dt.date())
-                if pd.notna(s):
-                    d = dt.date()
-                    model_strength_by_day[d] = max(
-                        model_strength_by_day.get(d, 0.0), float(s)
-                    )
-    if "secondary_infections" in df.columns:
-        for _, row in df.iterrows():
-            dt = row.get("secondary_infections")
-            s = row.get("secondary_infection_strengths")
+    for dt_col, s_col in (
+        ("oospore_infection", "oospore_infection_strength"),
+        ("secondary_infections", "secondary_infection_strengths"),
+    ):
+        if dt_col not in df.columns:
+            continue
+        for dt, s in zip(
+            df[dt_col],
+            df[s_col] if s_col in df.columns else [None] * len(df),
+            strict=True,
+        ):
             if pd.notna(dt):
-                infection_days.add(dt.date())
+                d = dt.date()
+                infection_days.add(d)
+                if pd.notna(s) and daily_infection_strengths is not None:
+                    s = daily_infection_strengths[d]
                 if pd.notna(s):
-                    d = dt.date()
                     model_strength_by_day[d] = max(
                         model_strength_by_day.get(d, 0.0), float(s)
                     )
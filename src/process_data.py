@@ -5,9 +5,12 @@ Data processing functions.
 
 import numpy as np
 import pandas as pd
+import run_logging
 
+logger = run_logging.get_logger(__name__)
 
-def normalize_leaf_wetness(processed_data, measurement_time_interval, logfile):
+
+def normalize_leaf_wetness(processed_data, measurement_time_interval):
     """
     **Detect the encoding of leaf_wetness values and normalize to a 0–1 ratio.**
 
@@ -28,32 +31,393 @@ def normalize_leaf_wetness(processed_data, measurement_time_interval, logfile):
 
     lw = processed_data["leaf_wetness"].dropna()
 
-    with open(logfile, "a") as logf:
-        if lw.empty or lw.max() <= 1.0:
-            logf.write(
-                "\nLeaf wetness detected as binary or already normalized (max <= 1): "
-                "no normalization applied.\n"
-            )
-        else:
-            logf.write(
-                f"\nLeaf wetness detected as minutes-based (max = {lw.max():.1f}): "
-                f"normalizing by measurement_time_interval ({measurement_time_interval} min) "
-                "to ratio [0–1].\n"
-            )
-            processed_data = processed_data.copy()
-            processed_data["leaf_wetness"] = (
-                processed_data["leaf_wetness"] / measurement_time_interval
-            )
+    if lw.empty or lw.max() <= 1.0:
+        logger.info(
+            "\nLeaf wetness detected as binary or already normalized (max <= 1): "
+            "no normalization applied.\n"
+        )
+    else:
+        logger.info(
+            f"\nLeaf wetness detected as minutes-based (max = {lw.max():.1f}): "
+            f"normalizing by measurement_time_interval ({measurement_time_interval} min) "
+            "to ratio [0–1].\n"
+        )
+        processed_data = processed_data.copy()
+        processed_data["leaf_wetness"] = (
+            processed_data["leaf_wetness"] / measurement_time_interval
+        )
 
     return processed_data
 
 
-def map_to_timegrid(data):
+def map_to_timegrid(data, measurement_time_interval, timezone):
     """
     **Create a complete time grid at selected time interval to which measurement
     data will be mapped onto, in order to avoid missing rows and uneven time intervals
     due to missing data.**
+
+    The grid runs from the first to the last datetime of the data (first column),
+    so that row i of the mapped data holds time t0 + i * measurement_time_interval.
+    Measurements are placed on the grid by their integer epoch offset from t0:
+    timestamps falling between grid times (e.g. hourly API data mixed with
+    10-minute files) are moved down to the preceding grid time if no measurement
+    falls exactly on it, and of several measurements for the same grid time the
+    first one on the grid is kept. Grid times without measurement get NaN values.
+
+    return
+    : mapped dataframe, dictionary of coverage statistics
+
+    """
+    datetime_colname = data.columns[0]
+    start_timegrid = data.iloc[0, 0]
+    end_timegrid = data.iloc[-1, 0]
+    interval = pd.Timedelta(minutes=measurement_time_interval).value
+    number_of_gridrows = max((end_timegrid - start_timegrid).value // interval + 1, 0)
+
+    datetimes = pd.DatetimeIndex(data[datetime_colname])
+    offsets = datetimes.as_unit("ns").asi8 - start_timegrid.value
+    gridrows = offsets // interval
+    is_on_grid = offsets % interval == 0
+    is_in_grid = ~datetimes.isna() & (gridrows >= 0) & (gridrows < number_of_gridrows)
+
+    # Ordering candidate rows by grid row, then on-grid first, then input order,
+    # and keeping the first one of each grid row.
+    rowindexes = np.flatnonzero(is_in_grid)
+    rowindexes = rowindexes[
+        np.lexsort((rowindexes, ~is_on_grid[rowindexes], gridrows[rowindexes]))
+    ]
+    is_kept = np.r_[True, np.diff(gridrows[rowindexes]) != 0][: len(rowindexes)]
+    kept_rowindexes = rowindexes[is_kept]
+
+    measurements = data.drop(columns=datetime_colname).iloc[kept_rowindexes]
+    measurements.index = gridrows[kept_rowindexes]
+    mapped_data = measurements.reindex(range(number_of_gridrows))
+    mapped_data.insert(
+        0,
+        datetime_colname,
+        pd.date_range(
+            start=start_timegrid,
+            periods=number_of_gridrows,
+            freq=str(measurement_time_interval) + "min",
+            tz=timezone,
+        ),
+    )
+
+    coverage = {
+        "grid_rows": int(number_of_gridrows),
+        "filled_rows": int(len(kept_rowindexes)),
+        "empty_rows": int(number_of_gridrows - len(kept_rowindexes)),
+        "coverage_percent": (
+            round(100 * len(kept_rowindexes) / number_of_gridrows, 2)
+            if number_of_gridrows
+            else 0.0
+        ),
+        "duplicate_rows": int((~is_kept).sum()),
+        "off_grid_rows_moved": int((~is_on_grid[kept_rowindexes]).sum()),
+        "out_of_grid_rows": int((~is_in_grid).sum()),
+    }
+    return mapped_data, coverage
+
+
+# Columns of the data quality report written by process_data.
+qc_report_columns = [
+    "column",
+    "tolerated_min",
+    "tolerated_max",
+    "missing",
+    "below_min",
+    "above_max",
+    "set_to_nan",
+    "clipped",
+    "first_offending",
+    "last_offending",
+]
+
+
+def check_tolerated_ranges(processed_data, standard_colnames, standard_colformats):
+    """
+    **Set non-numeric and out-of-range measurements to NaN, column by column.**
+
+    Each measurement column is coerced to numeric and compared at once against
+    its tolerated min-max range from the column formats. Out-of-range values are
+    set to NaN, except leaf wetness values above the maximum, which are clipped to
+    it (leaf wetness sampled on longer intervals than configured can exceed the
+    maximum). One summary line per affected column is written to the log.
+
+    return
+    : processed dataframe, dictionary of per-row quality flags per measurement column (see get_qc_report)
+
+    """
+    datetimes = processed_data.iloc[:, 0]
+    qc_flags = {}
+    for i in range(1, len(processed_data.columns)):  # skipping datetime column 0
+        try:
+            processed_data.iloc[:, i] = pd.to_numeric(
+                processed_data.iloc[:, i], errors="coerce"
+            )  # Setting non-numeric values to NaN.
+            values = pd.to_numeric(processed_data.iloc[:, i]).to_numpy()
+            rangemin = min(standard_colformats[i])
+            rangemax = max(standard_colformats[i])
+            is_missing = np.isnan(values)
+            is_below = values < rangemin
+            is_above = values > rangemax
+            # Custom processing for max values of leaf wetness, as when sampled in longer times, its maximum
+            # value can be over the user-defined max value, thus bringing it back to max allowed values.
+            # This serves to fix a bug which can occur when mixing differently sampled time ranges, as leaf wetness
+            # is measured on the duration of the sampled interval. If the tolerated range is fixed to its maximum
+            # possible value already in the config files, then the following fix does not change the result anyways.
+            is_clipped = is_above if i == 4 else np.zeros_like(is_above)
+            # Setting out-of-range values to NaN. All other variables' out-of-range values are treated as
+            # normal outliers.
+            is_outofrange = (is_below | is_above) & ~is_clipped
+            if is_clipped.any():
+                if standard_colnames[4] != "leaf_wetness":
+                    logger.warning(
+                        "\nleaf_wetness column name has changed from default name. Make sure that leaf_wetness data is placed at the 5th column in the input dataset. Proceeding to formatting.'.\n"
+                    )
+                processed_data.iloc[is_clipped, i] = pd.to_numeric(rangemax)
+                logger.warning(
+                    f"\n{is_clipped.sum()} higher than allowed leaf_wetness values between "
+                    f"{datetimes[is_clipped].iloc[0]} and {datetimes[is_clipped].iloc[-1]}. Changed to {rangemax}."
+                )
+            if is_outofrange.any():
+                processed_data.iloc[is_outofrange, i] = np.nan
+                logger.warning(
+                    f"\n{is_outofrange.sum()} out-of-range values in '{standard_colnames[i]}' "
+                    f"(tolerated range: {rangemin} to {rangemax}) between "
+                    f"{datetimes[is_outofrange].iloc[0]} and {datetimes[is_outofrange].iloc[-1]}. Set to NaN."
+                )
+            qc_flags[standard_colnames[i]] = {
+                "tolerated_min": rangemin,
+                "tolerated_max": rangemax,
+                "missing": is_missing,
+                "below_min": is_below,
+                "above_max": is_above,
+                "set_to_nan": is_outofrange,
+                "clipped": is_clipped,
+            }
+        except ValueError:
+            logger.error(
+                f"\nData Formatting ValueError: could not parse values of '{standard_colnames[i]}'.\n"
+            )
+    return processed_data, qc_flags
+
+
+def get_qc_report(datetimes, qc_flags):
     """
+    **Return the data quality report: one row per measurement column with the
+    tolerated range, the counts of missing, below-min, above-max, set-to-NaN and
+    clipped values, and the first and last offending (set to NaN or clipped)
+    datetimes.**
+
+    """
+    qc_rows = []
+    for column, flags in qc_flags.items():
+        is_offending = flags["set_to_nan"] | flags["clipped"]
+        qc_rows.append(
+            {
+                "column": column,
+                "tolerated_min": flags["tolerated_min"],
+                "tolerated_max": flags["tolerated_max"],
+                **{count: int(flags[count].sum()) for count in qc_report_columns[3:8]},
+                "first_offending": (
+                    datetimes[is_offending].iloc[0] if is_offending.any() else None
+                ),
+                "last_offending": (
+                    datetimes[is_offending].iloc[-1] if is_offending.any() else None
+                ),
+            }
+        )
+    return pd.DataFrame(qc_rows, columns=qc_report_columns)
+
+
+def fill_gaps(processed_data, max_gap_rows):
+    """
+    **Fill NaN values by linear interpolation between previous and following
+    values, but only for gaps <= max_gap_rows rows. Larger gaps are left as NaN.**
+
+    return
+    : interpolated dataframe, boolean dataframe of the positions left as NaN
+
+    """
+    # Pre-compute which positions belong to a gap larger than the threshold.
+    large_gap_mask = pd.DataFrame(
+        False, index=processed_data.index, columns=processed_data.columns
+    )
+    for col in processed_data.columns[1:]:  # skip datetime column
+        is_nan = processed_data[col].isna()
+        if is_nan.any():
+            nan_groups = is_nan.ne(is_nan.shift()).cumsum()
+            gap_sizes = is_nan.groupby(nan_groups).transform("sum")
+            large_gap_mask[col] = is_nan & (gap_sizes > max_gap_rows)
+
+    # Interpolate (fills all NaN, including large-gap positions temporarily).
+    processed_data = processed_data.infer_objects(copy=False).interpolate(
+        method="linear"
+    )
+
+    # Restore NaN for positions that belong to gaps exceeding the 6-hour threshold.
+    for col in processed_data.columns[1:]:
+        if large_gap_mask[col].any():
+            processed_data.loc[large_gap_mask[col], col] = np.nan
+
+    return processed_data, large_gap_mask
+
+
+def parse_datetimes(datetimes, datetime_format, timezone):
+    """
+    **Parse datetime strings and localize them to the site timezone.**
+
+    """
+    return pd.to_datetime(datetimes, format=datetime_format).dt.tz_localize(
+        timezone, ambiguous="infer", nonexistent="shift_forward"
+    )
+
+
+def get_first_changed_rowindex(data, previous_data):
+    """
+    Return the index of the first row of the raw data differing from the raw data
+    of the previous processing snapshot (the number of common rows if one is a
+    prefix of the other), or 0 if the columns or their types differ.
+
+    """
+    if not (
+        data.columns.equals(previous_data.columns)
+        and data.dtypes.equals(previous_data.dtypes)
+    ):
+        return 0
+    number_of_common_rows = min(len(data), len(previous_data))
+    is_equal = np.ones(number_of_common_rows, dtype=bool)
+    for col in data.columns:
+        values = data[col].to_numpy()[:number_of_common_rows]
+        previous_values = previous_data[col].to_numpy()[:number_of_common_rows]
+        is_equal &= (values == previous_values) | (
+            pd.isna(values) & pd.isna(previous_values)
+        )
+    return int(is_equal.argmin()) if not is_equal.all() else number_of_common_rows
+
+
+def reprocess_tail(data, standard_colformats, timezone, measurement_interval, snapshot):
+    """
+    **Map, validate and interpolate only the rows of the time grid that can differ
+    from the previous processing snapshot.**
+
+    The first changed raw row is found against the snapshot's raw data, and only
+    the raw rows from the start of the day before it are parsed again. The time
+    grid is rebuilt, and validation and interpolation restart from the last grid
+    row before the change at which every measurement is valid. Since gap filling
+    never reaches across such a row, all grid rows before it are the same as in a
+    full reprocess and are taken from the snapshot.
+
+    return
+    : dictionary with the datetimes, grid restart row, checked and interpolated
+    dataframes, quality flags and large-gap mask, or None if the snapshot cannot be
+    used (then the data must be fully reprocessed)
+
+    """
+    first_changed_rowindex = get_first_changed_rowindex(data, snapshot["raw_data"])
+    previous_datetimes = snapshot["raw_datetimes"]
+    if first_changed_rowindex == 0:
+        return None
+
+    # Parsing again after the last row before the start of the previous day, so that
+    # a daylight saving time change is always parsed (and inferred) as a whole.
+    last_unchanged_datetime = previous_datetimes.iloc[first_changed_rowindex - 1]
+    parse_start_datetime = last_unchanged_datetime.normalize() - pd.Timedelta(days=1)
+    earlier_rowindexes = np.flatnonzero(
+        (
+            previous_datetimes.iloc[:first_changed_rowindex] < parse_start_datetime
+        ).to_numpy()
+    )
+    parse_start_rowindex = (
+        int(earlier_rowindexes[-1]) + 1 if len(earlier_rowindexes) else 0
+    )
+    try:
+        tail_datetimes = parse_datetimes(
+            data.iloc[parse_start_rowindex:, 0], standard_colformats[0], timezone
+        )
+    except ValueError:
+        return None
+    if not tail_datetimes.iloc[: first_changed_rowindex - parse_start_rowindex].equals(
+        previous_datetimes.iloc[parse_start_rowindex:first_changed_rowindex]
+    ):
+        return None
+    datetimes = pd.concat(
+        [previous_datetimes.iloc[:parse_start_rowindex], tail_datetimes]
+    )
+
+    timegrid_data = data.copy()
+    timegrid_data[data.columns[0]] = datetimes
+    timegrid_data, coverage = map_to_timegrid(
+        timegrid_data, measurement_interval, timezone
+    )
+
+    # First grid row that a changed (or removed) raw row maps to.
+    interval = pd.Timedelta(minutes=measurement_interval).value
+    start_time = timegrid_data.iloc[0, 0].value
+    previous_checked_data = snapshot["checked_data"]
+    changed_gridrow = min(len(timegrid_data), len(previous_checked_data))
+    for changed_datetimes in (
+        datetimes.iloc[first_changed_rowindex:],
+        previous_datetimes.iloc[first_changed_rowindex:],
+    ):
+        gridrows = (
+            pd.DatetimeIndex(changed_datetimes).as_unit("ns").asi8 - start_time
+        ) // interval
+        gridrows = gridrows[gridrows >= 0]
+        if len(gridrows):
+            changed_gridrow = min(changed_gridrow, int(gridrows.min()))
+
+    # Restarting after the last fully valid grid row before the change.
+    is_valid = (
+        previous_checked_data.iloc[:changed_gridrow, 1:].notna().all(axis=1).to_numpy()
+    )
+    if not is_valid.any():
+        return None
+    restart_gridrow = int(np.flatnonzero(is_valid)[-1]) + 1
+
+    checked_tail, tail_qc_flags = check_tolerated_ranges(
+        timegrid_data.iloc[restart_gridrow:].copy(),
+        timegrid_data.columns,
+        standard_colformats,
+    )
+    interpolated_tail, tail_large_gap_mask = fill_gaps(
+        pd.concat([previous_checked_data.iloc[[restart_gridrow - 1]], checked_tail]),
+        int(6 * 60 / measurement_interval),
+    )
+    return {
+        "raw_datetimes": datetimes,
+        "coverage": coverage,
+        "restart_gridrow": restart_gridrow,
+        "checked_data": pd.concat(
+            [previous_checked_data.iloc[:restart_gridrow], checked_tail]
+        ),
+        "interpolated_data": pd.concat(
+            [
+                snapshot["interpolated_data"].iloc[:restart_gridrow],
+                interpolated_tail.iloc[1:],
+            ]
+        ),
+        "large_gap_mask": pd.concat(
+            [
+                snapshot["large_gap_mask"].iloc[:restart_gridrow],
+                tail_large_gap_mask.iloc[1:],
+            ]
+        ),
+        "qc_flags": {
+            column: {
+                key: (
+                    np.concatenate(
+                        [snapshot["qc_flags"][column][key][:restart_gridrow], flags]
+                    )
+                    if isinstance(flags, np.ndarray)
+                    else flags
+                )
+                for key, flags in tail_qc_flags[column].items()
+            }
+            for column in tail_qc_flags
+        },
+    }
 
 
 def process_data(  # noqa: C901
@@ -63,8 +427,9 @@ def process_data(  # noqa: C901
     standard_colformats,
     timezone,
     model_parameters,
-    logfile,
     outfile,
+    qc_report_file=None,
+    snapshot=None,
 ):
     """
     **Process data columns and check that measurements fall within the torelated ranges.**
@@ -84,6 +449,16 @@ def process_data(  # noqa: C901
     argument5
     : path to process data output file
 
+    argument6
+    : optional path to the data quality report output file
+
+    argument7
+    : optional processing snapshot of a previous run on an earlier version of the
+    same input file, to only reprocess its changed tail (see reprocess_tail)
+
+    return
+    : processed dataframe, processing snapshot of this run
+
 
     The function takes the following parameters: the loaded timeseries data, and
     three elements taken from the specific processing configuration file
@@ -99,134 +474,117 @@ def process_data(  # noqa: C901
     colnames = data.iloc[:, selected_columns].columns
     colnames_str = "\n\t".join(colnames)
     processed_data = data
-    logf = open(logfile, "a")
-    logf.write(
+    logger.info(
         f"\nUsing selected columns as specified in config file: \n\t{colnames_str}\n"
     )
-    logf.write(f"\nRenaming columns to: {standard_colnames}\n")
-    logf.write(f"\nFormatting columns to: {standard_colformats}\n")
+    logger.info(f"\nRenaming columns to: {standard_colnames}\n")
+    logger.info(f"\nFormatting columns to: {standard_colformats}\n")
     for key, value in standard_colnames.items():
         processed_data = processed_data.rename(
             columns={processed_data.columns[key]: value}
         )
-    try:
-        # datetime column must always be placed as first column in dataset, as here it is hardcoded to the first index 0.
-        processed_data[standard_colnames[0]] = pd.to_datetime(
-            processed_data[standard_colnames[0]], format=standard_colformats[0]
-        ).dt.tz_localize(timezone, ambiguous="infer", nonexistent="shift_forward")
-    except ValueError:
-        logf.write(
-            "\nFORMAT DATA ERROR: could not parse datetime column as datetime format.\n"
+    raw_data = processed_data.copy()
+    measurement_interval = model_parameters["run_settings"]["measurement_time_interval"]
+    max_gap_rows = int(6 * 60 / measurement_interval)  # 6 h expressed in number of rows
+
+    # Incremental processing: only the tail of the time grid that can differ from the
+    # previous snapshot is validated and interpolated again.
+    tail = None
+    if snapshot is not None:
+        tail = reprocess_tail(
+            raw_data,
+            standard_colformats,
+            timezone,
+            measurement_interval,
+            snapshot,
         )
+        if tail is None:
+            logger.info(
+                "\nIncremental processing: input data cannot be matched with the previous snapshot. Reprocessing all rows.\n"
+            )
+
+    if tail is not None:
+        raw_datetimes = tail["raw_datetimes"]
+        coverage = tail["coverage"]
+        processed_data = tail["checked_data"]
+        qc_flags = tail["qc_flags"]
+        logger.info(
+            f"\nIncremental processing: {tail['restart_gridrow']}/{len(processed_data)} "
+            "rows taken from the previous snapshot.\n"
+        )
+    else:
+        try:
+            # datetime column must always be placed as first column in dataset, as here it is hardcoded to the first index 0.
+            processed_data[standard_colnames[0]] = parse_datetimes(
+                processed_data[standard_colnames[0]], standard_colformats[0], timezone
+            )
+        except ValueError:
+            logger.error(
+                "\nFORMAT DATA ERROR: could not parse datetime column as datetime format.\n"
+            )
+        raw_datetimes = processed_data[standard_colnames[0]]
 
     # Creating time grid to which meteorological measurement data will be mapped onto.
     # This way, we can deal with missing values and not have subsequent rows with different
-    # time intervals. Rows with missing values will copy the values from the previous line.
+    # time intervals. Rows with missing values are filled by interpolation further below.
     try:
-        start_timegrid = processed_data.iloc[0, 0]
-        end_timegrid = processed_data.iloc[-1, 0]
+        start_timegrid = raw_datetimes.iloc[0]
+        end_timegrid = raw_datetimes.iloc[-1]
         timegrid_range = end_timegrid - start_timegrid
     except TypeError:
-        logf.write(
+        logger.error(
             "\nTIME GRID CREATION ERROR: check first and last datetimes in the input data file.\n"
         )
-    freq_timegrid = (
-        str(model_parameters["run_settings"]["measurement_time_interval"]) + "min"
-    )
-    timegrid = pd.date_range(
-        start=start_timegrid, end=end_timegrid, freq=freq_timegrid, tz=timezone
-    )
-    timegrid = pd.DataFrame({standard_colnames[0]: timegrid})
-    logf.write(
+    logger.info(
         f"\nMeterological timeseries range of provided input data: {timegrid_range}.\
         \nStart: {start_timegrid}. End: {end_timegrid}.\n"
     )
 
-    processed_data = pd.merge(
-        timegrid, processed_data, on=standard_colnames[0], how="left"
+    if tail is None:
+        processed_data, coverage = map_to_timegrid(
+            processed_data, measurement_interval, timezone
+        )
+    logger.info(
+        f"\nTime grid coverage: {coverage['filled_rows']}/{coverage['grid_rows']} rows "
+        f"({coverage['coverage_percent']}%) with measurements, {coverage['empty_rows']} empty. "
+        f"{coverage['duplicate_rows']} rows sharing a grid time dropped, "
+        f"{coverage['off_grid_rows_moved']} off-grid rows moved to the preceding grid time, "
+        f"{coverage['out_of_grid_rows']} rows outside the grid dropped.\n"
     )
 
-    logf.write("\nSetting non-numeric values to NaN (datetime not considered).\n")
-    outofrange_counter = 0
-    for i in range(1, len(processed_data.columns)):  # skipping datetime column 0
+    logger.info("\nSetting non-numeric values to NaN (datetime not considered).\n")
+    if tail is None:
+        processed_data, qc_flags = check_tolerated_ranges(
+            processed_data, standard_colnames, standard_colformats
+        )
+    checked_data = processed_data
+    qc_report = get_qc_report(processed_data.iloc[:, 0], qc_flags)
+    outofrange_counter = int(qc_report["set_to_nan"].sum())
+    if qc_report_file is not None:
         try:
-            processed_data.iloc[:, i] = pd.to_numeric(
-                processed_data.iloc[:, i], errors="coerce"
-            )  # Setting non-numeric values to NaN.
-            for row in range(0, len(processed_data)):
-                if processed_data.iloc[row, i] < min(
-                    standard_colformats[i]
-                ) or processed_data.iloc[row, i] > max(standard_colformats[i]):
-                    # Custom processing for max values of leaf wetness, as when sampled in longer times, its maximum
-                    # value can be over the user-defined max value, thus bringing it back to max allowed values.
-                    # This serves to fix a bug which can occur when mixing differently sampled time ranges, as leaf wetness
-                    # is measured on the duration of the sampled interval. If the tolerated range is fixed to its maximum
-                    # possible value already in the config files, then the following fix does not change the result anyways.
-                    if i == 4 and processed_data.iloc[row, i] > max(
-                        standard_colformats[i]
-                    ):
-                        if standard_colnames[4] != "leaf_wetness":
-                            logf.write(
-                                "\nWARNING: leaf_wetness column name has changed from default name. Make sure that leaf_wetness data is placed at the 5th column in the input dataset. Proceeding to formatting.'.\n"
-                            )
-                        rangemax = max(standard_colformats[i])
-                        logf.write(
-                            f"\nWARNING: detected higher than allowed leaf_wetness value at {processed_data.iloc[row,0]}. Changed to {rangemax}."
-                        )
-                        processed_data.iloc[row, i] = pd.to_numeric(
-                            max(standard_colformats[i])
-                        )
-                    # Setting out-of-range values to NaN. All other variables' out-of-range values are treated as
-                    # normal outliers.
-                    else:
-                        logf.write(
-                            f"\nWARNING: detected out-of-range values in '{standard_colnames[i]}'."
-                        )
-                        printrow = str(processed_data.iloc[row])
-                        logf.write(f"\n{printrow}\n")
-                        processed_data.iloc[row, i] = np.nan
-                        outofrange_counter += 1
-        except ValueError:
-            logf.write(
-                f"\nData Formatting ValueError: could not parse values of '{standard_colnames[i]}'.\n"
+            qc_report.to_csv(qc_report_file, index=False)
+            logger.info(f"\nData quality report stored in: {qc_report_file}\n")
+        except IOError:
+            logger.error(
+                f"\nDATA FORMATTING ERROR: cannot save data quality report to {qc_report_file}\n"
             )
     # Filling NaN values (from missing data or from out-range-values) by interpolation between
     # previous and following values, but only for gaps <= 6 hours.  Larger gaps are left as NaN.
     nan_count = processed_data.isnull().sum().sum()
-
-    measurement_interval = model_parameters["run_settings"]["measurement_time_interval"]
-    max_gap_rows = int(6 * 60 / measurement_interval)  # 6 h expressed in number of rows
-
-    # Pre-compute which positions belong to a gap larger than the threshold.
-    large_gap_mask = pd.DataFrame(
-        False, index=processed_data.index, columns=processed_data.columns
-    )
-    for col in processed_data.columns[1:]:  # skip datetime column
-        is_nan = processed_data[col].isna()
-        if is_nan.any():
-            nan_groups = is_nan.ne(is_nan.shift()).cumsum()
-            gap_sizes = is_nan.groupby(nan_groups).transform("sum")
-            large_gap_mask[col] = is_nan & (gap_sizes > max_gap_rows)
-
+    if tail is None:
+        processed_data, large_gap_mask = fill_gaps(processed_data, max_gap_rows)
+    else:
+        processed_data = tail["interpolated_data"]
+        large_gap_mask = tail["large_gap_mask"]
+    interpolated_data = processed_data
     large_gap_count = int(large_gap_mask.values.sum())
 
-    # Interpolate (fills all NaN, including large-gap positions temporarily).
-    processed_data = processed_data.infer_objects(copy=False).interpolate(
-        method="linear"
-    )
-
-    # Restore NaN for positions that belong to gaps exceeding the 6-hour threshold.
-    for col in processed_data.columns[1:]:
-        if large_gap_mask[col].any():
-            processed_data.loc[large_gap_mask[col], col] = np.nan
-
     actual_missing_values_count = nan_count - outofrange_counter - large_gap_count
-    logf.write(
+    logger.info(
         f"\n\n{outofrange_counter} out-of-range and {actual_missing_values_count} missing values "
         f"replaced by interpolated values. "
         f"{large_gap_count} missing values in gaps > 6 h left as NaN.\n"
     )
-    logf.close()
 
     _lw_norm_divisor = (
         max(standard_colformats[4])
@@ -234,17 +592,44 @@ def process_data(  # noqa: C901
         and isinstance(standard_colformats[4], (list, tuple))
         else measurement_interval
     )
-    processed_data = normalize_leaf_wetness(processed_data, _lw_norm_divisor, logfile)
+    processed_data = normalize_leaf_wetness(processed_data, _lw_norm_divisor)
+    is_leaf_wetness_normalized = processed_data is not interpolated_data
+
+    # The CSV lines of the rows taken from the snapshot are reused, unless the leaf
+    # wetness normalization or the column types changed them.
+    if (
+        tail is not None
+        and is_leaf_wetness_normalized == snapshot["is_leaf_wetness_normalized"]
+        and interpolated_data.dtypes.equals(snapshot["interpolated_data"].dtypes)
+    ):
+        previous_csv = snapshot["processed_csv"]
+        line_ends = np.flatnonzero(np.frombuffer(previous_csv, dtype=np.uint8) == 10)
+        processed_csv = previous_csv[: line_ends[tail["restart_gridrow"]] + 1] + (
+            processed_data.iloc[tail["restart_gridrow"] :]
+            .to_csv(index=False, header=False)
+            .encode()
+        )
+    else:
+        processed_csv = processed_data.to_csv(index=False).encode()
 
-    logf = open(logfile, "a")
     try:
-        processed_data.to_csv(outfile, index=False)
-        logf.write(f"\nFormatted data stored in: {outfile}\n")
-        logf.close()
+        with open(outfile, "wb") as f:
+            f.write(processed_csv)
+        logger.info(f"\nFormatted data stored in: {outfile}\n")
     except IOError:
-        logf.write(
+        logger.error(
             f"\nDATA FORMATTING ERROR: cannot save formatted dataset to {outfile}\n"
         )
-        logf.close()
 
-    return processed_data
+    snapshot = {
+        "raw_data": raw_data,
+        "raw_datetimes": raw_datetimes,
+        "checked_data": checked_data,
+        "qc_flags": qc_flags,
+        "large_gap_mask": large_gap_mask,
+        "interpolated_data": interpolated_data,
+        "is_leaf_wetness_normalized": is_leaf_wetness_normalized,
+        "processed_csv": processed_csv,
+    }
+
+    return processed_data, snapshot
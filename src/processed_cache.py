@@ -0,0 +1,251 @@
+"""
+Processed weather data cache functions.
+
+"""
+
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import run_logging
+
+logger = run_logging.get_logger(__name__)
+
+# Version of the processing steps, part of every cache key: increase it whenever
+# load_data or process_data change the processed data they produce.
+processing_version = 1
+
+# Number of most recently used cache entries kept in the cache directory.
+max_cache_entries = 8
+
+# Dataframes of a processing snapshot, each stored as a Parquet file.
+snapshot_frames = ("raw_data", "checked_data", "interpolated_data", "large_gap_mask")
+
+
+def get_cache_key(
+    raw_data_path, data_columns, timezone, measurement_time_interval, chunk_size=2**20
+):
+    """
+    **Return the cache key of a processed weather dataset.**
+
+    The key is a SHA-256 hash of the raw input file content, the data_columns
+    configuration block, the site timezone, the measurement time interval and the
+    processing version, i.e. of everything the processed data depends on.
+
+    """
+    key_hash = hashlib.sha256()
+    with open(raw_data_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            key_hash.update(chunk)
+    key_hash.update(
+        get_settings_json(data_columns, timezone, measurement_time_interval).encode()
+    )
+    return key_hash.hexdigest()
+
+
+def get_snapshot_key(raw_data_path, data_columns, timezone, measurement_time_interval):
+    """
+    **Return the key of the processing snapshot of an input file.**
+
+    Unlike the cache key, the snapshot key hashes the input file path instead of
+    its content, so that successive versions of a growing input file share one
+    snapshot.
+
+    """
+    key_hash = hashlib.sha256(str(Path(raw_data_path).resolve()).encode())
+    key_hash.update(
+        get_settings_json(data_columns, timezone, measurement_time_interval).encode()
+    )
+    return key_hash.hexdigest()
+
+
+def get_settings_json(data_columns, timezone, measurement_time_interval):
+    """
+    Return the processing settings (and processing version) as a JSON string.
+
+    """
+    return json.dumps(
+        {
+            "data_columns": data_columns,
+            "timezone": str(timezone),
+            "measurement_time_interval": measurement_time_interval,
+            "processing_version": processing_version,
+        },
+        sort_keys=True,
+        default=str,
+    )
+
+
+def get_cache_files(cache_dir, cache_key):
+    """
+    Return the paths of the processed dataframe (Parquet), processed CSV file and
+    data quality report of a cache entry.
+
+    """
+    cache_dir = Path(cache_dir)
+    return (
+        cache_dir / f"{cache_key}.processed.parquet",
+        cache_dir / f"{cache_key}.processed.csv",
+        cache_dir / f"{cache_key}.qc_report.csv",
+    )
+
+
+def load_processed_data(cache_dir, cache_key, outfile, qc_report_file):
+    """
+    **Load processed weather data from the cache.**
+
+    On a hit, the cached processed CSV file and data quality report are copied to
+    the run's output files, and the processed dataframe is returned. Returns None
+    on a miss or if the cache entry cannot be read.
+
+    """
+    data_file, csv_file, qc_file = get_cache_files(cache_dir, cache_key)
+    if not (data_file.exists() and csv_file.exists()):
+        return None
+    try:
+        processed_data = pd.read_parquet(data_file)
+        shutil.copyfile(csv_file, outfile)
+        if qc_file.exists() and qc_report_file is not None:
+            shutil.copyfile(qc_file, qc_report_file)
+    except Exception as e:
+        logger.warning(
+            f"\nProcessed Data Cache Warning: could not read cache entry {data_file} ({e}). Reprocessing.\n"
+        )
+        return None
+    # Marking the entry as recently used, so that pruning keeps it.
+    data_file.touch()
+    logger.info(
+        f"\nLoaded processed timeseries data from cache: {data_file}\n"
+        f"\nFormatted data stored in: {outfile}\n"
+    )
+    return processed_data
+
+
+def save_processed_data(cache_dir, cache_key, processed_data, outfile, qc_report_file):
+    """
+    **Store processed weather data in the cache.**
+
+    The processed dataframe is written to Parquet, which keeps the timezone-aware
+    datetime column and all dtypes exactly, and the processed CSV file and data
+    quality report written by process_data are copied next to it. The least
+    recently used entries beyond max_cache_entries are removed.
+
+    """
+    data_file, csv_file, qc_file = get_cache_files(cache_dir, cache_key)
+    try:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(outfile, csv_file)
+        if qc_report_file is not None and Path(qc_report_file).exists():
+            shutil.copyfile(qc_report_file, qc_file)
+        # Parquet file written last, so that an entry is only complete once it exists.
+        processed_data.to_parquet(data_file)
+    except Exception as e:
+        logger.warning(
+            f"\nProcessed Data Cache Warning: could not write cache entry {data_file} ({e}).\n"
+        )
+        return
+    logger.info(f"\nProcessed timeseries data cached in: {data_file}\n")
+
+    cached_files = sorted(
+        Path(cache_dir).glob("*.processed.parquet"),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+    for old_data_file in cached_files[max_cache_entries:]:
+        old_key = old_data_file.name[: -len(".processed.parquet")]
+        for old_file in get_cache_files(cache_dir, old_key):
+            old_file.unlink(missing_ok=True)
+
+
+def get_snapshot_dir(cache_dir, snapshot_key):
+    """
+    Return the path of the directory holding the processing snapshot of an input
+    file: its dataframes as Parquet files, its quality flags as a .npz file, its
+    processed CSV file and its remaining values as JSON.
+
+    """
+    return Path(cache_dir) / f"{snapshot_key}.snapshot"
+
+
+def load_snapshot(cache_dir, snapshot_key):
+    """
+    **Load the processing snapshot of a previous run on the same input file.**
+
+    Returns None if there is no snapshot or it cannot be read.
+
+    """
+    snapshot_dir = get_snapshot_dir(cache_dir, snapshot_key)
+    if not snapshot_dir.exists():
+        return None
+    try:
+        snapshot = {
+            name: pd.read_parquet(snapshot_dir / f"{name}.parquet")
+            for name in snapshot_frames
+        }
+        snapshot["raw_datetimes"] = pd.read_parquet(
+            snapshot_dir / "raw_datetimes.parquet"
+        ).iloc[:, 0]
+        qc_flags = {}
+        with np.load(snapshot_dir / "qc_flags.npz", allow_pickle=False) as flags_file:
+            for name in flags_file.files:
+                column, key = name.split("/", 1)
+                flags = flags_file[name]
+                qc_flags.setdefault(column, {})[key] = (
+                    flags.item() if flags.ndim == 0 else flags
+                )
+        snapshot["qc_flags"] = qc_flags
+        snapshot["processed_csv"] = (snapshot_dir / "processed.csv").read_bytes()
+        snapshot.update(json.loads((snapshot_dir / "snapshot.json").read_text()))
+    except Exception as e:
+        logger.warning(
+            f"\nProcessed Data Cache Warning: could not read processing snapshot {snapshot_dir} ({e}).\n"
+        )
+        return None
+    return snapshot
+
+
+def save_snapshot(cache_dir, snapshot_key, snapshot):
+    """
+    **Store the processing snapshot of this run, replacing the previous one.**
+
+    The snapshot is written to a temporary directory first, which then replaces
+    the previous snapshot, so that an interrupted run never leaves a partial one.
+
+    """
+    snapshot_dir = get_snapshot_dir(cache_dir, snapshot_key)
+    temporary_dir = snapshot_dir.with_name(f"{snapshot_dir.name}.tmp")
+    try:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+        temporary_dir.mkdir(parents=True)
+        for name in snapshot_frames:
+            snapshot[name].to_parquet(temporary_dir / f"{name}.parquet")
+        snapshot["raw_datetimes"].to_frame().to_parquet(
+            temporary_dir / "raw_datetimes.parquet"
+        )
+        np.savez(
+            temporary_dir / "qc_flags.npz",
+            **{
+                f"{column}/{key}": np.asarray(flags)
+                for column, column_flags in snapshot["qc_flags"].items()
+                for key, flags in column_flags.items()
+            },
+        )
+        (temporary_dir / "processed.csv").write_bytes(snapshot["processed_csv"])
+        (temporary_dir / "snapshot.json").write_text(
+            json.dumps(
+                {
+                    "is_leaf_wetness_normalized": bool(
+                        snapshot["is_leaf_wetness_normalized"]
+                    )
+                }
+            )
+        )
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+        temporary_dir.rename(snapshot_dir)
+    except Exception as e:
+        logger.warning(
+            f"\nProcessed Data Cache Warning: could not write processing snapshot {snapshot_dir} ({e}).\n"
+        )
@@ -0,0 +1,316 @@
+"""
+ResultStore class definition script for the typed, columnar results of a model run.
+
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Datetime columns of the chains table, in infection stage order.
+chain_datetime_columns = (
+    "start",
+    "oospore_maturation",
+    "oospore_germination",
+    "oospore_dispersion",
+    "oospore_infection",
+    "completed_incubation",
+)
+
+# Columns of the flat events table (one row per sporulation and secondary
+# infection of each infection chain), as written to events_table.csv.
+events_table_columns = (
+    "id",
+    "start",
+    "oospore_maturation",
+    "oospore_germination",
+    "oospore_dispersion",
+    "oospore_infection",
+    "incubation_days",
+    "completed_incubation",
+    "sporulations",
+    "sporangia_densities",
+    "spore_lifespan_days",
+    "secondary_infections",
+    "oospore_infection_strength",
+    "secondary_infection_strengths",
+)
+
+# Datetime columns of the flat events table.
+events_datetime_columns = chain_datetime_columns + (
+    "sporulations",
+    "secondary_infections",
+)
+
+
+class ResultStore:
+    """
+    Class ResultStore holding the infection events of a model run as three
+    normalized tables, written once to Parquet in the <run_name>.results directory:
+
+    - chains: one row per infection chain (chain_index, start row index id), with
+      its stage datetimes, incubation days and oospore infection strength;
+    - sporulations: one row per (chain_index, sporulation_index), with the
+      sporangia density and spore lifespan of the sporulation;
+    - secondary_infections: one row per (chain_index, sporulation_index,
+      secondary_index), with the daily infection strength of the infection.
+
+    Datetimes are timezone-aware datetime64 columns (stored as int64 timestamps)
+    and each of them has a nullable int64 <column>_rowindex column holding its
+    row index in the weather timeseries, so that the plots and any downstream
+    tooling read typed values instead of reparsing strings.
+
+    """
+
+    table_names = ("chains", "sporulations", "secondary_infections")
+
+    def __init__(self, chains, sporulations, secondary_infections):
+        """
+        Object initialisation function.
+
+        """
+        self.chains = chains
+        self.sporulations = sporulations
+        self.secondary_infections = secondary_infections
+
+    def __len__(self):
+        """
+        Number of infection chains stored.
+
+        """
+        return len(self.chains)
+
+    @classmethod
+    def from_infection_predictions(cls, infection_predictions, weather):
+        """
+        Builds the result tables of the given InfectionEvent objects, in order,
+        matching their datetimes against the rows of the weather timeseries.
+
+        """
+        chains = {
+            column: [] for column in ("chain_index", "id") + chain_datetime_columns
+        }
+        chains.update(incubation_days=[], oospore_infection_strength=[])
+        sporulations = {
+            column: []
+            for column in (
+                "chain_index",
+                "sporulation_index",
+                "sporulation",
+                "sporangia_density",
+                "spore_lifespan_days",
+            )
+        }
+        secondary_infections = {
+            column: []
+            for column in (
+                "chain_index",
+                "sporulation_index",
+                "secondary_index",
+                "secondary_infection",
+                "secondary_infection_strength",
+            )
+        }
+        for chain_index, infection_prediction in enumerate(infection_predictions):
+            infection_events = infection_prediction.infection_events
+            chains["chain_index"].append(chain_index)
+            chains["id"].append(infection_prediction.id)
+            chains["start"].append(infection_prediction.start_event_datetime)
+            for column in chain_datetime_columns[1:]:
+                chains[column].append(infection_events[column])
+            chains["incubation_days"].append(infection_events["incubation_days"])
+            chains["oospore_infection_strength"].append(
+                infection_events.get("oospore_infection_strength")
+            )
+
+            sporangia_densities = infection_events.get("sporangia_densities") or []
+            spore_lifespan_days = infection_events.get("spore_lifespan_days") or []
+            for sporulation_index, sporulation_datetime in enumerate(
+                infection_events.get("sporulations") or []
+            ):
+                sporulations["chain_index"].append(chain_index)
+                sporulations["sporulation_index"].append(sporulation_index)
+                sporulations["sporulation"].append(sporulation_datetime)
+                sporulations["sporangia_density"].append(
+                    _get(sporangia_densities, sporulation_index)
+                )
+                sporulations["spore_lifespan_days"].append(
+                    _get(spore_lifespan_days, sporulation_index)
+                )
+
+            secondary_infection_strengths = (
+                infection_events.get("secondary_infection_strengths") or []
+            )
+            for sporulation_index, secondary_infection_datetimes in enumerate(
+                infection_events.get("secondary_infections") or []
+            ):
+                strengths = _get(secondary_infection_strengths, sporulation_index) or []
+                for secondary_index, secondary_infection_datetime in enumerate(
+                    secondary_infection_datetimes
+                ):
+                    secondary_infections["chain_index"].append(chain_index)
+                    secondary_infections["sporulation_index"].append(sporulation_index)
+                    secondary_infections["secondary_index"].append(secondary_index)
+                    secondary_infections["secondary_infection"].append(
+                        secondary_infection_datetime
+                    )
+                    secondary_infections["secondary_infection_strength"].append(
+                        _get(strengths, secondary_index)
+                    )
+
+        return cls(
+            get_table(chains, chain_datetime_columns, weather),
+            get_table(sporulations, ("sporulation",), weather),
+            get_table(secondary_infections, ("secondary_infection",), weather),
+        )
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Reads the result tables written by save.
+
+        """
+        directory = Path(directory)
+        return cls(
+            *[
+                pd.read_parquet(directory / f"{table_name}.parquet")
+                for table_name in cls.table_names
+            ]
+        )
+
+    def save(self, directory):
+        """
+        Writes the result tables to Parquet files in the given directory.
+
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for table_name in self.table_names:
+            getattr(self, table_name).to_parquet(
+                directory / f"{table_name}.parquet", index=False
+            )
+
+    def get_events_table(self):
+        """
+        Returns the flat events table of the infection chains: one row per
+        (sporulation, secondary infection) pair, at least one per sporulation and
+        one per infection chain, with typed datetime and numeric columns.
+
+        """
+        chains_without_sporulations = self.chains.loc[
+            ~self.chains["chain_index"].isin(self.sporulations["chain_index"]),
+            ["chain_index"],
+        ].assign(sporulation_index=0)
+        rows = pd.concat(
+            [
+                self.sporulations[["chain_index", "sporulation_index"]],
+                chains_without_sporulations,
+            ],
+            ignore_index=True,
+        ).astype(np.int64)
+        events_table = (
+            rows.merge(self.chains, on="chain_index", how="left")
+            .merge(
+                self.sporulations, on=["chain_index", "sporulation_index"], how="left"
+            )
+            .merge(
+                self.secondary_infections,
+                on=["chain_index", "sporulation_index"],
+                how="left",
+            )
+            .sort_values(
+                ["chain_index", "sporulation_index", "secondary_index"],
+                kind="stable",
+            )
+            .rename(
+                columns={
+                    "sporulation": "sporulations",
+                    "sporangia_density": "sporangia_densities",
+                    "secondary_infection": "secondary_infections",
+                    "secondary_infection_strength": "secondary_infection_strengths",
+                }
+            )
+        )
+        return events_table[list(events_table_columns)].reset_index(drop=True)
+
+
+def _get(values, index):
+    """
+    Returns values[index], or None if the list is shorter.
+
+    """
+    return values[index] if index < len(values) else None
+
+
+def get_table(columns, datetime_columns, weather):
+    """
+    Builds a result table from a dictionary of column lists: the given datetime
+    columns are converted to the timezone of the weather timeseries and completed
+    by their <column>_rowindex columns, the other columns to int64 (row indexes)
+    or float64 (None as NaN).
+
+    """
+    table = {}
+    for column, values in columns.items():
+        if column in datetime_columns:
+            datetimes = get_datetimes(values, weather.timezone)
+            table[column] = datetimes
+            table[column + "_rowindex"] = get_rowindexes(datetimes, weather)
+        elif column == "id" or column.endswith("_index"):
+            table[column] = np.array(values, dtype=np.int64)
+        else:
+            table[column] = np.array(
+                [np.nan if value is None else value for value in values],
+                dtype=np.float64,
+            )
+    return pd.DataFrame(table)
+
+
+def get_datetimes(values, timezone):
+    """
+    Converts a list of datetimes (None if missing) to a datetime64 array in the
+    given timezone, naive datetimes being localized to it.
+
+    """
+    timestamps = []
+    for value in values:
+        if value is None:
+            timestamps.append(pd.NaT)
+            continue
+        timestamp = pd.Timestamp(value)
+        if timezone is not None:
+            timestamp = (
+                timestamp.tz_localize(timezone)
+                if timestamp.tzinfo is None
+                else timestamp.tz_convert(timezone)
+            )
+        timestamps.append(timestamp)
+    return pd.DatetimeIndex(timestamps, tz=timezone).as_unit("ns")
+
+
+def get_rowindexes(datetimes, weather):
+    """
+    Returns the weather timeseries row index of each datetime, as a nullable int64
+    array (missing for missing datetimes and datetimes between two rows).
+
+    """
+    seconds = datetimes.as_unit("s").asi8
+    rowindexes = np.searchsorted(weather.time, seconds).clip(
+        0, max(len(weather) - 1, 0)
+    )
+    is_row = ~datetimes.isna()
+    if len(weather) > 0:
+        is_row &= weather.time[rowindexes] == seconds
+    else:
+        is_row[:] = False
+    return pd.arrays.IntegerArray(rowindexes.astype(np.int64), ~is_row)
+
+
+def load_events_table(directory):
+    """
+    Returns the flat events table of the result store written to the given
+    directory, see ResultStore.get_events_table.
+
+    """
+    return ResultStore.load(directory).get_events_table()
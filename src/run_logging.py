@@ -0,0 +1,187 @@
+"""
+Run-scoped logging setup script: one buffered human-readable log and one JSON-lines log per model run.
+
+"""
+
+import json
+import logging
+import logging.handlers
+from datetime import datetime
+
+# Name of the logger all Plasmopy modules log to (as plasmopy.<module>).
+logger_name = "plasmopy"
+
+
+def get_logger(module_name):
+    """
+    Returns the logger of the given module, a child of the run-scoped logger.
+
+    """
+    return logging.getLogger(f"{logger_name}.{module_name.rsplit('.', 1)[-1]}")
+
+
+def log_and_print(logger, msg, level=logging.INFO):
+    """
+    Prints a status message to the console and logs it to the given logger,
+    followed by a line break.
+
+    """
+    print(msg)
+    logger.log(level, msg + "\n")
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Class JsonLinesFormatter formatting log records as one JSON object per line
+    (time, level, logger, message), for monitoring tools.
+
+    """
+
+    def format(self, record):
+        """
+        Formats the record as a JSON object, without surrounding blank lines.
+
+        """
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage().strip("\n"),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class HotLoopFilter(logging.Filter):
+    """
+    Class HotLoopFilter dropping the records below WARNING of the quiet loggers
+    while the infection model loop runs (see set_hot_loop), and counting them so that
+    a single summary line replaces the per-event messages.
+
+    """
+
+    def __init__(self, quiet_loggers):
+        """
+        Object initialisation function.
+
+        """
+        super().__init__()
+        self.quiet_loggers = {
+            f"{logger_name}.{quiet_logger}" for quiet_logger in quiet_loggers
+        }
+        self.active = False
+        self.suppressed = {}
+        self.last_suppressed_record = None
+
+    def filter(self, record):
+        """
+        Returns False for records to drop.
+
+        """
+        if (
+            self.active
+            and record.levelno < logging.WARNING
+            and record.name in self.quiet_loggers
+        ):
+            # The filter is shared by both handlers: each record is counted once.
+            if record is not self.last_suppressed_record:
+                self.last_suppressed_record = record
+                self.suppressed[record.name] = self.suppressed.get(record.name, 0) + 1
+            return False
+        return True
+
+
+def setup_run_logging(
+    logfile, json_logfile=None, level="INFO", buffer_records=200, quiet_loggers=()
+):
+    """
+    Configures the run-scoped logger: a buffered handler writing the human-readable
+    logfile and, if json_logfile is given, a buffered handler writing the JSON-lines
+    log. Records are written every buffer_records records, at once for ERROR and
+    higher records, and when flush_run_logging or close_run_logging is called.
+    Both files are cleared, and handlers of a previous run are closed. Messages
+    are written to the logfile as they are, with their own line breaks.
+
+    return
+    : run-scoped logger
+
+    """
+    close_run_logging()
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(level)
+    logger.propagate = False
+    hot_loop_filter = HotLoopFilter(quiet_loggers)
+    # Messages carry their own line breaks in the human-readable logfile.
+    targets = [(logfile, logging.Formatter("%(message)s"), "")]
+    if json_logfile is not None:
+        targets.append((json_logfile, JsonLinesFormatter(), "\n"))
+    for filename, formatter, terminator in targets:
+        # The files are cleared once, then opened in append mode so that forked
+        # worker processes append to them instead of writing at their own offset.
+        open(filename, "w").close()
+        file_handler = logging.FileHandler(filename, mode="a", encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        file_handler.terminator = terminator
+        handler = logging.handlers.MemoryHandler(
+            max(1, buffer_records), flushLevel=logging.ERROR, target=file_handler
+        )
+        handler.addFilter(hot_loop_filter)
+        logger.addHandler(handler)
+    logger.hot_loop_filter = hot_loop_filter
+    return logger
+
+
+def flush_run_logging():
+    """
+    Writes the buffered records of the run-scoped logger.
+
+    """
+    for handler in logging.getLogger(logger_name).handlers:
+        handler.flush()
+
+
+def unbuffer_run_logging():
+    """
+    Writes every further record of the run-scoped logger at once, e.g. in worker
+    processes, whose buffered records would otherwise be lost when they exit.
+
+    """
+    for handler in logging.getLogger(logger_name).handlers:
+        handler.capacity = 1
+
+
+def close_run_logging():
+    """
+    Writes the buffered records and closes the handlers of the run-scoped logger.
+
+    """
+    logger = logging.getLogger(logger_name)
+    for handler in list(logger.handlers):
+        target = getattr(handler, "target", None)
+        handler.close()
+        if target is not None:
+            target.close()
+        logger.removeHandler(handler)
+
+
+def set_hot_loop(active):
+    """
+    Switches the quiet policy of the run-scoped logger on or off: while it is on
+    (during the infection model loop), records below WARNING of the quiet loggers
+    are dropped, and switching it off logs the number of dropped records per
+    logger.
+
+    """
+    logger = logging.getLogger(logger_name)
+    hot_loop_filter = getattr(logger, "hot_loop_filter", None)
+    if hot_loop_filter is None:
+        return
+    hot_loop_filter.active = active
+    if active:
+        hot_loop_filter.suppressed = {}
+        return
+    for quiet_logger, suppressed in sorted(hot_loop_filter.suppressed.items()):
+        logger.info(
+            f"\n{suppressed} messages of {quiet_logger} not logged during the infection model loop.\n"
+        )
@@ -0,0 +1,387 @@
+"""
+RunState class definition script for incremental re-runs of the infection model.
+
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import run_logging
+from omegaconf import OmegaConf
+
+logger = run_logging.get_logger(__name__)
+
+# Version of the infection model, stored in every run state: increase it whenever
+# a stage function or run_infection_model change the events or chain states they
+# produce, so that no chain computed by the previous code is reused.
+model_version = 1
+
+# Kinds of the scalar values of the chain table (see get_chain_table), by type.
+# Python and NumPy numbers are told apart, so that reused infection events are
+# written to the events log exactly as when they were computed.
+value_kinds = {
+    type(None): "none",
+    bool: "bool",
+    int: "int",
+    np.int64: "int64",
+    float: "float",
+    np.float64: "float64",
+    pd.Timestamp: "datetime",
+}
+
+# Columns of the chain table.
+chain_table_columns = (
+    "start_rowindex",
+    "name",
+    "index",
+    "subindex",
+    "kind",
+    "integer",
+    "number",
+    "timezone",
+)
+
+
+class RunState:
+    """
+    Class RunState holding what a model run needs to know about the previous run
+    on the same run name, so that it only recomputes the infection chains affected
+    by changed weather rows (e.g. a forecast update of the end of the timeseries):
+    the model version, the model parameters, the weather timeseries, the oospore
+    maturation row index and, for every start row of the infection model loop, the infection events and
+    chain state of the infection chain (row indexes found by each stage, oospore
+    infection row index and whether it was registered, furthest row index read).
+
+    A chain of the previous run is reused verbatim if it read no row at or after
+    the first changed weather row, and if its oospore infection is still the first
+    one registered (or still a duplicate), so that the de-duplication of oospore
+    infections over the start rows gives the same events as a full run.
+
+    """
+
+    def __init__(self, model_parameters, weather, oospore_maturation_datetime_rowindex):
+        """
+        Object initialisation function.
+
+        """
+        self.model_version = model_version
+        self.model_parameters = get_model_parameters(model_parameters)
+        self.time = weather.time
+        self.measurements = {
+            column: weather[column] for column in weather.measurement_columns
+        }
+        self.oospore_maturation_datetime_rowindex = oospore_maturation_datetime_rowindex
+        self.chains = {}
+
+    def __len__(self):
+        """
+        Number of infection chains stored.
+
+        """
+        return len(self.chains)
+
+    def add_chain(self, start_event_rowindex, infection_events, chain_state):
+        """
+        Stores the infection events and chain state of the given start row.
+
+        """
+        self.chains[start_event_rowindex] = (infection_events, chain_state)
+
+    def get_first_changed_rowindex(
+        self, model_parameters, weather, oospore_maturation_datetime_rowindex
+    ):
+        """
+        Returns the first row index at which the given weather timeseries differs
+        from the stored one (rows beyond the end of either one count as changed),
+        or 0 if the model version, the model parameters or the oospore maturation
+        row index differ.
+        Measurements are compared bitwise, so that equal missing values match.
+
+        """
+        if (
+            self.model_version != model_version
+            or get_model_parameters(model_parameters) != self.model_parameters
+            or oospore_maturation_datetime_rowindex
+            != self.oospore_maturation_datetime_rowindex
+        ):
+            return 0
+        number_of_common_rows = min(len(self.time), len(weather))
+        is_changed = (
+            self.time[:number_of_common_rows] != weather.time[:number_of_common_rows]
+        )
+        for column, values in self.measurements.items():
+            is_changed |= values[:number_of_common_rows].view(np.int64) != weather[
+                column
+            ][:number_of_common_rows].view(np.int64)
+        changed_rowindexes = np.flatnonzero(is_changed)
+        if len(changed_rowindexes) > 0:
+            return int(changed_rowindexes[0])
+        return number_of_common_rows
+
+    def get_unaffected_chain(self, start_event_rowindex, first_changed_rowindex):
+        """
+        Returns the (infection events, chain state) of the given start row if its
+        infection chain read no row at or after first_changed_rowindex, else None.
+
+        """
+        chain = self.chains.get(start_event_rowindex)
+        if chain is None or chain[1]["read_rowindex"] >= first_changed_rowindex:
+            return None
+        return chain
+
+    def get_reusable_chain(
+        self, start_event_rowindex, first_changed_rowindex, oospore_infection_registry
+    ):
+        """
+        Returns the (infection events, chain state) of the given start row if the
+        infection chain is unaffected by the changed rows and its oospore infection
+        is registered by an earlier start row of this run (oospore_infection_registry)
+        exactly when it was in the previous run, else None.
+
+        """
+        chain = self.get_unaffected_chain(start_event_rowindex, first_changed_rowindex)
+        if chain is None:
+            return None
+        oospore_infection_rowindex = chain[1]["oospore_infection_rowindex"]
+        if (
+            oospore_infection_rowindex is not None
+            and (oospore_infection_rowindex in oospore_infection_registry)
+            == chain[1]["is_registered"]
+        ):
+            return None
+        return chain
+
+    def save(self, directory):
+        """
+        Writes the run state to a directory, replacing the previous one: the
+        infection chains as a Parquet table (see get_chain_table), the weather
+        timeseries as a .npz file and the remaining values as JSON. The run state
+        is written to a temporary directory first, so that an interrupted run never
+        leaves a partial one.
+
+        """
+        directory = Path(directory)
+        temporary_dir = directory.with_name(f"{directory.name}.tmp")
+        try:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+            temporary_dir.mkdir(parents=True)
+            get_chain_table(self.chains).to_parquet(
+                temporary_dir / "chains.parquet", index=False
+            )
+            np.savez(
+                temporary_dir / "weather.npz",
+                time=self.time,
+                **{
+                    f"measurements/{column}": values
+                    for column, values in self.measurements.items()
+                },
+            )
+            (temporary_dir / "run_state.json").write_text(
+                json.dumps(
+                    {
+                        "model_version": self.model_version,
+                        "model_parameters": self.model_parameters,
+                        "oospore_maturation_datetime_rowindex": (
+                            None
+                            if self.oospore_maturation_datetime_rowindex is None
+                            else int(self.oospore_maturation_datetime_rowindex)
+                        ),
+                    }
+                )
+            )
+            shutil.rmtree(directory, ignore_errors=True)
+            temporary_dir.rename(directory)
+        except Exception as e:
+            logger.warning(
+                f"\nRun State Warning: could not write the run state {directory} ({e}).\n"
+            )
+
+
+def get_model_parameters(model_parameters):
+    """
+    Returns the model parameters the infection chains depend on, i.e. the whole
+    configuration except its input, output and logging settings and the stage
+    metrics and profiling switches, as a plain dictionary with the types of its
+    JSON representation (e.g. string keys), so that it compares equal to the
+    model parameters read back from a stored run state.
+
+    """
+    model_parameters = OmegaConf.to_container(model_parameters, resolve=True)
+    model_parameters.pop("input_data", None)
+    model_parameters.pop("output", None)
+    model_parameters.pop("logging", None)
+    model_parameters.get("run_settings", {}).pop("stage_metrics", None)
+    model_parameters.get("run_settings", {}).pop("profile", None)
+    return json.loads(json.dumps(model_parameters, default=str))
+
+
+def add_value_rows(rows, start_event_rowindex, name, value, index=-1, subindex=-1):
+    """
+    Appends the chain table rows of one value of an infection chain: one row per
+    scalar, and for a dictionary or list one row marking it, followed by the rows
+    of its values (named name/key) or of its items (lists are nested at most
+    twice).
+
+    """
+    if isinstance(value, dict) and index < 0:
+        rows.append(
+            (start_event_rowindex, name, index, subindex, "dict", 0, np.nan, "")
+        )
+        for key, item in value.items():
+            add_value_rows(rows, start_event_rowindex, f"{name}/{key}", item)
+        return
+    if isinstance(value, list) and subindex < 0:
+        rows.append(
+            (start_event_rowindex, name, index, subindex, "list", 0, np.nan, "")
+        )
+        for item_index, item in enumerate(value):
+            if index < 0:
+                add_value_rows(rows, start_event_rowindex, name, item, item_index)
+            else:
+                add_value_rows(
+                    rows, start_event_rowindex, name, item, index, item_index
+                )
+        return
+    kind = value_kinds.get(type(value))
+    if kind is None:
+        raise TypeError(f"cannot store {name} value of type {type(value).__name__}")
+    integer, number, timezone = 0, np.nan, ""
+    if kind == "datetime":
+        integer, timezone = value.value, "" if value.tz is None else str(value.tz)
+    elif kind in ("bool", "int", "int64"):
+        integer = int(value)
+    elif kind in ("float", "float64"):
+        number = float(value)
+    rows.append(
+        (start_event_rowindex, name, index, subindex, kind, integer, number, timezone)
+    )
+
+
+def get_chain_table(chains):
+    """
+    Returns the infection chains of a run state as one table of typed values, in
+    order: one row per scalar (or dictionary or list) of the infection events
+    (named events/<key>) and chain state (named chain_state/<key>) of each start
+    row, with the positions of list items (index, and subindex for the items of
+    nested lists), the kind of value and the value itself, as an integer (row
+    indexes, flags, nanoseconds since the epoch of datetimes, with their timezone)
+    or a number.
+
+    """
+    rows = []
+    for start_event_rowindex, chain in chains.items():
+        for root_name, values in zip(("events", "chain_state"), chain, strict=True):
+            for key, value in values.items():
+                add_value_rows(rows, start_event_rowindex, f"{root_name}/{key}", value)
+    return pd.DataFrame(rows, columns=chain_table_columns).astype(
+        {
+            "start_rowindex": np.int64,
+            "index": np.int64,
+            "subindex": np.int64,
+            "integer": np.int64,
+            "number": np.float64,
+        }
+    )
+
+
+def get_value(kind, integer, number, timezone):
+    """
+    Returns the scalar value of a chain table row, see get_chain_table.
+
+    """
+    if kind == "none":
+        return None
+    if kind == "bool":
+        return bool(integer)
+    if kind == "int":
+        return int(integer)
+    if kind == "int64":
+        return np.int64(integer)
+    if kind == "float":
+        return float(number)
+    if kind == "float64":
+        return np.float64(number)
+    if kind == "datetime":
+        if not timezone:
+            return pd.Timestamp(integer)
+        return pd.Timestamp(integer, tz="UTC").tz_convert(timezone)
+    raise ValueError(f"unknown kind of value {kind}")
+
+
+def get_chains(chain_table):
+    """
+    Returns the (infection events, chain state) of every start row stored in a
+    chain table, see get_chain_table.
+
+    """
+    chains = {}
+    for (
+        start_event_rowindex,
+        name,
+        index,
+        subindex,
+        kind,
+        integer,
+        number,
+        timezone,
+    ) in chain_table[list(chain_table_columns)].itertuples(index=False, name=None):
+        start_event_rowindex = int(start_event_rowindex)
+        if start_event_rowindex not in chains:
+            chains[start_event_rowindex] = ({}, {})
+        infection_events, chain_state = chains[start_event_rowindex]
+        *keys, key = name.split("/")
+        values = infection_events if keys[0] == "events" else chain_state
+        for parent_key in keys[1:]:
+            values = values[parent_key]
+        if kind == "dict":
+            value = {}
+        elif kind == "list":
+            value = []
+        else:
+            value = get_value(kind, integer, number, timezone)
+        if index < 0:
+            values[key] = value
+        elif subindex < 0:
+            values[key].append(value)
+        else:
+            values[key][index].append(value)
+    return chains
+
+
+def load_run_state(directory):
+    """
+    Loads the run state written by the previous run, or returns None if there is
+    none or it cannot be read.
+
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return None
+    try:
+        values = json.loads((directory / "run_state.json").read_text())
+        with np.load(directory / "weather.npz", allow_pickle=False) as weather_file:
+            time = weather_file["time"]
+            measurements = {
+                name.split("/", 1)[1]: weather_file[name]
+                for name in weather_file.files
+                if name.startswith("measurements/")
+            }
+        chains = get_chains(pd.read_parquet(directory / "chains.parquet"))
+    except Exception as e:
+        logger.warning(
+            f"\nRun State Warning: could not read the previous run state {directory} ({e}). Recomputing all infection chains.\n"
+        )
+        return None
+    previous_run_state = RunState.__new__(RunState)
+    previous_run_state.model_version = values["model_version"]
+    previous_run_state.model_parameters = values["model_parameters"]
+    previous_run_state.time = time
+    previous_run_state.measurements = measurements
+    previous_run_state.oospore_maturation_datetime_rowindex = values[
+        "oospore_maturation_datetime_rowindex"
+    ]
+    previous_run_state.chains = chains
+    return previous_run_state
@@ -0,0 +1,66 @@
+"""
+StageCache class definition script for per-run memoization of infection stage results.
+
+"""
+
+
+class StageCache:
+    """
+    Class StageCache holding the results of the infection stages computed during
+    one model run, so that infection chains converging on the same sporulations
+    reuse the stages that follow them (sporangia densities, spore lifespans,
+    secondary infections) instead of recomputing them. Incubation and sporulation
+    are not cached, as each oospore infection is only incubated once per run.
+
+    Results are keyed by (stage, sporulation row indexes, parameter fingerprint).
+    The weather timeseries is fixed for the whole run, so it is not part of the key.
+    Results are shared by the infection events they are returned to, which only
+    read them.
+    Hits and misses are counted per stage and written to the log at the end of
+    the run.
+
+    """
+
+    def __init__(self):
+        """
+        Object initialisation function.
+
+        """
+        self.results = {}
+        self.hits = {}
+        self.misses = {}
+
+    def fetch(self, stage, rowindex, parameters, compute, *args):
+        """
+        Returns the result of compute(*args) for the given stage, input row index
+        (or tuple of row indexes) and parameter fingerprint, computing it only on
+        the first request.
+
+        """
+        key = (stage, rowindex, parameters)
+        if key in self.results:
+            self.hits[stage] = self.hits.get(stage, 0) + 1
+        else:
+            self.misses[stage] = self.misses.get(stage, 0) + 1
+            self.results[key] = compute(*args)
+        return self.results[key]
+
+    def add_counters(self, hits, misses):
+        """
+        Adds hit/miss counters per stage, e.g. from the caches of worker processes.
+
+        """
+        for stage, count in hits.items():
+            self.hits[stage] = self.hits.get(stage, 0) + count
+        for stage, count in misses.items():
+            self.misses[stage] = self.misses.get(stage, 0) + count
+
+    def summary(self):
+        """
+        Returns the hit/miss counters per stage as a printable string.
+
+        """
+        summary = "\nStage cache (hits/misses):\n"
+        for stage in self.misses:
+            summary += f"\t{stage}: {self.hits.get(stage, 0)}/{self.misses[stage]}\n"
+        return summary
@@ -0,0 +1,132 @@
+"""
+StageMetrics class definition script for opt-in timing of the infection stage functions.
+
+"""
+
+import json
+import time
+
+
+class StageMetrics:
+    """
+    Class StageMetrics holding the cumulative wall time and number of calls of each
+    infection stage function (keyed as module.function) over the model loop, and
+    the number of weather rows scanned by each stage of the infection chains.
+
+    The rows scanned by a chain stage are the rows from the row its search starts
+    at to the furthest row it reads (see run_infection_model). They are only
+    counted when a stage function ran since the previous recorded stage, so that
+    stages reused from the stage cache scan no rows.
+
+    Metrics are only collected when enabled in run_settings: otherwise no
+    StageMetrics object exists and timed returns the stage functions unchanged.
+
+    """
+
+    def __init__(self):
+        """
+        Object initialisation function.
+
+        """
+        self.calls = {}
+        self.seconds = {}
+        self.rows_scanned = {}
+        self.computed = False
+
+    def timed(self, function):
+        """
+        Returns function wrapped so that its calls and wall time are counted.
+
+        """
+        stage = get_stage_name(function)
+
+        def timed_function(*args):
+            t_start = time.perf_counter()
+            result = function(*args)
+            self.seconds[stage] = (
+                self.seconds.get(stage, 0.0) + time.perf_counter() - t_start
+            )
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+            self.computed = True
+            return result
+
+        return timed_function
+
+    def add_rows_scanned(self, stage, from_rowindex, read_rowindex):
+        """
+        Counts the rows scanned by a chain stage, if a stage function ran since the
+        previous recorded stage.
+
+        """
+        if self.computed:
+            self.rows_scanned[stage] = self.rows_scanned.get(stage, 0) + max(
+                0, int(read_rowindex) - int(from_rowindex)
+            )
+            self.computed = False
+
+    def get_counters(self):
+        """
+        Returns the calls, seconds and rows scanned counters, e.g. to send them from
+        a worker process.
+
+        """
+        return self.calls, self.seconds, self.rows_scanned
+
+    def add_counters(self, calls, seconds, rows_scanned):
+        """
+        Adds calls, seconds and rows scanned counters, e.g. from worker processes.
+
+        """
+        for stage, count in calls.items():
+            self.calls[stage] = self.calls.get(stage, 0) + count
+        for stage, stage_seconds in seconds.items():
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + stage_seconds
+        for stage, rows in rows_scanned.items():
+            self.rows_scanned[stage] = self.rows_scanned.get(stage, 0) + rows
+
+    def summary(self):
+        """
+        Returns the counters per stage function as a printable string, slowest first.
+
+        """
+        summary = "\nStage metrics (calls, seconds):\n"
+        for stage in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            summary += f"\t{stage}: {self.calls[stage]}, {self.seconds[stage]:.3f}\n"
+        summary += "Rows scanned per chain stage:\n"
+        for stage, rows in self.rows_scanned.items():
+            summary += f"\t{stage}: {rows}\n"
+        return summary
+
+    def save(self, filename, **run_metrics):
+        """
+        Writes the counters, along with the given run-wide metrics (e.g. loop wall
+        time, number of start rows), to a JSON file.
+
+        """
+        metrics = dict(run_metrics)
+        metrics["stages"] = {
+            stage: {"calls": self.calls[stage], "seconds": self.seconds[stage]}
+            for stage in sorted(self.seconds, key=self.seconds.get, reverse=True)
+        }
+        metrics["rows_scanned"] = self.rows_scanned
+        with open(filename, "w") as f:
+            json.dump(metrics, f, indent=2, default=str)
+
+
+def get_stage_name(function):
+    """
+    Returns the name of a stage function as module.function, without its package.
+
+    """
+    return f"{function.__module__.rsplit('.', 1)[-1]}.{function.__name__}"
+
+
+def timed(stage_metrics, function):
+    """
+    Returns function timed by stage_metrics, or function itself if metrics are
+    disabled (stage_metrics is None), so that disabled metrics cost nothing.
+
+    """
+    if stage_metrics is None:
+        return function
+    return stage_metrics.timed(function)
@@ -0,0 +1,84 @@
+"""
+SunTable class definition script for season-wide sunrise and sunset times per site.
+
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import utils
+
+
+class SunTable:
+    """
+    Class SunTable holding the sunrise and sunset times of every date of a
+    WeatherSeries for one site, so that the sporulation and sporangia density
+    stages look them up per row instead of solving them on every call.
+
+    Sunrise and sunset are solved once per distinct date with utils.get_suntimes,
+    and broadcast to all rows as arrays of epoch seconds. Darkness-window bounds
+    and "is dark" row masks are derived per minimum number of darkness hours.
+
+    """
+
+    def __init__(self, weather, longitude, latitude, elevation):
+        """
+        Object initialisation function.
+
+        """
+        self.time = weather.time
+        self.dates, self.date_rowindexes = np.unique(weather.date, return_inverse=True)
+        suntimes = [
+            utils.get_suntimes(longitude, latitude, elevation, date)
+            for date in self.dates
+        ]
+        self.sunrises = [suntime["sunrise"] for suntime in suntimes]
+        self.sunsets = [suntime["sunset"] for suntime in suntimes]
+        self.sunrise_time = np.array(
+            [sunrise.timestamp() for sunrise in self.sunrises]
+        )[self.date_rowindexes]
+        self.sunset_time = np.array([sunset.timestamp() for sunset in self.sunsets])[
+            self.date_rowindexes
+        ]
+        self._darkness_masks = {}
+
+    def darkness_start_time(self, min_darkness_hours):
+        """
+        Returns, for every row, the latest time (in epoch seconds) before sunrise of
+        the row's date leaving at least min_darkness_hours of darkness.
+
+        """
+        return np.array(
+            [
+                (sunrise - timedelta(hours=min_darkness_hours)).timestamp()
+                for sunrise in self.sunrises
+            ]
+        )[self.date_rowindexes]
+
+    def is_dark(self, min_darkness_hours):
+        """
+        Returns the boolean row mask of rows lying after sunset of their date, or
+        early enough before sunrise to leave at least min_darkness_hours of darkness.
+
+        """
+        if min_darkness_hours not in self._darkness_masks:
+            is_dark = (self.time >= self.sunset_time) | (
+                self.time <= self.darkness_start_time(min_darkness_hours)
+            )
+            is_dark.flags.writeable = False
+            self._darkness_masks[min_darkness_hours] = is_dark
+        return self._darkness_masks[min_darkness_hours]
+
+
+def get_sun_table(weather, longitude, latitude, elevation):
+    """
+    Returns the SunTable of the given site for the timeseries, built only once.
+
+    """
+    return weather.precomputed(
+        ("sun_table", longitude, latitude, elevation),
+        SunTable,
+        longitude,
+        latitude,
+        elevation,
+    )
@@ -6,8 +6,8 @@ Plotting functions have been moved to plots.py.
 
 from datetime import datetime
 from pathlib import Path
-from statistics import mean
 
+import numpy as np
 from suntimes import SunTimes
 
 
@@ -15,9 +15,10 @@ class output_files:
     def __init__(
         self,
         logfile,
+        json_log,
         processed_file_meteo,
         model_params,
-        events_dict,
+        result_store,
         events_text,
         events_dataframe,
         infection_datetimes,
@@ -26,11 +27,17 @@ class output_files:
         analysis_html,
         overview_html,
         decision_support_html,
+        oospore_infection_datetimes,
+        qc_report,
+        run_state,
+        stage_metrics,
+        profile,
     ):
         self.logfile = logfile
+        self.json_log = json_log
         self.processed_file_meteo = processed_file_meteo
         self.model_params = model_params
-        self.events_dict = events_dict
+        self.result_store = result_store
         self.events_text = events_text
         self.events_dataframe = events_dataframe
         self.infection_datetimes = infection_datetimes
@@ -39,6 +46,11 @@ class output_files:
         self.analysis_html = analysis_html
         self.overview_html = overview_html
         self.decision_support_html = decision_support_html
+        self.oospore_infection_datetimes = oospore_infection_datetimes
+        self.qc_report = qc_report
+        self.run_state = run_state
+        self.stage_metrics = stage_metrics
+        self.profile = profile
 
 
 def create_output_filenames(
@@ -86,9 +98,10 @@ def create_output_filenames(
         return Path(str(output_basename) + ext).resolve()
 
     logfile = _p(".log")
+    json_log = _p(".log.jsonl")
     processed_file_meteo = _p(".processed.csv")
     model_params = _p(".model_params.obj")
-    events_dict = _p(".events.obj")
+    result_store = _p(".results")
     events_text = _p(".events_log.csv")
     events_dataframe = _p(".events_table.csv")
     infection_datetimes = _p(".infection_datetimes.csv")
@@ -97,12 +110,18 @@ def create_output_filenames(
     analysis_html = _p(".analysis.html")
     overview_html = _p(".overview.html")
     decision_support_html = _p(".heatmap.html")
+    oospore_infection_datetimes = _p(".oospore_infection_datetimes.csv")
+    qc_report = _p(".qc_report.csv")
+    run_state = _p(".run_state")
+    stage_metrics = _p(".stage_metrics.json")
+    profile = _p(".profile.pstats")
 
     output_filenames = output_files(
         logfile,
+        json_log,
         processed_file_meteo,
         model_params,
-        events_dict,
+        result_store,
         events_text,
         events_dataframe,
         infection_datetimes,
@@ -111,6 +130,11 @@ def create_output_filenames(
         analysis_html,
         overview_html,
         decision_support_html,
+        oospore_infection_datetimes,
+        qc_report,
+        run_state,
+        stage_metrics,
+        profile,
     )
     return output_filenames
 
@@ -129,50 +153,27 @@ def get_suntimes(longitude, latitude, elevation, date):
     return suntimes
 
 
-def get_daily_measurements(processed_data, variable):
+def get_daily_infection_strengths(weather, measurement_time_interval):
     """
-    Returns a nested dictionary of any measurement variable per day, with day as
-    first key and the row index as second key.
+    Returns a dictionary with the daily infection strength index of every date of
+    the timeseries, grouping the wet (leaf_wetness > 0) temperature measurements
+    by date in a single pass: sum of (temperature * measurement_time_interval / 60).
+    Dates without wet measurements get 0.0. Units: degree-hours.
 
     """
-    daily_measurements = {}
-    for i in processed_data.index:
-        try:
-            day = processed_data["datetime"][i].date()
-        except TypeError:
-            continue
-        try:
-            measurement = processed_data[variable][i]
-        except ValueError:
-            continue
-        if day in daily_measurements.keys():
-            daily_measurements[day][i] = measurement
-        else:
-            daily_measurements[day] = {i: measurement}
-    return daily_measurements
-
-
-def get_daily_mean_measurements(processed_data, variable):
-    """
-    Returns a dictionary with the averages per day of a specific measurement variable.
-
-    """
-    daily_measurements = get_daily_measurements(processed_data, variable)
-    daily_mean_measurements = {}
-    for day in daily_measurements.keys():
-        daily_mean = mean(daily_measurements[day].values())
-        daily_mean_measurements[day] = daily_mean
-    return daily_mean_measurements
-
-
-def compute_daily_infection_strength(processed_data, date, measurement_time_interval):
-    """
-    Returns the daily infection strength index for a given date:
-    sum of (temperature * measurement_time_interval / 60) for all timesteps
-    where leaf_wetness > 0.  Units: degree-hours.
-    """
-    mask = (processed_data["datetime"].dt.date == date) & (
-        processed_data["leaf_wetness"] > 0
-    )
-    temps = processed_data.loc[mask, "temperature"].dropna()
-    return float(temps.sum() * measurement_time_interval / 60)
+    wet = (weather.leaf_wetness > 0) & ~np.isnan(weather.temperature)
+    wet_temperatures = weather.temperature[wet]
+    wet_dates = weather.date[wet]
+    group_starts = np.flatnonzero(wet_dates[1:] != wet_dates[:-1]) + 1
+    daily_infection_strengths = dict.fromkeys(np.unique(weather.date), 0.0)
+    if len(wet_dates) == 0:
+        return daily_infection_strengths
+    for date, temperatures in zip(
+        wet_dates[np.r_[0, group_starts]],
+        np.split(wet_temperatures, group_starts),
+        strict=True,
+    ):
+        daily_infection_strengths[date] = float(
+            temperatures.sum() * measurement_time_interval / 60
+        )
+    return daily_infection_strengths
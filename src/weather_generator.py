@@ -0,0 +1,409 @@
+"""
+Synthetic weather generator script writing multi-year, multi-station weather files in the Agrometeo format, with matching qPCR spore count files.
+
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Column headers of the Agrometeo weather files, after the station name, in the
+# column order of data_columns in config/main.yaml.
+weather_headers = (
+    "Température moy. +2 m (°C)",
+    "Humidité moy. (%)",
+    "Précipitations intensité (mm/h)",
+    "Humectage du feuillage (min)",
+)
+
+# Climate of the generated stations, close to the bundled Changins seasons.
+changins_climate = {
+    "mean_temperature": 10.5,  # [°C] annual mean temperature
+    "seasonal_temperature_amplitude": 9.5,  # [°C] half range of the annual cycle
+    "diurnal_temperature_amplitude": 4.0,  # [°C] half range of the daily cycle in spring/autumn
+    "seasonal_diurnal_amplitude": 1.5,  # [°C] added to it in summer, removed in winter
+    "temperature_persistence": 0.7,  # day-to-day autocorrelation of temperature anomalies
+    "temperature_deviation": 2.5,  # [°C] standard deviation of daily temperature anomalies
+    "rain_cooling": 1.5,  # [°C] cooling while it rains
+    "dewpoint_depression": 5.0,  # [°C] mean daily dewpoint depression in spring/autumn
+    "seasonal_dewpoint_depression": 2.0,  # [°C] added to it in summer, removed in winter
+    "dewpoint_depression_deviation": 1.5,  # [°C] standard deviation of its daily anomalies
+    "mean_dry_spell_hours": 35.0,  # [h] mean duration between rain spells
+    "mean_wet_spell_hours": 3.0,  # [h] mean duration of rain spells
+    "mean_rain_intensity": 1.7,  # [mm/h] mean rainfall intensity while it rains
+    "rain_intermittency": 0.2,  # share of dry measurements within rain spells
+    "drying_hours": 1.0,  # [h] leaf drying time after rain
+    "humid_drying_hours": 4.0,  # [h] leaf drying time after rain at high humidity
+    "humid_drying_humidity": 85.0,  # [%] humidity above which leaves dry slowly
+    "dew_humidity": 92.0,  # [%] humidity above which dew wets the leaves
+}
+
+# Spore trap season (month, day) and days between two qPCR samples.
+spore_trap_start = (4, 14)
+spore_trap_end = (8, 31)
+spore_sampling_days = (2, 3, 4)
+
+
+def get_seasonal_cycle(day_of_year):
+    """
+    Returns the annual cycle of the given days of year: -1 around January 20th,
+    +1 around July 21st.
+
+    """
+    return -np.cos(2 * np.pi * (day_of_year - 20) / 365.25)
+
+
+def get_daily_anomalies(number_of_days, persistence, deviation, rng):
+    """
+    Returns an AR(1) series of daily anomalies with the given day-to-day
+    autocorrelation and standard deviation.
+
+    """
+    innovations = rng.normal(
+        0, deviation * np.sqrt(1 - persistence**2), number_of_days
+    )
+    anomalies = np.empty(number_of_days)
+    anomaly = rng.normal(0, deviation)
+    for day in range(number_of_days):
+        anomaly = persistence * anomaly + innovations[day]
+        anomalies[day] = anomaly
+    return anomalies
+
+
+def get_saturation_vapor_pressure(temperature):
+    """
+    Returns the saturation vapour pressure [hPa] at the given temperatures [°C]
+    (Magnus formula).
+
+    """
+    return 6.1094 * np.exp(17.625 * temperature / (243.04 + temperature))
+
+
+def generate_rainfall(day_of_year, measurement_time_interval, climate, rng):
+    """
+    **Generate rainfall intensities [mm/h] of a timeseries.**
+
+    Rain falls in spells: dry and wet spells alternate with geometrically
+    distributed durations. Every spell has its own mean intensity (gamma
+    distributed, higher in summer), and measurements within a spell vary around
+    it, with some dry measurements.
+
+    """
+    number_of_rows = len(day_of_year)
+    rows_per_hour = 60 / measurement_time_interval
+    mean_dry_rows = climate["mean_dry_spell_hours"] * rows_per_hour
+    mean_wet_rows = climate["mean_wet_spell_hours"] * rows_per_hour
+    number_of_spells = int(2 * number_of_rows / (mean_dry_rows + mean_wet_rows)) + 10
+    spell_bounds = np.cumsum(
+        np.column_stack(
+            [
+                rng.geometric(1 / mean_dry_rows, number_of_spells),
+                rng.geometric(1 / mean_wet_rows, number_of_spells),
+            ]
+        ).ravel()
+    )
+    # Odd spell numbers are wet spells, numbered spell_number // 2.
+    spell_numbers = np.searchsorted(spell_bounds, np.arange(number_of_rows), "right")
+    is_wet = spell_numbers % 2 == 1
+    spell_intensities = rng.gamma(1.0, climate["mean_rain_intensity"], number_of_spells)
+    rainfall = (
+        spell_intensities[spell_numbers // 2]
+        * (1 + 0.4 * get_seasonal_cycle(day_of_year))
+        * rng.gamma(2.0, 0.5, number_of_rows)
+    )
+    rainfall[~is_wet | (rng.random(number_of_rows) < climate["rain_intermittency"])] = 0
+    return np.clip(np.round(rainfall, 1), 0, 200)
+
+
+def generate_weather(
+    start,
+    end,
+    measurement_time_interval,
+    timezone,
+    climate,
+    rng,
+    temperature_offset=0.0,
+):
+    """
+    **Generate the weather timeseries of one station.**
+
+    argument1
+    : first measurement datetime (local time)
+
+    argument2
+    : last measurement datetime (local time)
+
+    Measurements are evenly spaced in absolute time and dated in the local time
+    of the site timezone, as in Agrometeo files: the hour skipped when daylight
+    saving time starts is missing, and the hour repeated when it ends appears twice.
+
+    Temperature follows an annual cycle, day-to-day anomalies and a diurnal cycle
+    (minimum at 3:00, maximum at 15:00) damped on rainy days. Humidity follows from
+    a daily dewpoint below the daily mean temperature, so that it peaks at night,
+    and saturates while it rains. Leaves are wet while it rains, while they dry
+    after rain (slower at high humidity) and under dew.
+
+    return
+    : dataframe of datetimes, temperature, humidity, rainfall intensity and leaf
+    wetness minutes per measurement
+
+    """
+    datetimes = pd.date_range(
+        start, end, freq=f"{measurement_time_interval}min", tz=timezone
+    )
+    local_datetimes = datetimes.tz_localize(None).to_numpy().astype("datetime64[m]")
+    dates = local_datetimes.astype("datetime64[D]")
+    day_index = (dates - dates[0]).astype(int)
+    number_of_days = day_index[-1] + 1
+    day_of_year = (dates - local_datetimes.astype("datetime64[Y]")).astype(int) + 1
+    hour = (local_datetimes - dates).astype(int) / 60
+    seasonal_cycle = get_seasonal_cycle(day_of_year)
+
+    rainfall = generate_rainfall(day_of_year, measurement_time_interval, climate, rng)
+    is_raining = rainfall > 0
+    rows_per_day = 24 * 60 / measurement_time_interval
+    daily_rain_share = (
+        np.bincount(day_index, weights=is_raining, minlength=number_of_days)
+        / rows_per_day
+    )
+
+    daily_mean_temperature = (
+        climate["mean_temperature"]
+        + temperature_offset
+        + climate["seasonal_temperature_amplitude"] * seasonal_cycle
+        + get_daily_anomalies(
+            number_of_days,
+            climate["temperature_persistence"],
+            climate["temperature_deviation"],
+            rng,
+        )[day_index]
+    )
+    diurnal_amplitude = (
+        climate["diurnal_temperature_amplitude"]
+        + climate["seasonal_diurnal_amplitude"] * seasonal_cycle
+    ) * (1 - 0.6 * np.minimum(1, 4 * daily_rain_share[day_index]))
+    temperature = (
+        daily_mean_temperature
+        + diurnal_amplitude * np.cos(2 * np.pi * (hour - 15) / 24)
+        - climate["rain_cooling"] * is_raining
+        + rng.normal(0, 0.2, len(datetimes))
+    )
+
+    dewpoint_depression = np.maximum(
+        0.5,
+        climate["dewpoint_depression"]
+        + climate["seasonal_dewpoint_depression"] * seasonal_cycle
+        + get_daily_anomalies(
+            number_of_days, 0.6, climate["dewpoint_depression_deviation"], rng
+        )[day_index],
+    )
+    dewpoint = np.where(
+        is_raining, temperature - 0.3, daily_mean_temperature - dewpoint_depression
+    )
+    humidity = 100 * get_saturation_vapor_pressure(
+        dewpoint
+    ) / get_saturation_vapor_pressure(temperature) + rng.normal(0, 1, len(datetimes))
+    humidity = np.clip(np.round(humidity), 20, 100).astype(int)
+
+    # Number of measurements since the last rain (the row count if it never rained).
+    rowindexes = np.arange(len(datetimes))
+    last_rain_rowindex = np.maximum.accumulate(np.where(is_raining, rowindexes, -1))
+    hours_since_rain = np.where(
+        last_rain_rowindex >= 0,
+        (rowindexes - last_rain_rowindex) * measurement_time_interval / 60,
+        np.inf,
+    )
+    is_wet = (
+        is_raining
+        | (hours_since_rain <= climate["drying_hours"])
+        | (
+            (hours_since_rain <= climate["humid_drying_hours"])
+            & (humidity >= climate["humid_drying_humidity"])
+        )
+        | (humidity >= climate["dew_humidity"])
+    )
+
+    return pd.DataFrame(
+        {
+            "datetime": datetimes,
+            "temperature": np.round(temperature, 1),
+            "humidity": humidity,
+            "rainfall": rainfall,
+            "leaf_wetness": np.where(is_wet, measurement_time_interval, 0),
+        }
+    )
+
+
+def generate_spore_counts(weather, measurement_time_interval, rng):
+    """
+    **Generate qPCR spore counts matching a weather timeseries.**
+
+    Spore traps are sampled every 2 to 4 days at midnight over the trap season of
+    every year. Counts grow over the season with the hours favourable to
+    infection (wet leaves above 10 °C) accumulated since the trap season start,
+    and rise and fall with those of the last 5 days, with log-normal noise.
+
+    return
+    : dataframe of sample datetimes and spore counts
+
+    """
+    favourable_hours = (weather["leaf_wetness"].to_numpy() > 0) & (
+        weather["temperature"].to_numpy() > 10
+    )
+    favourable_hours = favourable_hours * measurement_time_interval / 60
+    daily_favourable_hours = (
+        pd.Series(favourable_hours, index=weather["datetime"].dt.tz_localize(None))
+        .resample("D")
+        .sum()
+    )
+
+    sample_dates = []
+    sample_counts = []
+    for year in sorted(set(daily_favourable_hours.index.year)):
+        season_start = pd.Timestamp(year, *spore_trap_start)
+        season_end = pd.Timestamp(year, *spore_trap_end)
+        sample_date = season_start
+        while sample_date <= min(season_end, daily_favourable_hours.index[-1]):
+            if sample_date >= daily_favourable_hours.index[0]:
+                season_hours = daily_favourable_hours[season_start:sample_date].sum()
+                recent_hours = daily_favourable_hours[
+                    sample_date - pd.Timedelta(days=5) : sample_date
+                ].sum()
+                log_count = (
+                    -1.0
+                    + 6.0 * (1 - np.exp(-season_hours / 150))
+                    + 1.5 * (recent_hours / 20 - 1)
+                    + rng.normal(0, 0.6)
+                )
+                sample_dates.append(sample_date)
+                sample_counts.append(
+                    round(10**log_count, 2) if log_count > -1.5 else 0
+                )
+            sample_date += pd.Timedelta(days=int(rng.choice(spore_sampling_days)))
+    return pd.DataFrame({"datetime": sample_dates, "counts": sample_counts})
+
+
+def format_datetimes(datetimes):
+    """
+    Returns datetimes as DD.MM.YYYY HH:MM strings of their local time, formatting
+    every distinct date and time of day once, as strftime is slow on long series.
+
+    """
+    local_datetimes = datetimes.dt.tz_localize(None).to_numpy().astype("datetime64[m]")
+    dates = local_datetimes.astype("datetime64[D]")
+    unique_dates, date_indexes = np.unique(dates, return_inverse=True)
+    unique_minutes, minute_indexes = np.unique(
+        (local_datetimes - dates).astype(int), return_inverse=True
+    )
+    date_strings = pd.DatetimeIndex(unique_dates).strftime("%d.%m.%Y ").to_numpy(str)
+    time_strings = np.array(
+        [f"{minute // 60:02d}:{minute % 60:02d}" for minute in unique_minutes]
+    )
+    return np.char.add(date_strings[date_indexes], time_strings[minute_indexes])
+
+
+def write_weather_file(weather, station_name, weather_file):
+    """
+    Writes a weather timeseries in the Agrometeo format read by load_data:
+    semicolon-separated, DD.MM.YYYY HH:MM datetimes, one column per measurement
+    headed with the station name.
+
+    """
+    weather_table = weather.copy()
+    weather_table["datetime"] = format_datetimes(weather_table["datetime"])
+    weather_table.columns = ["Date"] + [
+        f"{station_name} - {header}" for header in weather_headers
+    ]
+    weather_table.to_csv(weather_file, sep=";", index=False)
+
+
+def write_spore_counts_file(spore_counts, spore_counts_file):
+    """
+    Writes spore counts in the format of the qPCR spore count files:
+    semicolon-separated Date;Counts rows with DD.MM.YYYY HH:MM datetimes.
+
+    """
+    spore_counts_table = pd.DataFrame(
+        {
+            "Date": spore_counts["datetime"].dt.strftime("%d.%m.%Y %H:%M"),
+            "Counts": spore_counts["counts"],
+        }
+    )
+    spore_counts_table.to_csv(
+        spore_counts_file, sep=";", index=False, lineterminator="\r\n"
+    )
+
+
+def main(arguments=None):
+    """
+    **Generate the weather and spore count files of synthetic stations.**
+
+    Datetimes are in the local time of the given timezone. Every station gets its
+    own random stream (from the seed and its number) and a temperature offset of
+    up to ±1.5 °C, e.g. for its elevation, and its files are named like the
+    bundled ones: <first year>-<last year>_meteo_<station>.csv and
+    <first year>-<last year>_qPCR_<station>.csv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stations", type=int, default=1, help="number of stations")
+    parser.add_argument("--years", type=int, default=1, help="number of years")
+    parser.add_argument("--start-year", type=int, default=2023)
+    parser.add_argument(
+        "--season-end",
+        default="12-31",
+        help="last day (MM-DD) of the last year, e.g. 09-30 like the bundled seasons",
+    )
+    parser.add_argument(
+        "--measurement-time-interval",
+        type=int,
+        default=10,
+        help="minutes between consecutive measurements",
+    )
+    parser.add_argument("--timezone", default="Europe/Zurich", help="site timezone")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-directory", default="data/input/synthetic")
+    parser.add_argument("--name", default="synthetic", help="station name prefix")
+    arguments = parser.parse_args(arguments)
+
+    end_year = arguments.start_year + arguments.years - 1
+    start = pd.Timestamp(f"{arguments.start_year}-01-01")
+    end = pd.Timestamp(f"{end_year}-{arguments.season_end}") + pd.Timedelta(
+        minutes=24 * 60 - arguments.measurement_time_interval
+    )
+    output_directory = Path(arguments.output_directory)
+    output_directory.mkdir(parents=True, exist_ok=True)
+
+    for station in range(1, arguments.stations + 1):
+        rng = np.random.default_rng([arguments.seed, station])
+        station_name = f"{arguments.name}{station:02d}"
+        weather = generate_weather(
+            start,
+            end,
+            arguments.measurement_time_interval,
+            arguments.timezone,
+            changins_climate,
+            rng,
+            temperature_offset=rng.uniform(-1.5, 1.5),
+        )
+        spore_counts = generate_spore_counts(
+            weather, arguments.measurement_time_interval, rng
+        )
+        period = f"{arguments.start_year}-{end_year}"
+        weather_file = output_directory / f"{period}_meteo_{station_name}.csv"
+        spore_counts_file = output_directory / f"{period}_qPCR_{station_name}.csv"
+        write_weather_file(weather, station_name.upper(), weather_file)
+        write_spore_counts_file(spore_counts, spore_counts_file)
+        print(
+            f"{station_name}: {len(weather)} weather rows written to {weather_file}, "
+            f"{len(spore_counts)} spore counts written to {spore_counts_file}",
+            flush=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
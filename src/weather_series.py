@@ -0,0 +1,97 @@
+"""
+WeatherSeries class definition script for array-backed access to the processed timeseries.
+
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _readonly(array):
+    """
+    Returns a contiguous, non-writeable copy of the given array.
+
+    """
+    array = np.array(array, order="C")
+    array.flags.writeable = False
+    return array
+
+
+class WeatherSeries:
+    """
+    Class WeatherSeries holding a compact, read-only copy of the processed
+    meteorological timeseries, built once after data processing and handed to
+    every infection stage in place of the pandas dataframe.
+
+    Measurements are stored as contiguous NumPy float arrays, so that the
+    row-by-row loops of the infection algorithms index plain arrays instead of
+    pandas Series. Datetimes are kept as the original timezone-aware pandas
+    column (used to report event datetimes) and as an int64 array of epoch
+    seconds (used for elapsed-time comparisons inside the loops).
+
+    """
+
+    measurement_columns = ("temperature", "humidity", "rainfall", "leaf_wetness")
+
+    def __init__(self, processed_data):
+        """
+        Object initialisation function.
+
+        """
+        self.datetime = processed_data["datetime"].reset_index(drop=True)
+        self.timezone = self.datetime.dt.tz
+        self.time = _readonly(pd.DatetimeIndex(self.datetime).as_unit("s").asi8)
+        self.date = _readonly(self.datetime.dt.date.to_numpy())
+        for column in self.measurement_columns:
+            setattr(
+                self,
+                column,
+                _readonly(processed_data[column].to_numpy(dtype=np.float64)),
+            )
+        self._precomputed = {}
+
+    def __len__(self):
+        """
+        Number of rows (measurement intervals) in the timeseries.
+
+        """
+        return len(self.time)
+
+    def __getitem__(self, column):
+        """
+        Column access by name, e.g. weather["temperature"].
+
+        """
+        if column != "datetime" and column not in self.measurement_columns:
+            raise KeyError(column)
+        return getattr(self, column)
+
+    def localize(self, datetime):
+        """
+        Returns the given datetime as a pandas Timestamp in the timezone of the
+        timeseries, localizing naive datetimes.
+
+        """
+        datetime = pd.to_datetime(datetime)
+        if self.timezone is not None and datetime.tzinfo is None:
+            datetime = datetime.tz_localize(self.timezone)
+        return datetime
+
+    def nearest_rowindex(self, datetime):
+        """
+        Returns the row index of the measurement closest in time to the given datetime.
+
+        """
+        datetime = self.localize(datetime)
+        return int(np.abs(self.time - datetime.timestamp()).argmin())
+
+    def precomputed(self, key, build, *args):
+        """
+        Returns the season-wide table stored under key, building it once with
+        build(self, *args) on first access. The key must include every parameter
+        the table depends on.
+
+        """
+        if key not in self._precomputed:
+            self._precomputed[key] = build(self, *args)
+        return self._precomputed[key]
@@ -0,0 +1,14 @@
+"""
+Test suite of Plasmopy, run with `make tests`.
+
+The model modules import each other as top-level modules from src/, as when
+running src/main.py, so src/ is put on the import path first.
+
+"""
+
+import sys
+from pathlib import Path
+
+src_dir = Path(__file__).resolve().parent.parent / "src"
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
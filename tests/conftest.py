@@ -0,0 +1,88 @@
+"""
+Shared fixtures of the test suite: the main configuration and the bundled 2025
+Changins season, loaded and processed once per test session.
+
+"""
+
+from pathlib import Path
+
+import load_data
+import process_data
+import pytest
+from omegaconf import OmegaConf
+
+root_dir = Path(__file__).resolve().parent.parent
+
+# Bundled weather file, and the Changins site (as in config/benchmark.yaml).
+season_meteo_file = root_dir / "data" / "input" / "2025_meteo_changins.csv"
+site = {
+    "latitude": 46.40,
+    "longitude": 6.23,
+    "elevation": 455.0,
+    "timezone": "Europe/Zurich",
+}
+
+
+@pytest.fixture(scope="session")
+def config():
+    """
+    Main configuration (config/main.yaml) as a plain dictionary.
+
+    """
+    return OmegaConf.to_container(OmegaConf.load(root_dir / "config" / "main.yaml"))
+
+
+@pytest.fixture(scope="session")
+def site_location():
+    """
+    Changins site coordinates and timezone.
+
+    """
+    return site
+
+
+@pytest.fixture(scope="session")
+def season_file():
+    """
+    Path of the bundled 2025 weather file.
+
+    """
+    return season_meteo_file
+
+
+@pytest.fixture(scope="session")
+def process_weather_file(config):
+    """
+    Function loading and processing a weather file as main.py does, returning the
+    processed dataframe and processing snapshot.
+
+    """
+
+    def process(raw_data_path, outfile, qc_report_file=None, snapshot=None):
+        data_columns = config["data_columns"]
+        return process_data.process_data(
+            load_data.load_data(raw_data_path),
+            data_columns["use_columns"],
+            data_columns["rename_columns"],
+            data_columns["format_columns"],
+            site["timezone"],
+            config,
+            outfile,
+            qc_report_file,
+            snapshot,
+        )
+
+    return process
+
+
+@pytest.fixture(scope="session")
+def season_data(process_weather_file, tmp_path_factory):
+    """
+    Processed dataframe of the bundled 2025 season.
+
+    """
+    output_dir = tmp_path_factory.mktemp("season")
+    processed_data, _snapshot = process_weather_file(
+        season_meteo_file, output_dir / "season.processed.csv"
+    )
+    return processed_data
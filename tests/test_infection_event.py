@@ -0,0 +1,275 @@
+"""
+Tests of the start-row loop of the infection model: running it with a pool of
+worker processes, or reusing the unaffected infection chains of the previous run,
+must give exactly the infection events and chain states of a serial full run.
+
+"""
+
+import daily_aggregates
+import infection_event
+import infection_model
+import pytest
+import run_state
+import utils
+from infection_registry import InfectionRegistry
+from omegaconf import OmegaConf
+from stage_cache import StageCache
+from weather_series import WeatherSeries
+
+
+@pytest.fixture(scope="module")
+def model_config(config, site_location):
+    """
+    Main configuration with the Changins site, as the DictConfig main.py runs on.
+
+    """
+    return OmegaConf.create({**config, "site": site_location})
+
+
+def run_model(model_config, processed_data, workers=1, previous_run_state=None):
+    """
+    Runs the start-row loop of the infection model on processed weather data as
+    main.py does, reusing the unaffected infection chains of the previous run state
+    if given.
+
+    return
+    : InfectionEvent of every start row, start row indexes of the reused infection chains, run state of the run
+
+    """
+    run_settings = model_config.run_settings
+    weather = WeatherSeries(processed_data)
+    daily_weather = daily_aggregates.DailyAggregates(weather)
+    (
+        _oospore_maturation_date,
+        oospore_maturation_datetime_rowindex,
+    ) = infection_model.get_oospore_maturation_date(
+        processed_data,
+        model_config,
+        model_config.data_columns.format_columns,
+        model_config.site.timezone,
+        daily_weather,
+    )
+    first_changed_rowindex = 0
+    if previous_run_state is not None:
+        first_changed_rowindex = previous_run_state.get_first_changed_rowindex(
+            model_config, weather, oospore_maturation_datetime_rowindex
+        )
+    current_run_state = run_state.RunState(
+        model_config, weather, oospore_maturation_datetime_rowindex
+    )
+    infection_predictions = []
+    reused_rowindexes = []
+    for infection_prediction, is_reused in infection_event.predict_infections(
+        weather,
+        model_config,
+        range(
+            oospore_maturation_datetime_rowindex,
+            len(weather),
+            run_settings.computational_time_steps,
+        ),
+        processed_data["datetime"][oospore_maturation_datetime_rowindex],
+        daily_weather,
+        utils.get_daily_infection_strengths(
+            weather, run_settings.measurement_time_interval
+        ),
+        run_settings.algorithmic_time_steps,
+        InfectionRegistry(),
+        StageCache(),
+        workers=workers,
+        previous_run_state=previous_run_state,
+        first_changed_rowindex=first_changed_rowindex,
+    ):
+        current_run_state.add_chain(
+            infection_prediction.start_event_rowindex,
+            infection_prediction.infection_events,
+            infection_prediction.chain_state,
+        )
+        infection_predictions.append(infection_prediction)
+        if is_reused:
+            reused_rowindexes.append(infection_prediction.start_event_rowindex)
+    return infection_predictions, reused_rowindexes, current_run_state
+
+
+def assert_same_infections(infection_predictions, expected_infection_predictions):
+    """
+    Asserts that two runs predicted the same infection events and chain states for
+    the same start rows. Events are compared by their representation, in which
+    missing spore lifespans (NaN) compare equal.
+
+    """
+    assert [
+        infection_prediction.start_event_rowindex
+        for infection_prediction in infection_predictions
+    ] == [
+        infection_prediction.start_event_rowindex
+        for infection_prediction in expected_infection_predictions
+    ]
+    for infection_prediction, expected_infection_prediction in zip(
+        infection_predictions, expected_infection_predictions, strict=True
+    ):
+        assert repr(infection_prediction.infection_events) == repr(
+            expected_infection_prediction.infection_events
+        ), infection_prediction.start_event_rowindex
+        assert (
+            infection_prediction.chain_state
+            == expected_infection_prediction.chain_state
+        ), infection_prediction.start_event_rowindex
+
+
+@pytest.fixture(scope="module")
+def season_run(model_config, season_data):
+    """
+    InfectionEvent of every start row and run state of a serial run on the 2025
+    season.
+
+    """
+    infection_predictions, _reused_rowindexes, season_run_state = run_model(
+        model_config, season_data
+    )
+    return infection_predictions, season_run_state
+
+
+""" Parallel runs """
+
+
+def test_parallel_run_matches_serial_run(model_config, season_data, season_run):
+    season_infections, _season_run_state = season_run
+    infection_predictions, _reused_rowindexes, _run_state = run_model(
+        model_config, season_data, workers=2
+    )
+    assert_same_infections(infection_predictions, season_infections)
+    # Oospore infections found by several start rows of different worker chunks
+    # are incubated only once, as in the serial run.
+    duplicates = [
+        infection_prediction
+        for infection_prediction in season_infections
+        if infection_prediction.chain_state["oospore_infection_rowindex"] is not None
+        and not infection_prediction.chain_state["is_registered"]
+    ]
+    assert len(duplicates) > 0
+
+
+""" Incremental runs """
+
+
+@pytest.fixture(scope="module")
+def updated_season(model_config, season_data):
+    """
+    Function returning the processed 2025 season whose tail from the given row on
+    has been replaced, as by a weather forecast update (2 °C warmer, with twice the
+    rainfall and leaf wetness periods swapped with dry periods), and the
+    InfectionEvent of every start row of a full run on it, computed once per row.
+
+    """
+    updated_seasons = {}
+
+    def get_updated_season(changed_rowindex):
+        if changed_rowindex not in updated_seasons:
+            updated_season_data = season_data.copy()
+            updated_season_data.loc[changed_rowindex:, "temperature"] += 2.0
+            updated_season_data.loc[changed_rowindex:, "rainfall"] *= 2
+            updated_season_data.loc[changed_rowindex:, "leaf_wetness"] = (
+                1 - updated_season_data.loc[changed_rowindex:, "leaf_wetness"]
+            )
+            infection_predictions, _reused_rowindexes, _run_state = run_model(
+                model_config, updated_season_data
+            )
+            updated_seasons[changed_rowindex] = (
+                updated_season_data,
+                infection_predictions,
+            )
+        return updated_seasons[changed_rowindex]
+
+    return get_updated_season
+
+
+def store_run_state(stored_run_state, directory):
+    """
+    Returns the run state as read back by the next run, after writing it as
+    main.py does.
+
+    """
+    stored_run_state.save(directory)
+    previous_run_state = run_state.load_run_state(directory)
+    assert previous_run_state is not None
+    return previous_run_state
+
+
+@pytest.mark.parametrize(
+    "changed_rowindex, workers",
+    [
+        (33000, 1),
+        (33000, 2),
+        (14000, 1),  # before the oospore maturation: no chain is reused
+    ],
+)
+def test_incremental_run_matches_full_run(
+    model_config, season_data, updated_season, tmp_path, changed_rowindex, workers
+):
+    updated_season_data, updated_season_infections = updated_season(changed_rowindex)
+    # Previous run on the season up to 1500 rows after the first changed row.
+    _infection_predictions, _reused_rowindexes, truncated_season_run_state = run_model(
+        model_config, season_data[: changed_rowindex + 1500]
+    )
+    previous_run_state = store_run_state(
+        truncated_season_run_state, tmp_path / "season.run_state"
+    )
+
+    infection_predictions, reused_rowindexes, _run_state = run_model(
+        model_config, updated_season_data, workers, previous_run_state
+    )
+
+    if changed_rowindex > infection_predictions[0].start_event_rowindex:
+        assert 0 < len(reused_rowindexes) < len(infection_predictions)
+    else:
+        assert reused_rowindexes == []
+    assert_same_infections(infection_predictions, updated_season_infections)
+
+
+def test_incremental_run_recomputes_changed_registrations(
+    model_config, updated_season, season_run, tmp_path
+):
+    changed_rowindex = 33000
+    updated_season_data, updated_season_infections = updated_season(changed_rowindex)
+    season_infections, season_run_state = season_run
+    # Oospore infection registered by a start row, and a later start row finding
+    # the same infection as a duplicate, both unaffected by the changed rows.
+    season_chains = {
+        infection_prediction.start_event_rowindex: infection_prediction
+        for infection_prediction in season_infections
+        if infection_prediction.chain_state["read_rowindex"] < changed_rowindex
+        and infection_prediction.chain_state["oospore_infection_rowindex"] is not None
+    }
+    registering_rowindex, duplicate_rowindex = next(
+        (registering_rowindex, duplicate_rowindex)
+        for registering_rowindex, registering_chain in season_chains.items()
+        for duplicate_rowindex, duplicate_chain in season_chains.items()
+        if registering_chain.chain_state["is_registered"]
+        and not duplicate_chain.chain_state["is_registered"]
+        and duplicate_rowindex > registering_rowindex
+        and duplicate_chain.chain_state["oospore_infection_rowindex"]
+        == registering_chain.chain_state["oospore_infection_rowindex"]
+    )
+
+    # Previous run state in which the duplicate start row registered the oospore
+    # infection itself (its stored chain being the full chain of the registering
+    # start row), as if no earlier start row had found it. The registering start
+    # row now registers it first, so the stored chain must not be reused.
+    previous_run_state = store_run_state(
+        season_run_state, tmp_path / "season.run_state"
+    )
+    previous_run_state.chains[duplicate_rowindex] = previous_run_state.chains[
+        registering_rowindex
+    ]
+    assert (
+        previous_run_state.get_unaffected_chain(duplicate_rowindex, changed_rowindex)
+        is not None
+    )
+
+    infection_predictions, reused_rowindexes, _run_state = run_model(
+        model_config, updated_season_data, 1, previous_run_state
+    )
+
+    assert registering_rowindex in reused_rowindexes
+    assert duplicate_rowindex not in reused_rowindexes
+    assert_same_infections(infection_predictions, updated_season_infections)
@@ -0,0 +1,501 @@
+"""
+Tests of the infection model stages: the season-wide lookups and batch solvers
+must return exactly the same events as the per-row (or per-day) algorithms they
+replace. These are kept in the infection functions for this cross-check, except
+for the secondary infection loop, which is reproduced below.
+
+"""
+
+from math import ceil, floor, isnan
+from statistics import mean
+
+import numpy as np
+import pandas as pd
+import pytest
+from daily_aggregates import DailyAggregates
+from infection_functions import (
+    incubation,
+    primary_infection,
+    secondary_infection,
+    sporulation,
+)
+from weather_series import WeatherSeries
+
+
+@pytest.fixture(scope="module")
+def season_weather(season_data):
+    """
+    WeatherSeries of the bundled 2025 season.
+
+    """
+    return WeatherSeries(season_data)
+
+
+@pytest.fixture(scope="module")
+def spring_weather(season_data):
+    """
+    WeatherSeries of four rainy spring weeks of the 2025 season (10.04 to 07.05),
+    for the per-row algorithms too slow to run from every row of the season.
+
+    """
+    datetimes = season_data["datetime"]
+    return WeatherSeries(
+        season_data[(datetimes >= "2025-04-10") & (datetimes < "2025-05-08")]
+    )
+
+
+@pytest.fixture(scope="module")
+def spring_weather_with_gaps(season_data):
+    """
+    WeatherSeries of the spring weeks with gaps left as NaN (missing temperatures
+    or leaf wetness over more than 6 hours), as process_data leaves them.
+
+    """
+    datetimes = season_data["datetime"]
+    data = season_data[
+        (datetimes >= "2025-04-10") & (datetimes < "2025-05-08")
+    ].reset_index(drop=True)
+    data.loc[1000:1060, ["temperature", "humidity"]] = np.nan
+    data.loc[2500:2600, "leaf_wetness"] = np.nan
+    return WeatherSeries(data)
+
+
+@pytest.fixture(scope="module")
+def threshold_weather():
+    """
+    WeatherSeries of four synthetic days whose measurements sit on the thresholds
+    of the parameter sets checked on it: temperatures of exactly 8 °C, humidities
+    of exactly 80 and 92 %, leaf wetness of exactly 0.5 and 1, and rainfall adding
+    up in steps of 0.1 mm per measurement interval, whose running sums are not
+    exact in floating point.
+
+    """
+    rng = np.random.default_rng(0)
+    number_of_rows = 4 * 144
+    return WeatherSeries(
+        pd.DataFrame(
+            {
+                "datetime": pd.date_range(
+                    "2025-05-01",
+                    periods=number_of_rows,
+                    freq="10min",
+                    tz="Europe/Zurich",
+                ),
+                "temperature": rng.choice(
+                    [8.0, 9.0, 10.0, 12.0], number_of_rows, p=[0.03, 0.27, 0.35, 0.35]
+                ),
+                "humidity": rng.choice([70.0, 80.0, 92.0, 95.0], number_of_rows),
+                "rainfall": np.where(
+                    rng.random(number_of_rows) < 0.2,
+                    rng.choice([0.6, 1.2, 1.8], number_of_rows),
+                    0.0,
+                ),
+                "leaf_wetness": rng.choice([0.0, 0.5, 1.0], number_of_rows),
+            }
+        )
+    )
+
+
+""" Incubation """
+
+
+def get_incubation_weather(season_data, variant):
+    """
+    Returns the WeatherSeries of a variant of the season: shifted temperatures
+    (shorter or longer incubations), date gaps (days without any row), or days
+    without mean temperature (a missing measurement).
+
+    """
+    data = season_data.copy()
+    dates = data["datetime"].dt.date
+    season_dates = sorted(dates.unique())
+    if variant == "warmer":
+        data["temperature"] += 3.0
+    elif variant == "colder":
+        data["temperature"] -= 4.0
+    elif variant == "date_gaps":
+        gap_dates = (
+            season_dates[100:101] + season_dates[130:133] + season_dates[160:161]
+        )
+        data = data[~dates.isin(gap_dates)]
+    elif variant == "missing_temperatures":
+        for missing_date in season_dates[100:230:25]:
+            data.loc[data.index[dates == missing_date][40], "temperature"] = np.nan
+    return WeatherSeries(data)
+
+
+@pytest.mark.parametrize("measurement_time_interval", [10, 60])
+@pytest.mark.parametrize(
+    "variant", ["season", "warmer", "colder", "date_gaps", "missing_temperatures"]
+)
+def test_lookup_incubation_matches_launch_incubation(
+    season_data, variant, measurement_time_interval
+):
+    weather = get_incubation_weather(season_data, variant)
+    daily_weather = DailyAggregates(weather)
+    completed = 0
+    for date in daily_weather.dates:
+        first_rowindex = daily_weather.first_rowindex(date)
+        last_rowindex = daily_weather.last_rowindex(date)
+        for infection_rowindex in {
+            first_rowindex,
+            (first_rowindex + last_rowindex) // 2,
+        }:
+            arguments = (
+                weather,
+                weather.datetime[infection_rowindex],
+                infection_rowindex,
+                daily_weather,
+                measurement_time_interval,
+            )
+            expected = incubation.launch_incubation(*arguments)
+            assert incubation.lookup_incubation(*arguments) == expected, (
+                variant,
+                date,
+                infection_rowindex,
+            )
+            completed += expected[0] is not None
+    # Both completing and non-completing incubations are compared.
+    assert 0 < completed < 2 * len(daily_weather)
+
+
+""" Primary infection """
+
+# Relative humidity threshold, base temperature, base duration and leaf wetness
+# threshold, with the weather and the sampling of start rows they are checked on.
+oospore_development_cases = [
+    ("season_weather", 29, (80, 8, 8, 1.0)),
+    ("season_weather", 29, (70, 10, 4, 0.5)),
+    ("season_weather", 29, (90, 6, 12, 0.0)),
+    ("threshold_weather", 1, (80, 8, 1, 1.0)),
+    ("threshold_weather", 1, (92, 9, 0.5, 0.5)),
+]
+
+
+@pytest.mark.parametrize("algorithmic_time_steps", [1, 2, 3])
+@pytest.mark.parametrize(
+    "weather_name, start_rowindexes_step, parameters", oospore_development_cases
+)
+def test_oospore_development_germination_map_matches_oospore_germination(
+    request, weather_name, start_rowindexes_step, parameters, algorithmic_time_steps
+):
+    weather = request.getfixturevalue(weather_name)
+    germinations = 0
+    start_rowindexes = range(0, len(weather), start_rowindexes_step)
+    for start_rowindex in start_rowindexes:
+        arguments = (
+            weather,
+            start_rowindex,
+            *parameters,
+            1,
+            8.0,
+            5.0,
+            48,
+            10,
+            algorithmic_time_steps,
+        )
+        expected = primary_infection.oospore_germination(*arguments)
+        assert (
+            primary_infection.lookup_oospore_germination(*arguments) == expected
+        ), start_rowindex
+        germinations += expected[1] is not None
+    assert 0 < germinations < len(start_rowindexes)
+
+
+# Moisturization temperature threshold, rainfall threshold and rainfall period, with
+# the weather and the sampling of start rows they are checked on.
+moisture_penetration_cases = [
+    ("spring_weather", 37, (8.0, 5.0, 48)),
+    ("spring_weather", 37, (10.0, 10.0, 24)),
+    ("spring_weather", 37, (5.0, 2.0, 12)),
+    ("threshold_weather", 1, (8.0, 0.3, 2)),
+    ("threshold_weather", 1, (8.0, 1.0, 6)),
+    ("threshold_weather", 1, (9.0, 0.6, 3)),
+]
+
+
+@pytest.mark.parametrize("algorithmic_time_steps", [1, 2, 3])
+@pytest.mark.parametrize(
+    "weather_name, start_rowindexes_step, parameters", moisture_penetration_cases
+)
+def test_moisture_penetration_germination_map_matches_oospore_germination(
+    request, weather_name, start_rowindexes_step, parameters, algorithmic_time_steps
+):
+    weather = request.getfixturevalue(weather_name)
+    germinations = 0
+    start_rowindexes = range(0, len(weather), start_rowindexes_step)
+    for start_rowindex in start_rowindexes:
+        arguments = (
+            weather,
+            start_rowindex,
+            80,
+            8,
+            8,
+            1.0,
+            2,
+            *parameters,
+            10,
+            algorithmic_time_steps,
+        )
+        expected = primary_infection.oospore_germination(*arguments)
+        assert (
+            primary_infection.lookup_oospore_germination(*arguments) == expected
+        ), start_rowindex
+        germinations += expected[1] is not None
+    assert 0 < germinations < len(start_rowindexes)
+
+
+# Leaf wetness latency, base temperature and degree-hours threshold, with the
+# weather and the sampling of dispersion rows they are checked on.
+oospore_infection_cases = [
+    ("season_weather", 7, (6.0, 8.0, 50.0)),
+    ("season_weather", 7, (30.0, 10.0, 20.0)),
+    ("season_weather", 7, (120.0, 5.0, 100.0)),
+    ("threshold_weather", 1, (6.0, 8.0, 5.0)),
+    ("threshold_weather", 1, (30.0, 9.0, 3.0)),
+    ("threshold_weather", 1, (60.0, 8.0, 10.0)),
+]
+
+
+@pytest.mark.parametrize("algorithmic_time_steps", [1, 2, 3])
+@pytest.mark.parametrize(
+    "weather_name, dispersion_rowindexes_step, parameters", oospore_infection_cases
+)
+def test_oospore_infection_map_matches_oospore_infection(
+    request,
+    weather_name,
+    dispersion_rowindexes_step,
+    parameters,
+    algorithmic_time_steps,
+):
+    weather = request.getfixturevalue(weather_name)
+    infections = 0
+    dispersion_rowindexes = range(0, len(weather), dispersion_rowindexes_step)
+    for dispersion_rowindex in dispersion_rowindexes:
+        arguments = (
+            weather,
+            10,
+            dispersion_rowindex,
+            *parameters,
+            algorithmic_time_steps,
+        )
+        expected = primary_infection.oospore_infection(*arguments)
+        assert (
+            primary_infection.lookup_oospore_infection(*arguments) == expected
+        ), dispersion_rowindex
+        infections += expected[1] is not None
+    assert 0 < infections < len(dispersion_rowindexes)
+
+
+""" Sporulation """
+
+# Leaf wetness threshold, minimum humidity, minimum temperature and minimum
+# darkness hours, with the weather and the sampling of end-of-incubation rows they
+# are checked on.
+sporulation_cases = [
+    ("spring_weather", 13, (0.0, 92.0, 12.0, 4.0)),
+    ("spring_weather", 13, (0.5, 85.0, 10.0, 2.0)),
+    ("spring_weather", 13, (0.0, 95.0, 8.0, 6.0)),
+    ("threshold_weather", 1, (0.5, 92.0, 9.0, 1.0)),
+    ("threshold_weather", 1, (0.0, 80.0, 10.0, 0.5)),
+]
+
+
+@pytest.mark.parametrize("algorithmic_time_steps", [1, 2, 3])
+@pytest.mark.parametrize(
+    "weather_name, end_incubation_rowindexes_step, parameters", sporulation_cases
+)
+def test_launch_sporulation_matches_per_row_sporulation(
+    request,
+    site_location,
+    weather_name,
+    end_incubation_rowindexes_step,
+    parameters,
+    algorithmic_time_steps,
+):
+    weather = request.getfixturevalue(weather_name)
+    location = (
+        site_location["longitude"],
+        site_location["latitude"],
+        site_location["elevation"],
+    )
+    # Sporulation from every start row, with the per-row algorithm.
+    sporulation_rowindexes = [
+        sporulation.sporulation(
+            weather, start_rowindex, *parameters, 10, *location, algorithmic_time_steps
+        )[1]
+        for start_rowindex in range(len(weather))
+    ]
+    assert any(rowindex is not None for rowindex in sporulation_rowindexes)
+    assert any(rowindex is None for rowindex in sporulation_rowindexes)
+
+    for end_incubation_rowindex in range(
+        0, len(weather), end_incubation_rowindexes_step
+    ):
+        # Every start row visited from the end of incubation, as launch_sporulation
+        # did with a per-row loop.
+        expected_rowindexes = [
+            sporulation_rowindexes[start_rowindex]
+            for start_rowindex in range(
+                end_incubation_rowindex, len(weather), algorithmic_time_steps
+            )
+            if sporulation_rowindexes[start_rowindex] is not None
+        ]
+        for fast_mode in (True, False):
+            sporulation_datetimes, rowindexes = sporulation.launch_sporulation(
+                weather,
+                None,
+                end_incubation_rowindex,
+                *parameters,
+                10,
+                *location,
+                fast_mode,
+                algorithmic_time_steps,
+            )
+            expected = expected_rowindexes[:1] if fast_mode else expected_rowindexes
+            assert rowindexes == expected, (end_incubation_rowindex, fast_mode)
+            assert sporulation_datetimes == [
+                weather.datetime[rowindex] for rowindex in expected
+            ]
+
+
+""" Secondary infection """
+
+
+def secondary_infection_per_row(  # noqa: C901
+    weather,
+    sporulation_datetime_rowindex,
+    spore_lifespan,
+    secondary_infection_min_temperature,
+    secondary_infection_max_temperature,
+    secondary_infection_leaf_wetness_latency,
+    secondary_infection_sum_degree_hours_threshold,
+    measurement_time_interval,
+    fast_mode,
+    algorithmic_time_steps,
+):
+    """
+    Row-by-row secondary infection loop replaced by the array operations of
+    secondary_infection.secondary_infection, reproduced as the reference result.
+
+    """
+    secondary_infection_datetimes = []
+    secondary_infection_datetime_rowindexes = []
+    if isnan(spore_lifespan):
+        return secondary_infection_datetimes, secondary_infection_datetime_rowindexes
+    end_of_lifespan_rowindex = ceil(
+        sporulation_datetime_rowindex
+        + spore_lifespan * 24 * 60 / measurement_time_interval
+    )
+    end_of_lifespan_rowindex = min(end_of_lifespan_rowindex, len(weather) - 1)
+    temperatures = weather.temperature
+    leaf_wetnesses = weather.leaf_wetness
+
+    no_leaf_wetness_minutes_counter = 0
+    sum_degree_hours = 0
+    sum_degree_hours_minutes_counter = 0
+    for i in range(
+        sporulation_datetime_rowindex,
+        end_of_lifespan_rowindex + 1,
+        algorithmic_time_steps,
+    ):
+        temperature = temperatures[i]
+        leaf_wetness = leaf_wetnesses[i]
+        if isnan(temperature) or isnan(leaf_wetness):
+            continue
+        if (
+            temperature < secondary_infection_min_temperature
+            or temperature > secondary_infection_max_temperature
+        ):
+            continue
+        if leaf_wetness == 0:
+            no_leaf_wetness_minutes_counter += (
+                measurement_time_interval * algorithmic_time_steps
+            )
+            if (
+                no_leaf_wetness_minutes_counter
+                > secondary_infection_leaf_wetness_latency
+            ):
+                no_leaf_wetness_minutes_counter = 0
+                sum_degree_hours = 0
+                sum_degree_hours_minutes_counter = 0
+                continue
+        else:
+            no_leaf_wetness_minutes_counter = 0
+            sum_degree_hours_minutes_counter += (
+                measurement_time_interval * algorithmic_time_steps
+            )
+            if sum_degree_hours_minutes_counter >= 60:
+                start_hourly_rowindex = max(
+                    0, i - floor(60 / measurement_time_interval)
+                )
+                stop_hourly_rowindex = min(i + 1, len(weather))
+                hourly_temps = [
+                    t
+                    for t in temperatures[start_hourly_rowindex:stop_hourly_rowindex]
+                    if not isnan(t)
+                ]
+                if not hourly_temps:
+                    continue
+                sum_degree_hours += mean(hourly_temps)
+                sum_degree_hours_minutes_counter -= 60
+                if sum_degree_hours >= secondary_infection_sum_degree_hours_threshold:
+                    secondary_infection_datetimes.append(weather.datetime[i])
+                    secondary_infection_datetime_rowindexes.append(i)
+                    sum_degree_hours = 0
+                    sum_degree_hours_minutes_counter = 0
+                    no_leaf_wetness_minutes_counter = 0
+                    if fast_mode is True:
+                        break
+
+    return secondary_infection_datetimes, secondary_infection_datetime_rowindexes
+
+
+# Minimum and maximum temperatures, leaf wetness latency and degree-hours
+# threshold, with the weather and the sampling of sporulation rows they are
+# checked on.
+secondary_infection_cases = [
+    ("spring_weather_with_gaps", 97, (3.0, 29.0, 60.0, 50.0)),
+    ("spring_weather_with_gaps", 97, (10.0, 25.0, 30.0, 20.0)),
+    ("spring_weather_with_gaps", 97, (3.0, 29.0, 240.0, 150.0)),
+    ("threshold_weather", 1, (8.0, 10.0, 10.0, 5.0)),
+    ("threshold_weather", 1, (9.0, 12.0, 20.0, 12.0)),
+]
+
+
+@pytest.mark.parametrize("algorithmic_time_steps", [1, 2, 3])
+@pytest.mark.parametrize(
+    "weather_name, sporulation_rowindexes_step, parameters",
+    secondary_infection_cases,
+)
+def test_secondary_infection_matches_per_row_loop(
+    request,
+    weather_name,
+    sporulation_rowindexes_step,
+    parameters,
+    algorithmic_time_steps,
+):
+    weather = request.getfixturevalue(weather_name)
+    infections = 0
+    for sporulation_rowindex in range(0, len(weather), sporulation_rowindexes_step):
+        for spore_lifespan in (0.5, 2.0, 6.0, np.nan):
+            for fast_mode in (True, False):
+                arguments = (
+                    weather,
+                    sporulation_rowindex,
+                    spore_lifespan,
+                    *parameters,
+                    10,
+                    fast_mode,
+                    algorithmic_time_steps,
+                )
+                expected = secondary_infection_per_row(*arguments)
+                assert (
+                    secondary_infection.secondary_infection(*arguments) == expected
+                ), (
+                    sporulation_rowindex,
+                    spore_lifespan,
+                    fast_mode,
+                )
+                infections += len(expected[1])
+    assert infections > 0
@@ -0,0 +1,210 @@
+"""
+Tests of the weather data processing: incremental processing of a changed weather
+file against the snapshot of the previous run must give exactly the result of a
+full reprocess, and measurements must be mapped onto the time grid as documented.
+
+"""
+
+import logging
+
+import pandas as pd
+import process_data
+import processed_cache
+import pytest
+
+""" Incremental processing """
+
+# Data row of the first measurement after the spring daylight saving time change
+# (30.03.2025 03:00) in the bundled 2025 season.
+dst_rowindex = 12684
+
+
+@pytest.fixture(scope="module")
+def season_file_lines(season_file):
+    """
+    Header line and data rows of the bundled 2025 season, each row as its list of
+    fields.
+
+    """
+    lines = season_file.read_text(encoding="utf-8").splitlines()
+    return lines[0], [line.split(";") for line in lines[1:]]
+
+
+def set_fields(rows, rowindexes, column, value):
+    """
+    Returns a copy of the rows with the given field set on the given rows.
+
+    """
+    rows = [row.copy() for row in rows]
+    for rowindex in rowindexes:
+        rows[rowindex][column] = value
+    return rows
+
+
+def get_file_versions(rows, case):
+    """
+    Returns the rows of the previous and current versions of the weather file of a
+    test case, i.e. of a change of its tail.
+
+    """
+    # Previous version with a 2-hour temperature gap (filled by interpolation).
+    gap_rows = set_fields(rows[:13000], range(12000, 12012), 1, "")
+    if case == "appended_rows":
+        return rows[:12000], rows[:13000]
+    if case == "changed_value":
+        return rows[:13000], set_fields(rows[:13000], [12500], 1, "25.5")
+    if case == "changed_after_dst_change":
+        return rows[:13000], set_fields(rows[:13000], [dst_rowindex + 1], 1, "12.5")
+    if case == "changed_after_filled_gap":
+        # The interpolated values of the gap depend on the changed row after it.
+        return gap_rows, set_fields(gap_rows, [12012], 1, "14.0")
+    if case == "changed_inside_filled_gap":
+        return gap_rows, set_fields(gap_rows, [12005], 1, "14.0")
+    if case == "new_gaps_and_out_of_range":
+        current_rows = set_fields(rows[:13000], range(12100, 12150), 3, "")
+        current_rows = set_fields(current_rows, range(12200, 12230), 1, "")
+        return rows[:12000], set_fields(current_rows, [12300], 1, "80.0")
+    if case == "removed_rows":
+        return rows[:13000], rows[:12400] + rows[12406:13100]
+    if case == "truncated":
+        return rows[:13000], rows[:12800]
+    raise ValueError(case)
+
+
+def write_weather_file(path, header, rows):
+    """
+    Writes rows as a weather file with the given header line.
+
+    """
+    path.write_text(
+        "\n".join([header] + [";".join(row) for row in rows]) + "\n", encoding="utf-8"
+    )
+    return path
+
+
+@pytest.mark.parametrize(
+    "case",
+    [
+        "appended_rows",
+        "changed_value",
+        "changed_after_dst_change",
+        "changed_after_filled_gap",
+        "changed_inside_filled_gap",
+        "new_gaps_and_out_of_range",
+        "removed_rows",
+        "truncated",
+    ],
+)
+def test_incremental_processing_matches_full_reprocess(
+    season_file_lines, process_weather_file, tmp_path, caplog, case
+):
+    header, rows = season_file_lines
+    previous_rows, current_rows = get_file_versions(rows, case)
+    previous_file = write_weather_file(tmp_path / "previous.csv", header, previous_rows)
+    current_file = write_weather_file(tmp_path / "current.csv", header, current_rows)
+
+    # Snapshot of the previous run, stored and read back as by main.py.
+    _processed_data, snapshot = process_weather_file(
+        previous_file, tmp_path / "previous.processed.csv", tmp_path / "previous.qc.csv"
+    )
+    processed_cache.save_snapshot(tmp_path / "cache", "snapshot", snapshot)
+    snapshot = processed_cache.load_snapshot(tmp_path / "cache", "snapshot")
+    assert snapshot is not None
+
+    caplog.set_level(logging.INFO, logger="plasmopy")
+    incremental_data, _snapshot = process_weather_file(
+        current_file,
+        tmp_path / "incremental.processed.csv",
+        tmp_path / "incremental.qc.csv",
+        snapshot,
+    )
+    assert "rows taken from the previous snapshot" in caplog.text
+    full_data, _snapshot = process_weather_file(
+        current_file, tmp_path / "full.processed.csv", tmp_path / "full.qc.csv"
+    )
+
+    pd.testing.assert_frame_equal(incremental_data, full_data, check_exact=True)
+    for output in ("processed", "qc"):
+        assert (tmp_path / f"incremental.{output}.csv").read_bytes() == (
+            tmp_path / f"full.{output}.csv"
+        ).read_bytes()
+
+
+""" Time grid mapping """
+
+
+def test_map_to_timegrid_places_off_grid_and_duplicate_rows():
+    timezone = "Europe/Zurich"
+    # (time, temperature) rows of a 10-minute file mixed with hourly rows and
+    # 10-minute rows off the grid, with duplicate and out-of-grid rows.
+    rows = [
+        ("2025-05-01 00:00", 10.0),
+        ("2025-05-01 00:13", 99.0),  # same grid time as the next, on-grid row
+        ("2025-05-01 00:10", 11.0),
+        ("2025-05-01 00:27", 12.0),  # moved to 00:20
+        ("2025-05-01 00:40", 13.0),
+        ("2025-05-01 00:40", 14.0),  # exact duplicate
+        (None, 50.0),  # missing datetime
+        ("2025-04-30 23:50", 51.0),  # before the first grid time
+        ("2025-05-01 01:05", 15.0),  # hourly rows off the grid
+        ("2025-05-01 02:00", 16.0),
+        ("2025-05-01 02:07", 98.0),  # same grid time as the previous, on-grid row
+        ("2025-05-01 02:12", 17.0),  # 10-minute rows off the grid
+        ("2025-05-01 02:22", 18.0),
+        ("2025-05-01 02:32", 19.0),
+        ("2025-05-01 03:05", 20.0),
+        ("2025-05-01 04:05", 21.0),
+    ]
+    data = pd.DataFrame(
+        {
+            "datetime": pd.to_datetime([time for time, _ in rows]).tz_localize(
+                timezone
+            ),
+            "temperature": [temperature for _, temperature in rows],
+            "humidity": [temperature + 50 for _, temperature in rows],
+        }
+    )
+
+    mapped_data, coverage = process_data.map_to_timegrid(data, 10, timezone)
+
+    expected_temperatures = pd.Series(
+        {
+            "00:00": 10.0,
+            "00:10": 11.0,
+            "00:20": 12.0,
+            "00:40": 13.0,
+            "01:00": 15.0,
+            "02:00": 16.0,
+            "02:10": 17.0,
+            "02:20": 18.0,
+            "02:30": 19.0,
+            "03:00": 20.0,
+            "04:00": 21.0,
+        }
+    )
+    expected_datetimes = pd.date_range(
+        "2025-05-01 00:00", "2025-05-01 04:00", freq="10min", tz=timezone
+    )
+    assert (mapped_data["datetime"] == expected_datetimes).all()
+    temperatures = pd.Series(
+        mapped_data["temperature"].to_numpy(),
+        index=expected_datetimes.strftime("%H:%M"),
+    )
+    pd.testing.assert_series_equal(
+        temperatures.dropna(), expected_temperatures, check_names=False
+    )
+    # Measurements of a row are moved together.
+    pd.testing.assert_series_equal(
+        mapped_data["humidity"],
+        mapped_data["temperature"] + 50,
+        check_names=False,
+    )
+    assert coverage == {
+        "grid_rows": 25,
+        "filled_rows": 11,
+        "empty_rows": 14,
+        "coverage_percent": 44.0,
+        "duplicate_rows": 3,
+        "off_grid_rows_moved": 7,
+        "out_of_grid_rows": 2,
+    }